@@ -0,0 +1,9 @@
+"""Shared pytest setup for the backend checks"""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def cache_root(tmp_path, monkeypatch):
+    """Point the engine cache at a fresh directory for every test"""
+    monkeypatch.setenv("AI_ENGINE_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
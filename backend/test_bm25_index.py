@@ -0,0 +1,109 @@
+"""BM25 top-k and ANN retrieval checks against exhaustive scoring (run with pytest from backend/)"""
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from utils import job_index
+from utils.ann_index import IVFIndex
+from utils.job_index import JobIndex
+
+VOCABULARY = 600
+TOPICS = 12
+QUERIES = 30
+
+
+def _words(rng, count, topic, weights):
+    """Words of one topic (its own slice of the vocabulary) mixed with common words"""
+    own = rng.integers(0, VOCABULARY // TOPICS, count) + topic * (VOCABULARY // TOPICS)
+    common = rng.choice(VOCABULARY, count, p=weights)
+    return " ".join(f"w{word}" for word in np.where(rng.random(count) < 0.6, own, common))
+
+
+def synthetic_jobs(count, seed=0):
+    """Jobs in a few topics over a Zipf-like vocabulary, so postings range from very long to very short"""
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.arange(1, VOCABULARY + 1)
+    weights /= weights.sum()
+    jobs = [{"id": n, "title": _words(rng, 3, n % TOPICS, weights),
+             "description": _words(rng, int(rng.integers(10, 60)), n % TOPICS, weights),
+             "required_skills": []} for n in range(count)]
+    return jobs, weights
+
+
+def queries(weights, seed=1):
+    rng = np.random.default_rng(seed)
+    return [_words(rng, int(rng.integers(1, 10)), n % TOPICS, weights) for n in range(QUERIES)]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    jobs, weights = synthetic_jobs(800)
+    index = JobIndex(str.lower, TfidfVectorizer)
+    index.build(jobs)
+    # A few tombstones, which neither search may return
+    index.update(jobs[10:], changed=set())
+    return index, queries(weights)
+
+
+def exhaustive_top(bm25, text, top_n, skill_scores=None, skill_weight=0.0):
+    scores = bm25.score_rows(text, bm25.rows, skill_scores, skill_weight)
+    order = np.argsort(-scores, kind='stable')[:top_n]
+    return bm25.rows[order], scores[order]
+
+
+@pytest.mark.parametrize("top_n", [1, 5, 20])
+def test_maxscore_matches_exhaustive(corpus, top_n):
+    index, texts = corpus
+    bm25 = index.ensure_bm25()
+    for text in texts:
+        rows, scores = bm25.search(text, top_n)
+        expected_rows, expected = exhaustive_top(bm25, text, top_n)
+        expected = expected[expected > 0]
+        assert np.allclose(scores[:len(expected)], expected, rtol=1e-5)
+        assert np.allclose(bm25.score_rows(text, rows), scores, rtol=1e-5)
+        assert index.live[rows].all()
+        assert np.allclose(bm25.exhaustive_scores(text)[np.searchsorted(bm25.rows, rows)], scores, rtol=1e-5)
+
+
+def test_maxscore_matches_exhaustive_with_skill_blend(corpus):
+    index, texts = corpus
+    bm25 = index.ensure_bm25()
+    rng = np.random.default_rng(2)
+    for text in texts:
+        shares = (rng.random(len(index.jobs)) * (rng.random(len(index.jobs)) < 0.05)).astype(np.float32)
+        rows, scores = bm25.search(text, 10, shares, 0.3)
+        _, expected = exhaustive_top(bm25, text, 10, shares, 0.3)
+        expected = expected[expected > 0]
+        assert np.allclose(scores[:len(expected)], expected, rtol=1e-5)
+
+
+def test_ann_path_reranks_with_bm25(corpus, monkeypatch):
+    index, texts = corpus
+    bm25 = index.ensure_bm25()
+    exact = {text: [job["id"] for job, _ in index.top_jobs(text, 5)] for text in texts}
+
+    # One cluster and more candidates than jobs: the ANN path has to give the exact BM25 top k
+    monkeypatch.setattr(job_index, "ANN_MIN_JOBS", 1)
+    monkeypatch.setattr(job_index, "ANN_RERANK_FACTOR", len(index.jobs))
+    index.ann = IVFIndex(nlist=1).build(index.vectors, index.live)
+    for text in texts:
+        results = index.top_jobs(text, 5)
+        rows = np.array([index.row_for(job["id"]) for job, _ in results])
+        scores = bm25.score_rows(text, rows)
+        assert list(scores) == sorted(scores, reverse=True)
+        assert np.allclose(scores, bm25.score_rows(text, [index.row_for(job_id) for job_id in exact[text]]),
+                           rtol=1e-5)
+
+
+def test_ann_path_recall(corpus, monkeypatch):
+    index, texts = corpus
+    exact = {text: {job["id"] for job, _ in index.top_jobs(text, 5)} for text in texts}
+    monkeypatch.setattr(job_index, "ANN_MIN_JOBS", 1)
+    index.ann = None
+    found = 0
+    for text in texts:
+        results = index.top_jobs(text, 5)
+        assert index.ann is not None
+        assert all(index.live[index.row_for(job["id"])] for job, _ in results)
+        found += len(exact[text] & {job["id"] for job, _ in results})
+    assert found / (5 * len(texts)) >= 0.8
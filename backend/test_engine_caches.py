@@ -0,0 +1,135 @@
+"""Engine cache, parse cache and job index snapshot checks (run with pytest from backend/)"""
+import glob
+import os
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from utils import job_index_snapshot
+from utils.engine_cache import atomic_write, cache_dir
+from utils.job_index_snapshot import job_data_fingerprint, load_job_index, save_job_index
+from utils.parse_cache import ParseCache
+
+JOBS = [
+    {"id": 1, "title": "Data Engineer", "description": "pipelines in python", "required_skills": ["Python"]},
+    {"id": 2, "title": "Web Developer", "description": "react front ends", "required_skills": ["React"]},
+]
+
+
+def test_atomic_write_replaces_whole_file(tmp_path):
+    path = str(tmp_path / "data.bin")
+    atomic_write(path, lambda f: f.write(b"first"))
+    atomic_write(path, lambda f: f.write(b"second"))
+    assert open(path, 'rb').read() == b"second"
+
+
+def test_atomic_write_failure_keeps_old_file(tmp_path):
+    path = str(tmp_path / "data.bin")
+    atomic_write(path, lambda f: f.write(b"kept"))
+
+    def fail(f):
+        f.write(b"partial")
+        raise RuntimeError("disk full")
+
+    with pytest.raises(RuntimeError):
+        atomic_write(path, fail)
+    assert open(path, 'rb').read() == b"kept"
+    assert os.listdir(tmp_path) == ["data.bin"]
+
+
+def test_parse_cache_keys_by_content(tmp_path):
+    cache = ParseCache("1")
+    first, copy, other = tmp_path / "a.pdf", tmp_path / "b.pdf", tmp_path / "c.pdf"
+    first.write_bytes(b"resume")
+    copy.write_bytes(b"resume")
+    other.write_bytes(b"another resume")
+    key = cache.key_for(str(first), "pdf")
+    assert cache.key_for(str(copy), "pdf") == key
+    assert cache.key_for(str(other), "pdf") != key
+    assert cache.key_for(str(first), "docx") != key
+    assert ParseCache("2").key_for(str(first), "pdf") != key
+
+    cache.put(key, {"skills": ["Python"]})
+    assert cache.get(key) == {"skills": ["Python"]}
+    assert cache.get(cache.key_for(str(other), "pdf")) is None
+
+
+def test_parse_cache_version_change_drops_old_entries():
+    old = ParseCache("1")
+    old.put("ab" * 32, {"skills": []})
+    new = ParseCache("2")
+    assert not os.path.exists(old.directory)
+    assert new.get("ab" * 32) is None
+
+
+def test_parse_cache_evicts_least_recently_used():
+    entry = {"text": "x" * 100}
+    cache = ParseCache("1", max_bytes=350)
+    keys = [f"{n:02d}" * 32 for n in range(3)]
+    for age, key in enumerate(keys):
+        cache.put(key, entry)
+        # Oldest first, whatever the file system's timestamp resolution
+        os.utime(cache._entry_path(key), (1000 + age, 1000 + age))
+    assert cache.get(keys[0]) == entry     # used again: now the most recent
+    cache.put("99" * 32, entry)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == entry
+    assert cache.get("99" * 32) == entry
+
+
+def _fitted():
+    vectorizer = TfidfVectorizer()
+    vectors = vectorizer.fit_transform([f"{job['title']} {job['description']}" for job in JOBS])
+    return vectorizer, vectors, [f"{job['title']} {job['description']}".lower() for job in JOBS]
+
+
+def test_snapshot_round_trip():
+    vectorizer, vectors, texts = _fitted()
+    fingerprint = job_data_fingerprint(JOBS)
+    save_job_index(fingerprint, vectorizer, vectors, texts)
+    loaded_vectorizer, loaded_vectors, loaded_texts = load_job_index(fingerprint, TfidfVectorizer)
+    assert loaded_vectorizer.vocabulary_ == vectorizer.vocabulary_
+    assert np.allclose(loaded_vectorizer.idf_, vectorizer.idf_)
+    assert (loaded_vectors != vectors).nnz == 0
+    assert loaded_texts == texts
+    assert (loaded_vectorizer.transform(["python pipelines"]) != vectorizer.transform(["python pipelines"])).nnz == 0
+
+
+def test_snapshot_fingerprint_follows_indexed_fields():
+    fingerprint = job_data_fingerprint(JOBS)
+    assert job_data_fingerprint([dict(job) for job in JOBS]) == fingerprint
+    assert job_data_fingerprint([{**JOBS[0], "company": "Acme"}, JOBS[1]]) == fingerprint
+    assert job_data_fingerprint([{**JOBS[0], "description": "spark"}, JOBS[1]]) != fingerprint
+    assert job_data_fingerprint([JOBS[0], {**JOBS[1], "required_skills": ["Vue"]}]) != fingerprint
+    vectorizer, vectors, texts = _fitted()
+    save_job_index(fingerprint, vectorizer, vectors, texts)
+    assert load_job_index(job_data_fingerprint(JOBS[:1]), TfidfVectorizer) is None
+
+
+def test_snapshot_rejects_old_version(monkeypatch):
+    vectorizer, vectors, texts = _fitted()
+    fingerprint = job_data_fingerprint(JOBS)
+    monkeypatch.setattr(job_index_snapshot, "SNAPSHOT_VERSION", job_index_snapshot.SNAPSHOT_VERSION - 1)
+    save_job_index(fingerprint, vectorizer, vectors, texts)
+    monkeypatch.undo()
+    assert load_job_index(fingerprint, TfidfVectorizer) is None
+
+
+@pytest.mark.parametrize("content", [b"", b"not a snapshot", b"PK\x03\x04truncated zip"])
+def test_snapshot_ignores_corrupt_file(content):
+    fingerprint = job_data_fingerprint(JOBS)
+    with open(os.path.join(cache_dir('job_index'), f"{fingerprint}.npz"), 'wb') as f:
+        f.write(content)
+    assert load_job_index(fingerprint, TfidfVectorizer) is None
+
+
+def test_snapshots_are_pruned():
+    vectorizer, vectors, texts = _fitted()
+    for n in range(job_index_snapshot.SNAPSHOTS_TO_KEEP + 2):
+        save_job_index(f"fingerprint{n}", vectorizer, vectors, texts)
+        path = os.path.join(cache_dir('job_index'), f"fingerprint{n}.npz")
+        os.utime(path, (1000 + n, 1000 + n))
+    kept = sorted(os.path.basename(path) for path in glob.glob(os.path.join(cache_dir('job_index'), '*.npz')))
+    assert len(kept) == job_index_snapshot.SNAPSHOTS_TO_KEEP
+    assert "fingerprint0.npz" not in kept
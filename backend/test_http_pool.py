@@ -0,0 +1,139 @@
+"""Pooled HTTP client checks against a local stub server (run with pytest from backend/)"""
+import email.utils
+import http.server
+import threading
+
+import pytest
+
+from utils import http_pool
+from utils.http_pool import HTTPError, HTTPPool, retry_after_seconds
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """Answers each path from a script of (status, headers), then 200 with {"ok": true}"""
+    protocol_version = 'HTTP/1.1'
+    scripts = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        script = self.scripts.get(self.path.split('?')[0])
+        status, headers = script.pop(0) if script else (200, {})
+        body = b'{"ok": true}'
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    StubHandler.scripts = {}
+    stub = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=stub.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{stub.server_address[1]}"
+    stub.shutdown()
+    stub.server_close()
+
+
+def make_pool(sleeps, **options):
+    return HTTPPool(sleep=sleeps.append, **options)
+
+
+def test_keep_alive_reuses_connection(server):
+    pool = make_pool([])
+    assert pool.get_json(server + '/jobs', params={"page": 1}) == {"ok": True}
+    assert pool.get_json(server + '/jobs', params={"page": 2}) == {"ok": True}
+    stats = pool.stats()
+    assert stats["requests"] == 2 and stats["connections"] == 1 and stats["reused"] == 1
+    pool.close()
+
+
+def test_retry_after_replaces_backoff(server):
+    StubHandler.scripts['/jobs'] = [(503, {"Retry-After": "2"})]
+    sleeps = []
+    pool = make_pool(sleeps, retries=3)
+    assert pool.get_json(server + '/jobs') == {"ok": True}
+    assert sleeps == [2.0]
+    stats = pool.stats()
+    assert (stats["requests"], stats["retries"], stats["failures"]) == (2, 1, 0)
+
+
+def test_retries_are_bounded(server):
+    StubHandler.scripts['/jobs'] = [(503, {"Retry-After": "1"})] * 5
+    sleeps = []
+    pool = make_pool(sleeps, retries=2)
+    with pytest.raises(HTTPError) as error:
+        pool.request('GET', server + '/jobs')
+    assert error.value.status == 503
+    assert sleeps == [1.0, 1.0]
+    stats = pool.stats()
+    assert (stats["requests"], stats["retries"], stats["failures"]) == (3, 2, 1)
+
+
+def test_other_errors_are_not_retried(server):
+    StubHandler.scripts['/jobs'] = [(404, {})]
+    sleeps = []
+    pool = make_pool(sleeps)
+    with pytest.raises(HTTPError) as error:
+        pool.request('GET', server + '/jobs')
+    assert error.value.status == 404 and sleeps == []
+    assert pool.stats()["requests"] == 1
+
+
+def test_backoff_doubles_without_retry_after(server, monkeypatch):
+    # Take the top of each jitter range
+    monkeypatch.setattr(http_pool.random, "uniform", lambda low, high: high)
+    StubHandler.scripts['/jobs'] = [(429, {}), (502, {}), (504, {})]
+    sleeps = []
+    pool = make_pool(sleeps, retries=3)
+    assert pool.get_json(server + '/jobs') == {"ok": True}
+    assert sleeps == [http_pool.BACKOFF_BASE, http_pool.BACKOFF_BASE * 2, http_pool.BACKOFF_BASE * 4]
+
+
+def test_long_retry_after_fails_at_once(server):
+    StubHandler.scripts['/jobs'] = [(429, {"Retry-After": str(int(http_pool.MAX_RETRY_AFTER) + 1)})]
+    sleeps = []
+    pool = make_pool(sleeps, retries=3)
+    with pytest.raises(HTTPError) as error:
+        pool.request('GET', server + '/jobs')
+    assert error.value.status == 429 and "retry after" in str(error.value)
+    assert sleeps == []
+    assert pool.stats()["failures"] == 1
+
+
+def test_retry_after_formats():
+    now = 1_700_000_000.0
+    assert retry_after_seconds("120") == 120.0
+    assert retry_after_seconds(email.utils.formatdate(now + 30, usegmt=True), now=now) == 30.0
+    assert retry_after_seconds(email.utils.formatdate(now - 30, usegmt=True), now=now) == 0.0
+    assert retry_after_seconds("soon") is None and retry_after_seconds(None) is None
+
+
+def test_waiting_retry_frees_its_slot(server):
+    StubHandler.scripts['/slow'] = [(429, {"Retry-After": "5"})]
+    waiting, resume = threading.Event(), threading.Event()
+
+    def sleep(seconds):
+        waiting.set()
+        resume.wait(10)
+
+    # One slot in the whole pool: the fast request only gets it if the slow one let go
+    pool = HTTPPool(max_concurrency=1, max_per_host=1, retries=1, sleep=sleep)
+    results = {}
+    slow = threading.Thread(target=lambda: results.setdefault("slow", pool.get_json(server + '/slow')))
+    slow.start()
+    assert waiting.wait(10)
+    fast = threading.Thread(target=lambda: results.setdefault("fast", pool.get_json(server + '/fast')))
+    fast.start()
+    fast.join(10)
+    finished = not fast.is_alive()
+    resume.set()
+    slow.join(10)
+    fast.join(10)
+    assert finished
+    assert results == {"slow": {"ok": True}, "fast": {"ok": True}}
@@ -0,0 +1,46 @@
+"""Feed ingestion and change log checks (run with pytest from backend/)"""
+import datetime
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from utils.ai_career_engine import feed_jobs_database
+from utils.job_index import JobIndex, job_content_hash, job_text
+from utils.job_ingest import FeedDelta, job_key, merge_deltas
+from utils.job_store import FEED_SCHEMA, JobStore
+from utils.skill_normalizer import build_skill_normalizer
+
+TODAY = datetime.date(2026, 1, 15)
+normalizer = build_skill_normalizer()
+
+
+def posting(title, skills):
+    return {"title": title, "description": f"{title} role", "skills": skills, "company": "Acme"}
+
+
+def test_key_survives_bookkeeping_and_store():
+    raw = posting("Data Engineer", ["Python"])
+    records, _ = merge_deltas([], {"feed": FeedDelta.snapshot([raw])}, today=TODAY)
+    assert job_key(records[0]) == job_key(raw)
+    store = JobStore.from_jobs(records, FEED_SCHEMA)
+    assert job_key(store[0]) == job_key(raw)
+
+
+def test_posting_without_id_inserted_first():
+    first, second = posting("Data Engineer", ["Python", "SQL"]), posting("Web Developer", ["JavaScript"])
+    records, _ = merge_deltas([], {"feed": FeedDelta.snapshot([first, second])}, today=TODAY)
+    index = JobIndex(str.lower, TfidfVectorizer)
+    index.build(feed_jobs_database(records, normalizer))
+
+    # A new posting ahead of the others, while the first one is withdrawn
+    newcomer = posting("Mobile Developer", ["Kotlin"])
+    records, changes = merge_deltas(records, {"feed": FeedDelta.snapshot([newcomer, second])}, today=TODAY)
+    assert changes["added"] == [job_key(newcomer)] and changes["removed"] == [job_key(first)]
+    jobs = feed_jobs_database(records, normalizer)
+    index.update(jobs, set(changes["added"]) | set(changes["changed"]))
+
+    assert len(index) == 2
+    for job in jobs:
+        row = index.row_for(job["id"])
+        assert index.jobs[row]["title"] == job["title"]
+        assert index.hashes[row] == job_content_hash(job)
+        assert index.texts[row] == job_text(job).lower()
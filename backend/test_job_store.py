@@ -0,0 +1,145 @@
+"""Columnar job store and row-array index checks (run with pytest from backend/)"""
+import glob
+import json
+import os
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from utils import job_store
+from utils.job_index import JobIndex
+from utils.job_store import FEED_SCHEMA, JobStore, open_latest_store
+from utils.skill_index import SkillIndex
+
+JOBS = [
+    {"id": "1", "title": "Data Engineer", "company": "Acme", "location": "Berlin",
+     "description": "pipelines in python", "required_skills": ["Python", "SQL"]},
+    # Missing schema fields stay missing, non-string values and extra fields round trip as JSON
+    {"id": 2, "title": "Web Developer", "company": None, "description": "react front ends",
+     "required_skills": ["React", "TypeScript"], "remote": True},
+    {"id": "3", "title": "Développeur Mobile", "company": "Acme", "location": "Paris",
+     "description": "", "required_skills": [], "salary": {"min": 50000, "max": 70000}},
+    {"id": "4", "title": "Data Engineer", "company": "Globex", "location": "Berlin",
+     "description": "spark and sql", "required_skills": ["SQL", "Spark", "Python"]},
+]
+
+
+def age(path, seconds):
+    """Make a saved store look older than the ones saved after it"""
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def test_save_open_round_trip(tmp_path):
+    store = JobStore.from_jobs(JOBS, source="feed-1")
+    path = store.save(str(tmp_path))
+    opened = JobStore.open(path)
+
+    assert len(opened) == len(JOBS)
+    assert [dict(row) for row in opened] == JOBS
+    assert list(opened[0]) == ["id", "title", "description", "company", "location", "required_skills"]
+    assert "location" not in opened[1] and opened[1]["remote"] is True
+    assert isinstance(opened.arrays["present"], np.memmap)
+    assert opened.fingerprint == store.fingerprint
+    assert opened.index_fingerprint == store.index_fingerprint
+    assert opened.source == "feed-1"
+    assert not glob.glob(os.path.join(str(tmp_path), "*.tmp-*"))
+
+
+def test_feed_schema_round_trip(tmp_path):
+    records = [{"id": "a", "title": "Analyst", "skills": ["Excel"], "feed": "remotive", "seen_on": "2026-01-02"},
+               {"id": "b", "title": "Tester", "skills": ["Selenium", 3], "feed": "remotive", "seen_on": 20260102}]
+    opened = JobStore.open(JobStore.from_jobs(records, schema=FEED_SCHEMA).save(str(tmp_path)))
+    assert [dict(row) for row in opened] == records
+
+
+def test_fingerprint_follows_content():
+    changed = [dict(job) for job in JOBS]
+    changed[3]["company"] = "Initech"
+    assert JobStore.from_jobs(JOBS).fingerprint == JobStore.from_jobs([dict(job) for job in JOBS]).fingerprint
+    assert JobStore.from_jobs(changed).fingerprint != JobStore.from_jobs(JOBS).fingerprint
+
+
+def test_other_layout_version_is_not_opened(tmp_path):
+    path = JobStore.from_jobs(JOBS).save(str(tmp_path))
+    meta_path = os.path.join(path, "meta.json")
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    meta["version"] = job_store.STORE_VERSION - 1
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    assert JobStore.open(path) is None
+    assert open_latest_store(root=str(tmp_path)) is None
+
+
+def test_resave_restamps_store(tmp_path):
+    path = JobStore.from_jobs(JOBS, source="feed-1").save(str(tmp_path))
+    age(path, 3600)
+    again = JobStore.from_jobs(JOBS, source="feed-2")
+    assert again.save(str(tmp_path)) == path
+    latest = open_latest_store(max_age=60, root=str(tmp_path))
+    assert latest.source == "feed-2" and latest.created_at == again.created_at
+
+
+def test_prune_keeps_newest_stores(tmp_path):
+    root = str(tmp_path)
+    paths = []
+    for count in range(1, job_store.STORES_TO_KEEP + 2):
+        for path in paths:
+            age(path, 60)
+        paths.append(JobStore.from_jobs(JOBS[:count]).save(root))
+    assert sorted(glob.glob(os.path.join(root, "*"))) == sorted(paths[1:])
+    assert len(open_latest_store(root=root)) == len(paths)
+
+
+def test_open_latest_store_respects_max_age(tmp_path):
+    JobStore.from_jobs(JOBS, source="feed-1").save(str(tmp_path))
+    assert open_latest_store(max_age=60, root=str(tmp_path)) is not None
+    assert open_latest_store(max_age=0, root=str(tmp_path)) is None
+    assert open_latest_store(root=str(tmp_path / "missing")) is None
+
+
+def test_indexes_keep_row_arrays_over_store(tmp_path):
+    store = JobStore.open(JobStore.from_jobs(JOBS).save(str(tmp_path)))
+    job_index = JobIndex(str.lower, TfidfVectorizer)
+    job_index.build(store)
+    skill_index = SkillIndex(store)
+
+    for index in (job_index, skill_index):
+        assert index.keys.dtype == np.uint64 and len(index.keys) == len(JOBS)
+        assert index.positions.tolist() == list(range(len(JOBS)))
+    assert job_index.hashes.dtype == np.uint64
+    assert skill_index.skill_ids.dtype == np.int32 and skill_index.skill_offsets[-1] == len(skill_index.skill_ids)
+    assert skill_index.required.tolist() == [2, 2, 0, 3]
+
+    # Rows read back from the store and answer like the job dicts do
+    from_dicts = SkillIndex(JOBS)
+    resume = ["python", "SQL", "Kubernetes"]
+    assert skill_index.match_counts(resume).tolist() == from_dicts.match_counts(resume).tolist() == [2, 0, 0, 2]
+    assert skill_index.compare(4, resume) == (["python", "sql"], ["spark"])
+    assert skill_index.find_by_title("data  ENGINEER")["id"] == "1"
+    assert dict(job_index.jobs[job_index.row_for(2)]) == JOBS[1]
+    shares = job_index.scatter(skill_index.keys, skill_index.match_shares(skill_index.match_counts(resume)))
+    assert np.allclose(shares, [1.0, 0.0, 0.0, 2 / 3])
+
+
+def test_update_rebinds_rows_to_new_feed(tmp_path):
+    store = JobStore.open(JobStore.from_jobs(JOBS).save(str(tmp_path / "a")))
+    index = JobIndex(str.lower, TfidfVectorizer)
+    index.build(store)
+
+    # Job 1 leaves, job 3 changes, job 5 arrives; the rest keep their rows at new positions
+    jobs = [dict(job) for job in JOBS[1:]] + [{"id": "5", "title": "QA Engineer", "description": "test plans",
+                                                 "required_skills": ["Selenium"]}]
+    jobs[1]["description"] = "kotlin apps"
+    fresh = JobStore.open(JobStore.from_jobs(jobs).save(str(tmp_path / "b")))
+    counts = index.update(fresh, {"3", "5"})
+
+    assert counts == {"added": 1, "changed": 1, "removed": 1, "rebuilt": counts["rebuilt"]}
+    assert len(index) == len(jobs)
+    assert sorted(str(job["id"]) for job in index.live_jobs()) == sorted(str(job["id"]) for job in jobs)
+    for job in jobs:
+        row = index.row_for(job["id"])
+        assert dict(index.jobs[row]) == job
+    assert index.row_for("1") is None
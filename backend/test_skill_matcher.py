@@ -0,0 +1,22 @@
+"""Skill matcher regression checks (run with pytest from backend/)"""
+from utils.skill_matcher import SkillMatcher, load_taxonomy
+
+matcher = SkillMatcher(load_taxonomy())
+
+
+def test_capitals_run_skips_initials():
+    assert matcher.find_skills("MANI CHARAN REDDY R") == []
+    assert matcher.find_skills("SQL, R") == ["SQL", "R"]
+
+
+def test_heading_followed_by_line():
+    assert matcher.find_skills("SKILLS\nRust, Go, Python") == ["Rust", "Go", "Python"]
+    assert matcher.find_skills("TECHNICAL SKILLS\nR and SQL") == ["R", "SQL"]
+    assert matcher.find_skills("SKILLS \r\nC") == ["C"]
+
+
+def test_phrase_ends_at_separator():
+    assert matcher.find_skills("Tools: AWS, EC2") == ["AWS", "Amazon EC2"]
+    assert matcher.find_skills("Experience with AWS (EC2, S3)") == ["AWS", "Amazon EC2", "Amazon S3"]
+    assert matcher.find_skills("Machine\nLearning") == []
+    assert matcher.find_skills("machine-learning and CI / CD") == ["Machine Learning", "CI/CD"]
@@ -0,0 +1,22 @@
+"""Skill normalizer regression checks (run with pytest from backend/)"""
+from utils.skill_normalizer import build_skill_normalizer, normalizer_key
+
+normalizer = build_skill_normalizer()
+
+
+def test_short_words_need_exact_spelling():
+    assert normalizer.normalize("Scalar") is None
+    assert normalizer.normalize("Scala") == "Scala"
+
+
+def test_longer_typos_resolve():
+    assert normalizer.normalize("Pytorh") == "PyTorch"
+    assert normalizer.normalize("NodeJS") == "Node.js"
+
+
+def test_key_follows_taxonomy(tmp_path):
+    first, second = tmp_path / "first.json", tmp_path / "second.json"
+    first.write_text('{"skills": [{"name": "Python", "aliases": []}]}')
+    second.write_text('{"skills": [{"name": "Python", "aliases": ["py"]}]}')
+    assert normalizer_key(str(first)) == normalizer_key(str(first))
+    assert normalizer_key(str(first)) != normalizer_key(str(second))
@@ -1,70 +1,300 @@
 import json
 import sys
 import os
+import time
 # Add the parent directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import PyPDF2
-import docx
 import re
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
-import numpy as np
-from utils.real_time_data import RealTimeDataFetcher
+from utils.job_ingest import job_key
+from utils.real_time_data import RealTimeDataFetcher, set_refresh_mode
+from utils.resume_sections import segment_sections, section_text, SectionTracker
+from utils.pdf_text import extract_pdf_text, set_cpu_share
+from utils.docx_text import extract_docx_text
+from utils.nlp_pipelines import run_pipeline, pipe_pipeline
 
-# Load spaCy model
-nlp = spacy.load("en_core_web_sm")
+# Heavy dependencies (PDF reader, NLTK, spaCy, scikit-learn) are loaded
+# on first use, so each operation only pays for the components it needs.
+_components = {}
+startup_timings = []
+
+def _load_nltk():
+    import nltk
+    return nltk
+
+def _load_stopwords():
+    from nltk.corpus import stopwords
+    return set(stopwords.words('english'))
+
+def _load_lemmatizer():
+    from nltk.stem import WordNetLemmatizer
+    return WordNetLemmatizer()
+
+def _load_spacy_model():
+    import spacy
+    return spacy.load("en_core_web_sm")
+
+def _load_sklearn():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.cluster import KMeans
+    return {
+        "TfidfVectorizer": TfidfVectorizer,
+        "KMeans": KMeans
+    }
+
+def _load_pdf_reader():
+    import PyPDF2
+    return PyPDF2
+
+def _load_skill_matcher():
+    from utils.skill_matcher import build_skill_matcher
+    return build_skill_matcher()
+
+def _load_skill_normalizer():
+    from utils.skill_normalizer import build_skill_normalizer
+    return build_skill_normalizer()
+
+_COMPONENT_LOADERS = {
+    "pdf_reader": ("import", _load_pdf_reader),
+    "nltk": ("import", _load_nltk),
+    "stopwords": ("init", _load_stopwords),
+    "lemmatizer": ("init", _load_lemmatizer),
+    "spacy_model": ("init", _load_spacy_model),
+    "sklearn": ("import", _load_sklearn),
+    "skill_matcher": ("init", _load_skill_matcher),
+    "skill_normalizer": ("init", _load_skill_normalizer)
+}
+
+def record_startup(component, kind, seconds):
+    """Record how long a component took to import or initialize"""
+    startup_timings.append({"component": component, "kind": kind, "ms": round(seconds * 1000, 2)})
+
+def load_component(name):
+    """Return a heavy dependency, loading it the first time it is needed"""
+    if name not in _components:
+        kind, loader = _COMPONENT_LOADERS[name]
+        start = time.perf_counter()
+        _components[name] = loader()
+        record_startup(name, kind, time.perf_counter() - start)
+    return _components[name]
+
+def get_nlp():
+    """Return the shared spaCy model"""
+    return load_component("spacy_model")
+
+def word_tokenize(text):
+    """Tokenize text with NLTK"""
+    return load_component("nltk").word_tokenize(text)
+
+def _before_pool_fork():
+    # The pool parent forks workers at any time, so it must not run refreshes on threads
+    set_refresh_mode('process', force=True)
+
+def _after_pool_fork(workers):
+    # Each worker refreshes on its own thread and gets its share of the CPUs for PDF pages
+    set_refresh_mode(os.getenv('AI_ENGINE_REFRESH_MODE', 'thread'), force=True)
+    set_cpu_share(workers)
+
+def feed_jobs_database(raw_jobs, normalizer):
+    """Convert raw feed jobs to our format, with skills in their taxonomy spelling"""
+    jobs_database = []
+    for job in raw_jobs:
+        jobs_database.append({
+            # The corpus key, so change log IDs name the same jobs as the index
+            "id": job["id"] if job.get("id") is not None else job_key(job),
+            "title": job.get("title", "Unknown Position"),
+            "description": job.get("description", ""),
+            "required_skills": normalizer.canonical_skills(job.get("skills", [])),
+            "company": job.get("company", "Unknown Company"),
+            "location": job.get("location", "Unknown Location"),
+            "url": job.get("url", ""),
+            "created_at": job.get("created_at", "")
+        })
+    return jobs_database
+
+def print_startup_report(stream=None):
+    """Print per-component import and init times"""
+    stream = stream or sys.stderr
+    print("Startup report (ms):", file=stream)
+    for timing in startup_timings:
+        print(f"  {timing['component']:<14} {timing['kind']:<7} {timing['ms']:>10.2f}", file=stream)
+    total = sum(timing["ms"] for timing in startup_timings)
+    print(f"  {'total':<14} {'':<7} {total:>10.2f}", file=stream)
+
+# Bump when extraction or parsing changes what parse_resume returns;
+# cached parse results from other versions are discarded. The parse cache
+# is also keyed by the skill taxonomy and normalizer (normalizer_key), which
+# extraction depends on
+PARSER_VERSION = 6
+
+# Seconds between checks for a newer job feed (AI_ENGINE_JOB_REFRESH_SECONDS);
+# the feed itself is refreshed by RealTimeDataFetcher on its own TTLs
+JOB_REFRESH_SECONDS = int(os.getenv('AI_ENGINE_JOB_REFRESH_SECONDS', 60 * 60))
+
+# Patterns used by the section extractors, compiled once
+_BLANK_LINES = re.compile(r'\n\s*\n')
+_EDUCATION_KEYWORDS = re.compile(
+    r'(?i)\b(bachelor|master|phd|degree|university|college|bs|ms|ba|ma|b\.sc|m\.sc|gpa|graduated|diploma)\b'
+)
+_EDUCATION_FALLBACK_PATTERNS = [
+    re.compile(r'(?i)(bachelor|master|phd|b\.s\.|m\.s\.|b\.a\.|m\.a\.|b\.sc|m\.sc).*?(?:university|college|institute)'),
+    re.compile(r'(?i)(university|college|institute).*?(bachelor|master|phd|b\.s\.|m\.s\.|b\.a\.|m\.a\.|b\.sc|m\.sc)'),
+    re.compile(r'(?i)(bs|ms|ba|ma|bsc|msc).*?(?:university|college|institute)'),
+    re.compile(r'(?i)(university|college|institute).*?\d{4}.*?\d{4}')  # Institution with years
+]
+# Noun phrases containing any of these are personal details, not skills
+PERSONAL_INFO_TERMS = (
+    'university', 'college', 'school', 'name', 'email', 'phone', 'address',
+    'street', 'city', 'state', 'zip', 'john', 'doe', 'example', 'gmail', 'com',
+    'senior', 'software', 'engineer', 'developer', 'manager', 'team', 'leader',
+    'experience', 'education', 'project', 'skill', 'bachelor', 'master', 'phd',
+    'bs', 'ms', 'ba', 'ma', 'b.sc', 'm.sc', 'technologies', 'technology',
+    'corporation', 'corp', 'inc', 'ltd', 'company', 'llc', 'international'
+)
+_BULLET_LINE = re.compile(r'^\s*[-*•\d]+\s+')
+_PROJECT_WORDS = re.compile(r'(?i)(project|developed|built|created)')
 
 class AICareerEngine:
     def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
-        self.lemmatizer = WordNetLemmatizer()
-        self.vectorizer = TfidfVectorizer()
         self.data_fetcher = RealTimeDataFetcher()
         
-        # Fetch real-time job data instead of using sample data
-        self.jobs_database = self._fetch_real_time_jobs()
-        
-        # Prepare job descriptions for matching
-        self._prepare_job_data()
+        # Job data and the job index are built on first use
+        self._jobs_database = None
+        self._jobs_fetched_at = 0.0
+        self._feed_generation = 0
+        self.job_index = None
+        self._skill_index = None
+        self._parse_cache = None
+    
+    @property
+    def parse_cache(self):
+        """Cache of parse results keyed by file content, opened on first parse"""
+        if self._parse_cache is None:
+            from utils.parse_cache import ParseCache
+            from utils.skill_normalizer import normalizer_key
+            self._parse_cache = ParseCache(f"{PARSER_VERSION}-{normalizer_key()}")
+        return self._parse_cache
+    
+    @property
+    def stop_words(self):
+        return load_component("stopwords")
+    
+    @property
+    def lemmatizer(self):
+        return load_component("lemmatizer")
+    
+    @property
+    def jobs_database(self):
+        if self._jobs_database is None:
+            start = time.perf_counter()
+            # Fetch real-time job data instead of using sample data
+            self._jobs_database = self._fetch_real_time_jobs()
+            self._jobs_fetched_at = time.time()
+            record_startup("jobs", "init", time.perf_counter() - start)
+        return self._jobs_database
+    
+    @jobs_database.setter
+    def jobs_database(self, jobs):
+        self._set_jobs(jobs)
+    
+    def _set_jobs(self, jobs, changed=None):
+        self._jobs_database = jobs
+        self._jobs_fetched_at = time.time()
+        self._skill_index = None
+        # Only added, changed and removed postings touch the index
+        if self.job_index is not None:
+            self.job_index.update(jobs, changed)
+    
+    @property
+    def skill_index(self):
+        """Title and skill postings for the current jobs, built on first use"""
+        if self._skill_index is None:
+            from utils.skill_index import SkillIndex
+            self._skill_index = SkillIndex(self.jobs_database, load_component("skill_normalizer"))
+        return self._skill_index
+    
+    def _ensure_job_index(self):
+        """Build the job index if it has not been built yet"""
+        if self.job_index is None:
+            start = time.perf_counter()
+            # Prepare job descriptions for matching
+            self._prepare_job_data()
+            record_startup("job_index", "init", time.perf_counter() - start)
+    
+    def refresh_jobs(self):
+        """Fetch the job feed and apply it to the index incrementally"""
+        previous = self._jobs_database
+        jobs = self._fetch_real_time_jobs()
+        # The store fingerprint covers every field, so metadata-only changes are picked up too
+        if jobs.fingerprint == getattr(previous, "fingerprint", None):
+            self._jobs_fetched_at = time.time()
+            return
+        changed = None
+        if previous is not None and self.job_index is not None:
+            if jobs.index_fingerprint == getattr(previous, "index_fingerprint", None):
+                # Only display fields changed; rebind rows without touching any vectors
+                changed = set()
+            else:
+                previous_feed, _, previous_skills = (getattr(previous, "source", None) or "").partition(":")
+                feed, _, skills = (jobs.source or "").partition(":")
+                # The feed's change log names the postings that changed, so the rest are not rehashed,
+                # unless every posting's skills were canonicalized anew
+                changes = None
+                if skills == previous_skills:
+                    changes = self.data_fetcher.changes_since(previous_feed or None, feed)
+                if changes is not None:
+                    changed = changes["added"] | changes["changed"]
+        self._set_jobs(jobs, changed)
+    
+    def _refresh_jobs_if_due(self):
+        """Refresh job data on a schedule, or as soon as a background feed refresh lands"""
+        if self._jobs_database is None:
+            # Not loaded yet; the first access fetches the current feed
+            return
+        if (time.time() - self._jobs_fetched_at >= JOB_REFRESH_SECONDS
+                or self.data_fetcher.generation != self._feed_generation):
+            self.refresh_jobs()
+    
+    def preload(self):
+        """Load every component up front, for long-lived workers"""
+        for name in _COMPONENT_LOADERS:
+            load_component(name)
+        self._ensure_job_index()
+        # NLTK tokenizer models, WordNet and spaCy buffers are loaded on first call
+        self._preprocess_text("warm up the text pipeline")
+        get_nlp()("Warm up the spaCy pipeline.")
+        return self
     
     def _fetch_real_time_jobs(self):
         """Fetch real-time job data from multiple sources"""
+        # Never waits on the sources while a cached feed is within its hard TTL
         raw_jobs = self.data_fetcher.fetch_all_jobs()
+        self._feed_generation = self.data_fetcher.generation
         
-        # Convert raw job data to our format
-        jobs_database = []
-        for i, job in enumerate(raw_jobs):
-            jobs_database.append({
-                "id": job.get("id", i+1),
-                "title": job.get("title", "Unknown Position"),
-                "description": job.get("description", ""),
-                "required_skills": job.get("skills", []),
-                "company": job.get("company", "Unknown Company"),
-                "location": job.get("location", "Unknown Location"),
-                "url": job.get("url", ""),
-                "created_at": job.get("created_at", "")
-            })
+        # A store already derived from this feed, with skills canonicalized by this
+        # taxonomy and normalizer, is memory-mapped instead of rebuilt
+        from utils.job_store import JobStore, open_latest_store
+        from utils.skill_normalizer import normalizer_key
+        source = getattr(raw_jobs, "fingerprint", None)
+        if source:
+            source = f"{source}:{normalizer_key()}"
+            store = open_latest_store()
+            if store is not None and store.source == source:
+                return store
+        
+        jobs_database = feed_jobs_database(raw_jobs, load_component("skill_normalizer"))
         
-        return jobs_database
+        # Columnar and saved for the next process to memory-map
+        store = JobStore.from_jobs(jobs_database, source=source)
+        store.save()
+        return store
     
     def _prepare_job_data(self):
         """Prepare job data for matching"""
-        job_texts = []
-        for job in self.jobs_database:
-            # Combine title, description, and skills
-            text = f"{job['title']} {job['description']} {' '.join(job['required_skills'])}"
-            job_texts.append(self._preprocess_text(text))
-        
-        # Fit vectorizer on job texts
-        self.job_vectors = self.vectorizer.fit_transform(job_texts)
+        from utils.job_index import JobIndex
+        self.job_index = JobIndex(self._preprocess_text, load_component("sklearn")["TfidfVectorizer"])
+        # Loads the snapshot of a previous process if the jobs are unchanged
+        self.job_index.build(self.jobs_database)
     
     def _preprocess_text(self, text):
         """Preprocess text for analysis"""
@@ -78,30 +308,26 @@ class AICareerEngine:
         tokens = word_tokenize(text)
         
         # Remove stopwords and lemmatize
-        tokens = [self.lemmatizer.lemmatize(token) for token in tokens if token not in self.stop_words]
+        stop_words = self.stop_words
+        lemmatizer = self.lemmatizer
+        tokens = [lemmatizer.lemmatize(token) for token in tokens if token not in stop_words]
         
         return ' '.join(tokens)
     
     def extract_text_from_pdf(self, file_path):
         """Extract text from PDF file"""
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-                return text
+            # Bounded extraction that stops once every section has been seen
+            return extract_pdf_text(file_path, stop_when=SectionTracker().feed,
+                                    pdf_module=load_component("pdf_reader"))
         except Exception as e:
             raise Exception(f"Error extracting text from PDF: {e}")
     
     def extract_text_from_docx(self, file_path):
         """Extract text from DOCX file"""
         try:
-            doc = docx.Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            # Streams the XML parts; includes tables, headers and footers
+            return extract_docx_text(file_path)
         except Exception as e:
             raise Exception(f"Error extracting text from DOCX: {e}")
     
@@ -131,251 +357,119 @@ class AICareerEngine:
             "phones": phones
         }
     
-    def extract_experience(self, text):
+    def segment_sections(self, text):
+        """Index resume sections in one pass as {name: (start, end)} spans"""
+        return segment_sections(text)
+    
+    def extract_experience(self, text, sections=None):
         """Extract experience information from text"""
-        # Look for experience section
-        experience_patterns = [
-            r'(?i)work experience[:\n\s]*([\s\S]*?)(?=\n\n|\n[A-Z][a-z]+:|$)',
-            r'(?i)experience[:\n\s]*([\s\S]*?)(?=\n\n|\n[A-Z][a-z]+:|$)',
-            r'(?i)professional experience[:\n\s]*([\s\S]*?)(?=\n\n|\n[A-Z][a-z]+:|$)',
-            r'(?i)employment[:\n\s]*([\s\S]*?)(?=\n\n|\n[A-Z][a-z]+:|$)'
-        ]
-        
-        for pattern in experience_patterns:
-            match = re.search(pattern, text)
-            if match:
-                experience_text = match.group(1).strip()
-                # Clean up the text
-                experience_text = re.sub(r'\n\s*\n', '\n', experience_text)
-                return experience_text
+        if sections is None:
+            sections = self.segment_sections(text)
         
-        # If no specific section found, return a portion of text that might contain experience
-        lines = text.split('\n')
-        experience_lines = []
-        in_experience_section = False
+        experience_text = section_text(text, sections, 'experience')
+        if experience_text:
+            # Clean up the text
+            return _BLANK_LINES.sub('\n', experience_text)
         
-        for line in lines:
-            if re.search(r'(?i)(experience|employment|work)', line):
-                in_experience_section = True
-                continue
-            elif in_experience_section and re.search(r'(?i)(education|skills|objective)', line):
-                break
-            elif in_experience_section:
-                experience_lines.append(line)
-        
-        return '\n'.join(experience_lines).strip() if experience_lines else "Experience details would be extracted from resume"
+        return "Experience details would be extracted from resume"
     
-    def extract_education(self, text):
+    def extract_education(self, text, sections=None):
         """Extract education information from text"""
-        # Look for education section
-        education_patterns = [
-            r'(?i)education[:\n\s]*([\s\S]*?)(?=\n\n|\n[A-Z][a-z]+:|$)',
-            r'(?i)academic background[:\n\s]*([\s\S]*?)(?=\n\n|\n[A-Z][a-z]+:|$)',
-            r'(?i)qualifications[:\n\s]*([\s\S]*?)(?=\n\n|\n[A-Z][a-z]+:|$)',
-            r'(?i)degrees[:\n\s]*([\s\S]*?)(?=\n\n|\n[A-Z][a-z]+:|$)'
-        ]
+        if sections is None:
+            sections = self.segment_sections(text)
         
-        for pattern in education_patterns:
-            match = re.search(pattern, text)
-            if match:
-                education_text = match.group(1).strip()
-                # Clean up the text
-                education_text = re.sub(r'\n\s*\n', '\n', education_text)
-                # Remove common section headers that might appear
-                education_text = re.sub(r'(?i)^(education|academic background|qualifications|degrees)\s*:?', '', education_text, flags=re.MULTILINE)
-                return education_text.strip()
+        education_text = section_text(text, sections, 'education')
+        if education_text:
+            # Clean up the text
+            return _BLANK_LINES.sub('\n', education_text)
         
-        # If no specific section found, look for patterns that indicate education
-        lines = text.split('\n')
-        education_lines = []
-        in_education_section = False
-        education_section_started = False
-        
-        education_keywords = ['bachelor', 'master', 'phd', 'degree', 'university', 'college', 'bs', 'ms', 'ba', 'ma', 'b.sc', 'm.sc', 'gpa', 'graduated', 'diploma']
-        
-        for line in lines:
-            # Check if this line starts an education section
-            if re.search(r'(?i)(education|academic|qualifications|degrees)', line):
-                in_education_section = True
-                education_section_started = True
-                continue
-            # Check if this line ends the education section
-            elif in_education_section and re.search(r'(?i)(experience|skills|work|employment|objective|summary|projects|references)', line):
-                if education_lines and education_section_started:  # Only break if we've collected some education lines and started the section
-                    break
-                else:
-                    in_education_section = False  # Reset and continue looking
-                    continue
-            # If we're in the education section or the line contains education keywords
-            elif in_education_section or any(keyword in line.lower() for keyword in education_keywords):
-                # Skip lines that are clearly section headers
-                if not re.match(r'(?i)^(experience|skills|work|employment|objective|summary|projects|references)\s*:?', line.strip()):
-                    education_lines.append(line)
-        
-        # If we have education lines, join them
+        # If no education section, collect lines that mention degrees or institutions
+        education_lines = [line for line in text.split('\n') if _EDUCATION_KEYWORDS.search(line)]
         if education_lines:
-            result = '\n'.join(education_lines).strip()
-            return result
+            return '\n'.join(education_lines).strip()
         
-        # Fallback to the original method
-        result = "Education details would be extracted from resume"
-        return result if result != "Education details would be extracted from resume" else self._extract_education_fallback(text)
+        return self._extract_education_fallback(text)
     
     def _extract_education_fallback(self, text):
         """Fallback method to extract education information"""
-        # Look for common education patterns
-        education_patterns = [
-            r'(?i)(bachelor|master|phd|b\.s\.|m\.s\.|b\.a\.|m\.a\.|b\.sc|m\.sc).*?(?:university|college|institute)',
-            r'(?i)(university|college|institute).*?(bachelor|master|phd|b\.s\.|m\.s\.|b\.a\.|m\.a\.|b\.sc|m\.sc)',
-            r'(?i)(bs|ms|ba|ma|bsc|msc).*?(?:university|college|institute)',
-            r'(?i)(university|college|institute).*?\d{4}.*?\d{4}'  # Institution with years
-        ]
-        
         found_education = []
-        for pattern in education_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                # Reconstruct the full match
-                if isinstance(match, tuple):
-                    full_match = ' '.join(match).strip()
-                else:
-                    full_match = match.strip()
-                found_education.append(full_match)
+        for pattern in _EDUCATION_FALLBACK_PATTERNS:
+            for match in pattern.finditer(text):
+                found_education.append(match.group(0).strip())
         
         return '\n'.join(list(set(found_education))) if found_education else "Education details would be extracted from resume"
 
-    def extract_projects(self, text):
+    def extract_projects(self, text, sections=None):
         """Extract project information from text"""
-        # Look for projects section
-        project_patterns = [
-            r'(?i)projects[:\n\s]*([\s\S]*?)(?=\n\n|\n[A-Z][a-z]+:|$)',
-            r'(?i)project experience[:\n\s]*([\s\S]*?)(?=\n\n|\n[A-Z][a-z]+:|$)',
-            r'(?i)key projects[:\n\s]*([\s\S]*?)(?=\n\n|\n[A-Z][a-z]+:|$)'
-        ]
+        if sections is None:
+            sections = self.segment_sections(text)
         
-        for pattern in project_patterns:
-            match = re.search(pattern, text)
-            if match:
-                projects_text = match.group(1).strip()
-                # Clean up the text
-                projects_text = re.sub(r'\n\s*\n', '\n\n', projects_text)  # Double newline for project separation
-                # Remove common section headers that might appear
-                projects_text = re.sub(r'(?i)^(projects|project experience|key projects)\s*:?', '', projects_text, flags=re.MULTILINE)
-                return projects_text.strip()
+        projects_text = section_text(text, sections, 'projects')
+        if projects_text:
+            # Double newline for project separation
+            return _BLANK_LINES.sub('\n\n', projects_text)
         
-        # If no specific section found, look for bullet points or numbered lists that might contain projects
-        lines = text.split('\n')
-        project_lines = []
-        in_project_section = False
-        project_section_started = False
-        
-        for line in lines:
-            # Check if this line starts a project section
-            if re.search(r'(?i)(projects|project experience|key projects)', line):
-                in_project_section = True
-                project_section_started = True
-                continue
-            # Check if this line ends the project section
-            elif in_project_section and re.search(r'(?i)(education|skills|experience|work|employment)', line):
-                if project_lines and project_section_started:  # Only break if we've collected some project lines and started the section
-                    break
-                else:
-                    in_project_section = False  # Reset and continue looking
-                    continue
-            # If we're in the project section, collect lines
-            elif in_project_section:
-                # Skip lines that are clearly section headers
-                if not re.match(r'(?i)^(education|skills|experience|work|employment|objective|summary|references)\s*:?', line.strip()):
-                    project_lines.append(line)
-            # Also look for bullet points or lines that might indicate projects even outside a projects section
-            elif re.search(r'^\s*[-*•\d]+\s+', line) or re.search(r'(?i)(project|developed|built|created)', line):
-                # Check if this looks like a project description
-                if len(line.strip()) > 10:  # Only consider lines with substantial content
-                    project_lines.append(line)
+        # If no projects section, look for bullet points or lines that describe projects
+        project_lines = [
+            line for line in text.split('\n')
+            if len(line.strip()) > 10 and (_BULLET_LINE.match(line) or _PROJECT_WORDS.search(line))
+        ]
         
         result = '\n'.join(project_lines).strip() if project_lines else "Project details would be extracted from resume"
         return result
 
-    def extract_skills(self, text):
-        """Extract skills from text using NLP"""
-        # Common tech skills (this should be expanded)
-        common_skills = [
-            'python', 'java', 'javascript', 'react', 'node.js', 'html', 'css', 'sql', 
-            'mongodb', 'postgresql', 'docker', 'kubernetes', 'aws', 'azure', 'gcp',
-            'machine learning', 'data science', 'tensorflow', 'pytorch', 'pandas',
-            'numpy', 'scikit-learn', 'flask', 'django', 'spring', 'angular', 'vue.js',
-            'git', 'jenkins', 'ansible', 'terraform', 'linux', 'bash', 'c++', 'c#',
-            'php', 'ruby', 'swift', 'kotlin', 'scala', 'go', 'rust', 'r', 'matlab',
-            'excel', 'tableau', 'power bi', 'hadoop', 'spark', 'kafka', 'redis',
-            'elasticsearch', 'nginx', 'apache', 'mysql', 'oracle', 'firebase',
-            'graphql', 'rest api', 'microservices', 'devops', 'agile', 'scrum'
-        ]
+    def extract_skills(self, text, doc=None):
+        """Extract skills from text using the skill taxonomy and NLP
+
+        `doc` is the noun-chunk doc for `text.lower()` when the caller already
+        has one, e.g. from a batched pipe_pipeline run.
+        """
+        # Taxonomy skills, found in one pass over the text
+        found_skills = load_component("skill_matcher").find_skills(text)
+        seen = {skill.lower() for skill in found_skills}
         
         # Process text with spaCy
-        doc = nlp(text.lower())
-        
-        # Extract noun phrases that might be skills
-        noun_phrases = [chunk.text for chunk in doc.noun_chunks]
+        if doc is None:
+            doc = run_pipeline(get_nlp(), text.lower(), "noun_chunks")
         
-        # Combine with common skills
-        all_potential_skills = common_skills + noun_phrases
-        
-        # Tokenize and clean the text
-        tokens = word_tokenize(text.lower())
-        filtered_tokens = [word for word in tokens if word.isalnum() and word not in self.stop_words]
-        
-        # Find matching skills
-        found_skills = []
-        for skill in all_potential_skills:
-            if skill in text.lower() or skill in filtered_tokens:
-                # Avoid duplicates and clean up
-                skill_clean = skill.strip().title()
-                # Filter out personal information and non-skill terms
-                personal_info_terms = [
-                    'university', 'college', 'school', 'name', 'email', 'phone', 'address', 
-                    'street', 'city', 'state', 'zip', 'john', 'doe', 'example', 'gmail', 'com',
-                    'senior', 'software', 'engineer', 'developer', 'manager', 'team', 'leader',
-                    'experience', 'education', 'project', 'skill', 'bachelor', 'master', 'phd',
-                    'bs', 'ms', 'ba', 'ma', 'b.sc', 'm.sc', 'technologies', 'technology',
-                    'corporation', 'corp', 'inc', 'ltd', 'company', 'llc', 'international'
-                ]
-                
-                # Check if the skill contains any personal info terms
-                contains_personal_info = any(term in skill_clean.lower() for term in personal_info_terms)
-                
-                # Only add if it's a valid skill and not already added
-                if (skill_clean not in found_skills and 
-                    len(skill_clean) > 1 and 
-                    not contains_personal_info and
-                    skill_clean.replace(' ', '').isalnum()):
-                    found_skills.append(skill_clean)
+        # Noun phrases that might be skills the taxonomy does not know yet;
+        # known spellings ("Node Js") are mapped to their taxonomy name. Only
+        # exact aliases here, since ordinary words sit one typo from skill names
+        normalizer = load_component("skill_normalizer")
+        for chunk in doc.noun_chunks:
+            phrase = chunk.text.strip().title()
+            canonical = normalizer.normalize(phrase, fuzzy=False)
+            skill_clean = canonical or phrase
+            skill_lower = skill_clean.lower()
+            if skill_lower in seen:
+                continue
+            # Taxonomy names are skills as spelled ("Node.js", "C++"); other
+            # phrases only if they look like one and are not personal details
+            if canonical or (len(skill_clean) > 1 and
+                             skill_clean.replace(' ', '').isalnum() and
+                             not any(term in skill_lower for term in PERSONAL_INFO_TERMS)):
+                seen.add(skill_lower)
+                found_skills.append(skill_clean)
         
         return found_skills[:20]  # Limit to top 20 skills
     
     def calculate_match_score(self, resume_skills, job_title):
         """Calculate match score between resume skills and a specific job"""
+        # A long-lived worker follows the feed for every operation that reads jobs
+        self._refresh_jobs_if_due()
+        
         # Find the job in database
-        target_job = None
-        for job in self.jobs_database:
-            if job['title'].lower() == job_title.lower():
-                target_job = job
-                break
+        skill_index = self.skill_index
+        target_job = skill_index.find_by_title(job_title)
         
         if not target_job:
             return {"error": f"Job title '{job_title}' not found in database"}
         
         # Calculate skill overlap
-        resume_skills_lower = [skill.lower() for skill in resume_skills]
-        job_skills_lower = [skill.lower() for skill in target_job['required_skills']]
-        
-        matching_skills = set(resume_skills_lower) & set(job_skills_lower)
-        missing_skills = set(job_skills_lower) - set(resume_skills_lower)
+        matching_skills, missing_skills = skill_index.compare(target_job['id'], resume_skills)
         
         # Calculate match percentage
-        if len(job_skills_lower) > 0:
-            match_percentage = (len(matching_skills) / len(job_skills_lower)) * 100
-        else:
-            match_percentage = 0
+        match_percentage = skill_index.match_percentage(target_job['id'], len(matching_skills))
         
         # Get salary data
         salary_data = self.data_fetcher.get_salary_data(job_title, target_job.get('location', ''))
@@ -386,47 +480,35 @@ class AICareerEngine:
             "location": target_job.get('location', ''),
             "url": target_job.get('url', ''),
             "match_score": round(match_percentage, 2),
-            "matching_skills": list(matching_skills),
-            "missing_skills": list(missing_skills),
-            "total_required_skills": len(job_skills_lower),
+            "matching_skills": matching_skills,
+            "missing_skills": missing_skills,
+            "total_required_skills": skill_index.required_count(target_job['id']),
             "salary_data": salary_data
         }
     
     def get_job_recommendations(self, resume_skills, top_n=5):
         """Get job recommendations based on resume skills"""
         # Refresh job data periodically
-        self.jobs_database = self._fetch_real_time_jobs()
-        self._prepare_job_data()
+        self._ensure_job_index()
+        self._refresh_jobs_if_due()
         
         # Create a text representation of resume skills
         resume_text = ' '.join(resume_skills)
         resume_text_processed = self._preprocess_text(resume_text)
         
-        # Vectorize resume text
-        resume_vector = self.vectorizer.transform([resume_text_processed])
+        # Skill overlap with every job, as one popcount over the skill bitsets
+        skill_index = self.skill_index
+        match_counts = skill_index.match_counts(resume_skills)
         
-        # Calculate cosine similarity with all jobs
-        similarities = cosine_similarity(resume_vector, self.job_vectors)
-        
-        # Get top recommendations
-        top_indices = similarities.argsort()[0][-top_n:][::-1]
+        # Ranked by BM25 blended with the skill-overlap share (see bm25_index)
+        skill_scores = self.job_index.scatter(skill_index.keys, skill_index.match_shares(match_counts))
         
         recommendations = []
-        for idx in top_indices:
-            job = self.jobs_database[idx]
-            similarity_score = similarities[0][idx]
-            
-            # Calculate skill overlap for this job
-            resume_skills_lower = [skill.lower() for skill in resume_skills]
-            job_skills_lower = [skill.lower() for skill in job['required_skills']]
-            
-            matching_skills = set(resume_skills_lower) & set(job_skills_lower)
+        for job, similarity_score in self.job_index.top_jobs(resume_text_processed, top_n, skill_scores):
             
             # Calculate match percentage
-            if len(job_skills_lower) > 0:
-                match_percentage = (len(matching_skills) / len(job_skills_lower)) * 100
-            else:
-                match_percentage = 0
+            matching_count = int(match_counts[skill_index.row_for(job['id'])])
+            match_percentage = skill_index.match_percentage(job['id'], matching_count)
             
             # Get salary data
             salary_data = self.data_fetcher.get_salary_data(job['title'], job.get('location', ''))
@@ -439,13 +521,27 @@ class AICareerEngine:
                 "url": job.get("url", ""),
                 "match_score": round(match_percentage, 2),
                 "similarity_score": round(similarity_score * 100, 2),
-                "matching_skills_count": len(matching_skills),
-                "total_required_skills": len(job_skills_lower),
+                "matching_skills_count": matching_count,
+                "total_required_skills": skill_index.required_count(job['id']),
                 "salary_data": salary_data
             })
         
         return recommendations
     
+    def score_matrix(self, resumes, options=None):
+        """Score many resumes (skill lists) against every job in one batch
+        
+        options: top_k (default 5), rank_by ('similarity' or 'match') and
+        output, a path prefix to write the full matrices to instead.
+        """
+        from utils.score_matrix import score_matrix
+        options = options or {}
+        self._ensure_job_index()
+        self._refresh_jobs_if_due()
+        return score_matrix(self.job_index, self.skill_index, self._preprocess_text, resumes,
+                            top_k=options.get("top_k", 5), output=options.get("output"),
+                            rank_by=options.get("rank_by", "similarity"))
+    
     def get_trending_skills(self):
         """Get trending skills from real-time data"""
         return self.data_fetcher.get_trending_skills()
@@ -482,7 +578,8 @@ class AICareerEngine:
             
             # Create a TF-IDF vectorizer for skill similarity analysis
             all_skills = list(skill_progression_map.keys()) + [skill['skill'].lower() for skill in trending_skills]
-            vectorizer = TfidfVectorizer()
+            sklearn = load_component("sklearn")
+            vectorizer = sklearn["TfidfVectorizer"]()
             
             # Fit the vectorizer on all skills
             try:
@@ -523,7 +620,7 @@ class AICareerEngine:
                 try:
                     # Apply K-means clustering to group similar skills
                     n_clusters = min(3, len(all_skills))
-                    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+                    kmeans = sklearn["KMeans"](n_clusters=n_clusters, random_state=42)
                     clusters = kmeans.fit_predict(tfidf_matrix)
                     
                     # For each current skill, find cluster and suggest skills from same cluster
@@ -704,8 +801,8 @@ class AICareerEngine:
             
             # Use NLP to analyze experience text and generate custom questions
             if experience:
-                # Process experience with spaCy
-                doc = nlp(experience)
+                # Process experience with spaCy (entities only)
+                doc = run_pipeline(get_nlp(), experience, "entities")
                 
                 # Extract key entities (organizations, dates, etc.)
                 orgs = [ent.text for ent in doc.ents if ent.label_ in ['ORG', 'GPE']]
@@ -823,15 +920,6 @@ class AICareerEngine:
             
             # Get trending skills and job data for context
             trending_skills = self.get_trending_skills()
-            job_data = self.jobs_database
-            
-            # Process user query with spaCy
-            doc = nlp(user_query.lower())
-            
-            # Identify key entities and intent
-            entities = [ent.text for ent in doc.ents]
-            nouns = [token.text for token in doc if token.pos_ == 'NOUN']
-            verbs = [token.text for token in doc if token.pos_ == 'VERB']
             
             # Keywords for different intents
             learning_keywords = ['learn', 'skill', 'course', 'study', 'education', 'improve', 'develop']
@@ -860,8 +948,9 @@ class AICareerEngine:
                 # Project suggestions
                 response = self._generate_project_suggestions(user_query, skills, projects)
             elif intent == 'career':
-                # Career advice
-                response = self._generate_career_advice(user_query, skills, experience, job_data)
+                # Career advice, from the current jobs
+                self._refresh_jobs_if_due()
+                response = self._generate_career_advice(user_query, skills, experience, self.skill_index)
             elif intent == 'resource':
                 # Resource recommendations
                 response = self._generate_resource_recommendations(user_query, skills)
@@ -972,24 +1061,15 @@ class AICareerEngine:
         else:
             return "I'd be happy to suggest projects! Could you tell me more about what specific skills you'd like to showcase or what type of project interests you?"
     
-    def _generate_career_advice(self, query, skills, experience, job_data):
+    def _generate_career_advice(self, query, skills, experience, skill_index):
         """Generate career advice based on user profile"""
-        # Analyze skills match with job data
-        skill_matches = {}
-        for job in job_data[:10]:  # Top 10 jobs
-            match_count = 0
-            for skill in skills:
-                if skill.lower() in ' '.join(job.get('required_skills', [])).lower():
-                    match_count += 1
-            if match_count > 0:
-                skill_matches[job['title']] = match_count
+        # Exact skill overlap with every job; the first job with the most matches wins
+        match_counts = skill_index.match_counts(skills)
         
-        # Sort jobs by match count
-        sorted_matches = sorted(skill_matches.items(), key=lambda x: x[1], reverse=True)
-        
-        if sorted_matches:
-            best_match = sorted_matches[0][0]
-            match_count = sorted_matches[0][1]
+        if len(match_counts) and match_counts.max() > 0:
+            best_row = int(match_counts.argmax())
+            best_match = skill_index.job(best_row)['title']
+            match_count = int(match_counts[best_row])
             return f"Based on your skills, you're well-suited for roles like {best_match}. You match {match_count} required skills for this position. To strengthen your profile, consider gaining experience in the remaining required skills. Your current experience in '{experience[:100]}...' shows good foundation. Would you like specific advice on transitioning to {best_match}?"
         else:
             return "Your skill set is quite unique! To enhance your career prospects, consider specializing in a specific domain or acquiring skills that are in high demand. Based on your experience '{experience[:100]}...', you might want to explore roles that value diverse skill sets."
@@ -1067,27 +1147,27 @@ class AICareerEngine:
         
         return f"{profile_summary}Here's some general advice: {advice[0]} {advice[1]} {advice[2]} {advice[3]} {advice[4]} Would you like more specific guidance on any particular aspect of your career development?"
 
-    def parse_resume(self, file_path, file_type):
-        """Main function to parse resume"""
+    def extract_text(self, file_path, file_type):
+        """Extract raw text from a resume file"""
         # Extract text based on file type
         if file_type == 'pdf':
-            text = self.extract_text_from_pdf(file_path)
+            return self.extract_text_from_pdf(file_path)
         elif file_type == 'docx':
-            text = self.extract_text_from_docx(file_path)
+            return self.extract_text_from_docx(file_path)
         else:
             # For text files
             with open(file_path, 'r', encoding='utf-8') as file:
-                text = file.read()
-        
-        if not text:
-            return {"error": "Failed to extract text from file"}
-        
+                return file.read()
+    
+    def parse_text(self, text, doc=None):
+        """Extract resume fields from already extracted text"""
         # Extract information
+        sections = self.segment_sections(text)
         contact_info = self.extract_contact_info(text)
-        skills = self.extract_skills(text)
-        experience = self.extract_experience(text)
-        education = self.extract_education(text)
-        projects = self.extract_projects(text)
+        skills = self.extract_skills(text, doc)
+        experience = self.extract_experience(text, sections)
+        education = self.extract_education(text, sections)
+        projects = self.extract_projects(text, sections)
         
         return {
             "contact_info": contact_info,
@@ -1096,6 +1176,70 @@ class AICareerEngine:
             "education": education,
             "projects": projects
         }
+    
+    def parse_texts(self, texts, batch_size=16):
+        """Parse several resume texts, running spaCy over them in batches"""
+        docs = pipe_pipeline(get_nlp(), (text.lower() for text in texts), "noun_chunks", batch_size)
+        return [self.parse_text(text, doc) for text, doc in zip(texts, docs)]
+    
+    def parse_resume(self, file_path, file_type):
+        """Main function to parse resume"""
+        # Re-uploads of the same file are answered from the cache
+        try:
+            cache_key = self.parse_cache.key_for(file_path, file_type)
+        except OSError:
+            # Unreadable files are reported by extraction below
+            cache_key = None
+        if cache_key:
+            cached = self.parse_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        text = self.extract_text(file_path, file_type)
+        
+        if not text:
+            return {"error": "Failed to extract text from file"}
+        
+        result = self.parse_text(text)
+        if cache_key:
+            self.parse_cache.put(cache_key, result)
+        return result
+
+def run_operation(engine, operation, args):
+    """Run a single engine operation with already-decoded arguments"""
+    if operation == "parse" and len(args) >= 2:
+        return engine.parse_resume(args[0], args[1])
+    elif operation == "match" and len(args) >= 2:
+        return engine.calculate_match_score(args[0], args[1])
+    elif operation == "recommend" and len(args) >= 1:
+        return engine.get_job_recommendations(args[0])
+    elif operation == "trending":
+        return engine.get_trending_skills()
+    elif operation == "predict_future" and len(args) >= 1:
+        return engine.predict_future_skills_ml(args[0])
+    elif operation == "predict_questions" and len(args) >= 1:
+        return engine.predict_interview_questions(args[0])
+    elif operation == "ai_mentor" and len(args) >= 2:
+        return engine.get_ai_mentor_response(args[0], args[1])
+    elif operation == "score_matrix" and len(args) >= 1:
+        return engine.score_matrix(args[0], args[1] if len(args) > 1 else None)
+    raise ValueError("Invalid operation or arguments")
+
+def _decode_cli_args(operation, argv):
+    """Decode command line arguments, which carry lists and objects as JSON strings"""
+    json_positions = {
+        "match": [0],
+        "recommend": [0],
+        "predict_future": [0],
+        "predict_questions": [0],
+        "ai_mentor": [1],
+        "score_matrix": [0, 1]
+    }
+    args = list(argv)
+    for position in json_positions.get(operation, []):
+        if position < len(args):
+            args[position] = json.loads(args[position])
+    return args
 
 # Main execution when called from command line
 if __name__ == "__main__":
@@ -1103,42 +1247,46 @@ if __name__ == "__main__":
         print(json.dumps({"error": "Usage: python ai_career_engine.py <operation> [args]"}))
         sys.exit(1)
     
-    operation = sys.argv[1]
+    # --startup-report prints per-component import/init times to stderr
+    argv = sys.argv[1:]
+    startup_report = "--startup-report" in argv
+    if startup_report:
+        argv.remove("--startup-report")
+    
+    operation = argv[0]
+    
+    if operation == "parse-batch":
+        # Parse a directory or glob of resumes across a process pool, as JSON lines
+        from utils.resume_batch import batch_main
+        sys.exit(batch_main(argv[1:]))
+    
+    if operation == "ann-report":
+        # Recall@k and latency of approximate job retrieval against brute force
+        from utils.ann_index import report_main
+        sys.exit(report_main(argv[1:], AICareerEngine()))
+    
+    if operation == "bm25-report":
+        # MaxScore top-k against exhaustive BM25 scoring
+        from utils.bm25_index import report_main
+        sys.exit(report_main(argv[1:], AICareerEngine()))
+    
+    if operation == "serve":
+        # Long-lived worker: build the engine once and answer framed requests
+        from utils.engine_server import serve_main
+        # A worker outlives its refreshes, so they run on a thread
+        set_refresh_mode('thread')
+        serve_main(argv[1:], AICareerEngine, run_operation,
+                   on_ready=print_startup_report if startup_report else None,
+                   before_fork=_before_pool_fork, after_fork=_after_pool_fork)
+        sys.exit(0)
     
     try:
         engine = AICareerEngine()
-        
-        if operation == "parse" and len(sys.argv) >= 4:
-            file_path = sys.argv[2]
-            file_type = sys.argv[3]
-            result = engine.parse_resume(file_path, file_type)
-            print(json.dumps(result))
-        elif operation == "match" and len(sys.argv) >= 4:
-            resume_skills = json.loads(sys.argv[2])
-            job_title = sys.argv[3]
-            result = engine.calculate_match_score(resume_skills, job_title)
-            print(json.dumps(result))
-        elif operation == "recommend" and len(sys.argv) >= 3:
-            resume_skills = json.loads(sys.argv[2])
-            result = engine.get_job_recommendations(resume_skills)
-            print(json.dumps(result))
-        elif operation == "trending":
-            result = engine.get_trending_skills()
-            print(json.dumps(result))
-        elif operation == "predict_future" and len(sys.argv) >= 3:
-            current_skills = json.loads(sys.argv[2])
-            result = engine.predict_future_skills_ml(current_skills)
-            print(json.dumps(result))
-        elif operation == "predict_questions" and len(sys.argv) >= 3:
-            resume_data = json.loads(sys.argv[2])
-            result = engine.predict_interview_questions(resume_data)
-            print(json.dumps(result))
-        elif operation == "ai_mentor" and len(sys.argv) >= 4:
-            user_query = sys.argv[2]
-            resume_data = json.loads(sys.argv[3])
-            result = engine.get_ai_mentor_response(user_query, resume_data)
-            print(json.dumps(result))
-        else:
-            print(json.dumps({"error": "Invalid operation or arguments"}))
+        args = _decode_cli_args(operation, argv[1:])
+        result = run_operation(engine, operation, args)
+        print(json.dumps(result))
     except Exception as e:
         print(json.dumps({"error": str(e)}))
+    
+    if startup_report:
+        print_startup_report()
@@ -0,0 +1,188 @@
+"""
+Approximate nearest-neighbour retrieval over the job index.
+
+An IVF-style index: the live job TF-IDF rows are grouped into nlist
+clusters by spherical k-means, and the index stores the row IDs cluster
+by cluster. Centroids stay sparse, keeping only their CENTROID_TERMS
+heaviest terms, so scoring a query against every centroid is one small
+sparse product. A query scores the centroids, takes the rows of the
+`nprobe` closest clusters as candidates and reranks them exactly against
+the sparse TF-IDF rows. nprobe is the recall/latency knob: more clusters
+scanned, higher recall, slower queries.
+
+Rows appended to the job index after the ANN build are always scored
+exactly, and tombstoned rows are filtered out, so incremental updates
+stay correct until the next rebuild.
+
+    python ai_career_engine.py ann-report [--queries N] [--k K] [--nprobe 1,4,16]
+
+prints recall@k against brute force and query latency per nprobe.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Clusters scanned per query (AI_ENGINE_ANN_NPROBE)
+DEFAULT_NPROBE = int(os.getenv('AI_ENGINE_ANN_NPROBE', 8))
+
+# Terms kept per centroid
+CENTROID_TERMS = 200
+
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 40
+_ASSIGN_CHUNK = 65536
+
+
+def _normalize_rows(matrix):
+    """L2-normalise the rows of a sparse matrix in place"""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    scale = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    matrix.data *= np.repeat(scale, np.diff(matrix.indptr))
+    return matrix
+
+
+def _truncate_rows(matrix, terms):
+    """Keep only the `terms` largest entries of each row"""
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        if end - start > terms:
+            values = matrix.data[start:end]
+            cutoff = np.partition(values, end - start - terms)[end - start - terms]
+            values[values < cutoff] = 0
+    matrix.eliminate_zeros()
+    return matrix
+
+
+def _assign(vectors, centroids):
+    """Nearest centroid (by cosine) for each row, in chunks"""
+    assignments = np.empty(vectors.shape[0], dtype=np.int32)
+    centroids_t = centroids.T.tocsc()
+    for start in range(0, vectors.shape[0], _ASSIGN_CHUNK):
+        block = vectors[start:start + _ASSIGN_CHUNK] @ centroids_t
+        assignments[start:start + block.shape[0]] = np.asarray(block.argmax(axis=1)).ravel()
+    return assignments
+
+
+def _spherical_kmeans(vectors, nlist, rng):
+    """Sparse centroids fitted on a sample of the rows"""
+    from scipy.sparse import csr_matrix
+
+    sample_size = min(vectors.shape[0], max(nlist * KMEANS_SAMPLE_PER_LIST, 10000))
+    sample = vectors[rng.choice(vectors.shape[0], sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)]
+    for _ in range(KMEANS_ITERATIONS):
+        assignments = _assign(sample, centroids)
+        membership = csr_matrix((np.ones(sample_size), (assignments, np.arange(sample_size))),
+                                shape=(nlist, sample_size))
+        sums = (membership @ sample).tocsr()
+        # Empty clusters keep their previous centroid
+        empty = np.flatnonzero(np.diff(sums.indptr) == 0)
+        if len(empty):
+            from scipy.sparse import vstack
+            empty = set(empty.tolist())
+            sums = vstack([centroids[c] if c in empty else sums[c] for c in range(nlist)], format='csr')
+        centroids = _normalize_rows(_truncate_rows(sums.astype(np.float32), CENTROID_TERMS))
+    return centroids
+
+
+class IVFIndex:
+    def __init__(self, nlist=None, seed=0):
+        self.nlist = nlist
+        self.seed = seed
+        self.centroids = None
+        self.list_rows = None
+        self.offsets = None
+        self.indexed_rows = 0
+
+    def build(self, vectors, live):
+        """Cluster the live rows of a sparse job matrix"""
+        rng = np.random.default_rng(self.seed)
+        rows = np.flatnonzero(live)
+        self.indexed_rows = vectors.shape[0]
+        if not len(rows):
+            self.centroids = None
+            return self
+        live_vectors = vectors[rows]
+        nlist = max(1, min(self.nlist or int(np.sqrt(len(rows))), len(rows)))
+        self.centroids = _spherical_kmeans(live_vectors, nlist, rng)
+        assignments = _assign(live_vectors, self.centroids)
+
+        # Store rows grouped by cluster; offsets[c]:offsets[c + 1] is cluster c
+        order = np.argsort(assignments, kind='stable')
+        self.list_rows = rows[order]
+        self.offsets = np.searchsorted(assignments[order], np.arange(nlist + 1))
+        return self
+
+    def search(self, query, vectors, live, top_n, nprobe=DEFAULT_NPROBE):
+        """Top rows for a sparse query vector as (rows, exact cosine scores), best first"""
+        candidates = [np.arange(self.indexed_rows, vectors.shape[0])]
+        if self.centroids is not None:
+            centroid_scores = (self.centroids @ query.T).toarray().ravel()
+            nprobe = max(1, min(nprobe, len(centroid_scores)))
+            for c in np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]:
+                candidates.append(self.list_rows[self.offsets[c]:self.offsets[c + 1]])
+        # Rows added since the build are not clustered, so they are always candidates
+        candidates = np.concatenate(candidates)
+        candidates = candidates[live[candidates]]
+        if not len(candidates):
+            return candidates, np.zeros(0)
+
+        # Exact rerank of the candidates
+        scores = (vectors[candidates] @ query.T).toarray().ravel()
+        top_n = min(top_n, len(candidates))
+        best = np.argpartition(-scores, top_n - 1)[:top_n]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return candidates[best], scores[best]
+
+
+def recall_at_k(job_index, queries, k=5, nprobe=DEFAULT_NPROBE):
+    """Mean recall@k of ANN retrieval against brute force, and ANN latency percentiles"""
+    ann = job_index.ensure_ann()
+    recalls = []
+    latencies = []
+    for text in queries:
+        query = job_index.vectorizer.transform([text])
+        exact = job_index.similarities(text)
+        truth = set(np.argpartition(-exact, k - 1)[:k].tolist())
+        start = time.perf_counter()
+        rows, _ = ann.search(query, job_index.vectors, job_index.live, k, nprobe)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(len(truth & set(rows.tolist())) / k)
+    return {
+        "nprobe": nprobe,
+        "recall_at_k": round(float(np.mean(recalls)), 4) if recalls else 0.0,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2) if latencies else 0.0,
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2) if latencies else 0.0
+    }
+
+
+def report_main(argv, engine):
+    """Entry point for `ai_career_engine.py ann-report`"""
+    parser = argparse.ArgumentParser(prog="ai_career_engine.py ann-report")
+    parser.add_argument("--queries", type=int, default=200, help="Job texts sampled as queries")
+    parser.add_argument("--k", type=int, default=5, help="Neighbours compared")
+    parser.add_argument("--nprobe", default="1,4,8,16,32", help="Comma-separated nprobe values")
+    options = parser.parse_args(argv)
+
+    engine._ensure_job_index()
+    job_index = engine.job_index
+    live_rows = np.flatnonzero(job_index.live)
+    if not len(live_rows):
+        print("No jobs indexed", file=sys.stderr)
+        return 1
+    k = max(1, min(options.k, len(live_rows)))
+    rng = np.random.default_rng(0)
+    sampled = rng.choice(live_rows, min(options.queries, len(live_rows)), replace=False)
+    queries = [job_index.texts[row] for row in sampled]
+
+    start = time.perf_counter()
+    job_index.ensure_ann()
+    print(f"Built ANN index over {len(live_rows)} jobs in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    for nprobe in [int(value) for value in options.nprobe.split(',') if value]:
+        result = recall_at_k(job_index, queries, k, nprobe)
+        print(f"nprobe {result['nprobe']:>4}  recall@{k} {result['recall_at_k']:.4f}  "
+              f"p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms")
+    return 0
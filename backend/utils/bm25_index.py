@@ -0,0 +1,238 @@
+"""
+BM25 retrieval over the job index.
+
+An inverted index over the preprocessed job texts, tokenized exactly as
+the TF-IDF vectorizer tokenizes them and using its vocabulary. Document
+length normalization is fixed at build time, so each posting stores its
+final BM25 impact, idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl)),
+and the largest impact of each term is kept as that term's upper bound.
+
+Top-k search is term-at-a-time MaxScore. Query terms are taken in order
+of decreasing upper bound and their postings added to an accumulator.
+Once the upper bounds of the terms still to come add up to less than the
+current k-th best score, no job outside the candidates seen so far can
+reach the top k. The remaining terms, the frequent ones with long posting
+lists and small weights, are then only looked up for the surviving
+candidates, and candidates that can no longer reach the k-th score are
+dropped as the threshold rises. The result is the exact BM25 top k.
+
+Skill overlap can be blended in as one more bounded term:
+
+    score = (1 - skill_weight) * bm25 / (sum of query term bounds) + skill_weight * skill share
+
+    python ai_career_engine.py bm25-report [--queries N] [--k K]
+
+compares MaxScore against exhaustive scoring on the current jobs.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# BM25 term frequency saturation and length normalization
+K1 = 1.2
+B = 0.75
+
+# Weight of the skill-overlap share in blended ranking (AI_ENGINE_BM25_SKILL_WEIGHT)
+SKILL_WEIGHT = float(os.getenv('AI_ENGINE_BM25_SKILL_WEIGHT', 0.3))
+
+
+class BM25Index:
+    def __init__(self, k1=K1, b=B):
+        self.k1 = k1
+        self.b = b
+        self.rows = np.zeros(0, dtype=np.int64)     # job index row per document
+        self.vocabulary = {}
+        self.analyzer = None
+        self.postings = None                        # CSC matrix, documents x terms, of impacts
+        self.upper_bounds = np.zeros(0, dtype=np.float32)
+        self.last_stats = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def build(self, texts, live, vectorizer):
+        """Index the live rows of a job index (preprocessed texts) with the vectorizer's tokens"""
+        from scipy.sparse import csr_matrix
+
+        self.vocabulary = vectorizer.vocabulary_
+        self.analyzer = vectorizer.build_analyzer()
+        self.rows = np.flatnonzero(live)
+
+        indices = []
+        indptr = [0]
+        for row in self.rows:
+            indices.extend(self.vocabulary[term] for term in self.analyzer(texts[row]) if term in self.vocabulary)
+            indptr.append(len(indices))
+        counts = csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr),
+                            shape=(len(self.rows), len(self.vocabulary)))
+        counts.sum_duplicates()
+
+        # Per-posting impact, with the length normalization of its document folded in
+        lengths = np.asarray(counts.sum(axis=1)).ravel()
+        average = lengths.mean() if len(lengths) else 0.0
+        norms = self.k1 * (1 - self.b + self.b * lengths / average) if average else np.full(len(lengths), self.k1)
+        document_frequency = np.bincount(counts.indices, minlength=len(self.vocabulary))
+        idf = np.log(1 + (len(self.rows) - document_frequency + 0.5) / (document_frequency + 0.5))
+        tf = counts.data
+        counts.data = (idf[counts.indices] * tf * (self.k1 + 1) /
+                       (tf + np.repeat(norms, np.diff(counts.indptr)))).astype(np.float32)
+        self.postings = counts.tocsc()
+        self.postings.sort_indices()
+
+        self.upper_bounds = np.zeros(len(self.vocabulary), dtype=np.float32)
+        nonempty = np.flatnonzero(np.diff(self.postings.indptr))
+        if len(nonempty):
+            self.upper_bounds[nonempty] = np.maximum.reduceat(self.postings.data, self.postings.indptr[nonempty])
+        return self
+
+    def query_terms(self, text):
+        """(term id, query term frequency) pairs for a preprocessed text"""
+        counts = {}
+        for term in self.analyzer(text):
+            term_id = self.vocabulary.get(term)
+            if term_id is not None:
+                counts[term_id] = counts.get(term_id, 0) + 1
+        return list(counts.items())
+
+    def _term_lists(self, text, skill_scores, skill_weight):
+        """(documents, impacts, upper bound) for each query term, plus the skill term if blended"""
+        terms = []
+        for term_id, frequency in self.query_terms(text):
+            start, end = self.postings.indptr[term_id], self.postings.indptr[term_id + 1]
+            if end > start:
+                terms.append([self.postings.indices[start:end], self.postings.data[start:end] * frequency,
+                              float(self.upper_bounds[term_id]) * frequency])
+        if skill_weight and skill_scores is not None:
+            # Scale BM25 into [0, 1] by the query's maximum possible score, then blend
+            bound = sum(term[2] for term in terms)
+            scale = (1 - skill_weight) / bound if bound else 0.0
+            for term in terms:
+                term[1] = term[1] * scale
+                term[2] *= scale
+            shares = np.asarray(skill_scores, dtype=np.float32)[self.rows]
+            documents = np.flatnonzero(shares > 0)
+            if len(documents):
+                terms.append([documents, shares[documents] * skill_weight, float(shares[documents].max()) * skill_weight])
+        return terms
+
+    def search(self, text, top_n, skill_scores=None, skill_weight=0.0):
+        """Exact BM25 top jobs for a preprocessed text as (job index rows, scores), best first
+
+        skill_scores, when blending, is the skill-overlap share (0 to 1) of
+        every job index row.
+        """
+        terms = sorted(self._term_lists(text, skill_scores, skill_weight), key=lambda term: -term[2])
+        top_n = min(top_n, len(self.rows))
+        scanned = 0
+        if not terms or top_n <= 0:
+            self.last_stats = {"terms": len(terms), "postings": 0, "scanned": 0}
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        # remaining[i]: the most the terms from i on can still add
+        remaining = np.concatenate([np.cumsum([term[2] for term in terms][::-1])[::-1], [0.0]])
+        scores = np.zeros(len(self.rows), dtype=np.float32)
+        seen = np.zeros(len(self.rows), dtype=bool)
+        threshold = 0.0
+        position = 0
+        while position < len(terms):
+            documents, impacts, _ = terms[position]
+            scores[documents] += impacts
+            seen[documents] = True
+            scanned += len(documents)
+            position += 1
+            candidates = np.flatnonzero(seen)
+            if len(candidates) >= top_n:
+                threshold = np.partition(scores[candidates], len(candidates) - top_n)[len(candidates) - top_n]
+                # Jobs not seen yet score at most remaining[position]
+                if remaining[position] < threshold:
+                    break
+        else:
+            candidates = np.flatnonzero(seen)
+
+        # Remaining terms only refine the candidates that can still make the top k
+        for position in range(position, len(terms)):
+            candidates = candidates[scores[candidates] + remaining[position] >= threshold]
+            documents, impacts, _ = terms[position]
+            found = np.searchsorted(documents, candidates)
+            hit = found < len(documents)
+            hit[hit] = documents[found[hit]] == candidates[hit]
+            scores[candidates[hit]] += impacts[found[hit]]
+            scanned += len(candidates)
+            if len(candidates) >= top_n:
+                threshold = max(threshold, np.partition(scores[candidates], len(candidates) - top_n)[len(candidates) - top_n])
+
+        self.last_stats = {"terms": len(terms), "postings": int(sum(len(term[0]) for term in terms)), "scanned": scanned}
+        top_n = min(top_n, len(candidates))
+        best = np.argpartition(-scores[candidates], top_n - 1)[:top_n]
+        best = best[np.argsort(-scores[candidates][best], kind='stable')]
+        return self.rows[candidates[best]], scores[candidates[best]]
+
+    def score_rows(self, text, rows, skill_scores=None, skill_weight=0.0):
+        """Scores of the given job index rows, blended as in search; rows not indexed score 0
+
+        Used to rerank a candidate set (e.g. from the ANN index) without
+        touching the postings of any other job.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        documents = np.searchsorted(self.rows, rows)
+        indexed = documents < len(self.rows)
+        indexed[indexed] = self.rows[documents[indexed]] == rows[indexed]
+        scores = np.zeros(len(rows), dtype=np.float32)
+        for postings, impacts, _ in self._term_lists(text, skill_scores, skill_weight):
+            found = np.searchsorted(postings, documents)
+            hit = indexed & (found < len(postings))
+            hit[hit] = postings[found[hit]] == documents[hit]
+            scores[hit] += impacts[found[hit]]
+        return scores
+
+    def exhaustive_scores(self, text):
+        """BM25 score of every indexed document, for checking search"""
+        scores = np.zeros(len(self.rows), dtype=np.float32)
+        for term_id, frequency in self.query_terms(text):
+            start, end = self.postings.indptr[term_id], self.postings.indptr[term_id + 1]
+            scores[self.postings.indices[start:end]] += self.postings.data[start:end] * frequency
+        return scores
+
+
+def report_main(argv, engine):
+    """Entry point for `ai_career_engine.py bm25-report`"""
+    parser = argparse.ArgumentParser(prog="ai_career_engine.py bm25-report")
+    parser.add_argument("--queries", type=int, default=200, help="Job skill lists sampled as queries")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    options = parser.parse_args(argv)
+
+    engine._ensure_job_index()
+    job_index = engine.job_index
+    start = time.perf_counter()
+    bm25 = job_index.ensure_bm25()
+    print(f"Built BM25 index over {len(bm25)} jobs in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    if not len(bm25):
+        print("No jobs indexed", file=sys.stderr)
+        return 1
+
+    rng = np.random.default_rng(0)
+    sampled = rng.choice(bm25.rows, min(options.queries, len(bm25)), replace=False)
+    queries = [engine._preprocess_text(' '.join(job_index.jobs[row]['required_skills'])) for row in sampled]
+    timings = {"maxscore": [], "exhaustive": []}
+    scanned = postings = mismatches = 0
+    for text in queries:
+        start = time.perf_counter()
+        rows, scores = bm25.search(text, options.k)
+        timings["maxscore"].append((time.perf_counter() - start) * 1000)
+        scanned += bm25.last_stats["scanned"]
+        postings += bm25.last_stats["postings"]
+
+        start = time.perf_counter()
+        exact = bm25.exhaustive_scores(text)
+        top = np.sort(exact)[::-1][:len(scores)]
+        timings["exhaustive"].append((time.perf_counter() - start) * 1000)
+        mismatches += not np.allclose(np.sort(scores)[::-1], top, rtol=1e-4, atol=1e-5)
+
+    for name, values in timings.items():
+        print(f"{name:<11} p50 {np.percentile(values, 50):>8.2f} ms  p95 {np.percentile(values, 95):>8.2f} ms")
+    print(f"postings touched {scanned / max(postings, 1):.1%} of query postings; "
+          f"{mismatches} of {len(queries)} top-{options.k} score lists differ from exhaustive")
+    return 0
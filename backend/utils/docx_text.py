@@ -0,0 +1,121 @@
+"""
+Streaming DOCX text extraction.
+
+A .docx file is a zip archive; its text lives in word/document.xml plus
+one XML part per header and footer. Rather than building python-docx's
+object model, the parts are streamed through an incremental XML parser
+and each paragraph is emitted as soon as it closes. Paragraphs inside
+table cells and text boxes are included, in reading order, so skills laid
+out in resume template tables are no longer lost.
+
+    python utils/docx_text.py <file.docx>...
+
+compares speed, peak memory and extracted characters with docx.Document.
+"""
+import re
+import sys
+import time
+import tracemalloc
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_MC = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+
+_PARAGRAPH = _W + 'p'
+_TEXT = _W + 't'
+_TAB = _W + 'tab'
+_BREAKS = (_W + 'br', _W + 'cr')
+_TABLE = _W + 'tbl'
+# Text boxes are stored twice (DrawingML and a VML fallback); only the first copy is read
+_FALLBACK = _MC + 'Fallback'
+
+_HEADER_PART = re.compile(r'^word/header\d*\.xml$')
+_FOOTER_PART = re.compile(r'^word/footer\d*\.xml$')
+
+
+def docx_parts(archive):
+    """XML parts holding document text, in reading order: headers, body, footers"""
+    names = archive.namelist()
+    headers = sorted(name for name in names if _HEADER_PART.match(name))
+    footers = sorted(name for name in names if _FOOTER_PART.match(name))
+    return headers + ['word/document.xml'] + footers
+
+
+def iter_part_paragraphs(stream):
+    """Yield the text of each paragraph in one WordprocessingML part"""
+    # Runs of the open paragraphs; a text box paragraph nests inside another
+    open_paragraphs = []
+    fallback_depth = 0
+    for event, element in iterparse(stream, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            if tag == _FALLBACK:
+                fallback_depth += 1
+            elif tag == _PARAGRAPH and not fallback_depth:
+                open_paragraphs.append([])
+            continue
+
+        if tag == _FALLBACK:
+            fallback_depth -= 1
+            element.clear()
+        elif fallback_depth or not open_paragraphs and tag != _TABLE:
+            continue
+        elif tag == _TEXT:
+            open_paragraphs[-1].append(element.text or '')
+        elif tag == _TAB:
+            open_paragraphs[-1].append('\t')
+        elif tag in _BREAKS:
+            open_paragraphs[-1].append('\n')
+        elif tag == _PARAGRAPH:
+            text = ''.join(open_paragraphs.pop())
+            # Empty body paragraphs are kept as blank lines, like python-docx does
+            if text or not open_paragraphs:
+                yield text
+            element.clear()
+        elif tag == _TABLE:
+            element.clear()
+
+
+def iter_docx_paragraphs(file_path):
+    """Yield paragraph texts of a .docx file: headers, body (tables included), footers"""
+    with zipfile.ZipFile(file_path) as archive:
+        names = set(archive.namelist())
+        for part in docx_parts(archive):
+            if part not in names:
+                continue
+            with archive.open(part) as stream:
+                yield from iter_part_paragraphs(stream)
+
+
+def extract_docx_text(file_path):
+    """Extract the text of a .docx file, one line per paragraph"""
+    return ''.join(paragraph + '\n' for paragraph in iter_docx_paragraphs(file_path))
+
+
+def _python_docx_text(file_path):
+    """Text as the python-docx object model exposes it (body paragraphs only)"""
+    import docx
+    document = docx.Document(file_path)
+    return ''.join(paragraph.text + '\n' for paragraph in document.paragraphs)
+
+
+def _measure(extract, paths):
+    tracemalloc.start()
+    start = time.perf_counter()
+    chars = sum(len(extract(path)) for path in paths)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, chars
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:]
+    if not paths:
+        print("Usage: python docx_text.py <file.docx>...", file=sys.stderr)
+        sys.exit(1)
+
+    for name, extract in (("python-docx", _python_docx_text), ("streaming", extract_docx_text)):
+        elapsed, peak, chars = _measure(extract, paths)
+        print(f"{name:<12} {len(paths) / elapsed:>10.2f} docs/s  peak {peak / 1024 / 1024:>7.2f} MB  {chars} chars")
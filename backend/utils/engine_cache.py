@@ -0,0 +1,44 @@
+"""
+On-disk cache locations shared by the AI engine components.
+
+Everything lives under one root directory, `backend/.cache` by default or
+AI_ENGINE_CACHE_DIR when set, so spawned processes and pool workers all
+find the same artifacts regardless of their working directory.
+"""
+import os
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def cache_root():
+    """Absolute path of the engine cache root"""
+    return os.path.abspath(os.getenv('AI_ENGINE_CACHE_DIR', os.path.join(BACKEND_DIR, '.cache')))
+
+
+def cache_dir(*parts):
+    """Return (and create) a directory under the cache root"""
+    path = os.path.join(cache_root(), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def atomic_write(path, write):
+    """Write a file via a temporary sibling and rename it into place
+
+    `write` receives a binary file object. Readers see either the old file
+    or the complete new one, never a partial write.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
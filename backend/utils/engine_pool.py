@@ -0,0 +1,267 @@
+"""
+Pre-fork pool of engine workers.
+
+The parent process loads the engine once (spaCy model, NLTK resources,
+fitted job vectors) and then forks N workers. The workers share those
+pages copy-on-write with the parent, so N workers cost far less than N
+times the model RSS while each gets its own core for the spaCy pipeline.
+
+The parent only dispatches: requests wait in one queue and each worker is
+handed the next one as soon as it has answered its last, so a worker only
+ever holds the request it is running. A worker that dies, or that exits
+because it grew past the memory ceiling, is replaced by a fresh fork of the
+parent. If it crashed, the request it was running is answered with an
+error; a request handed to a worker that exited cleanly (a recycle) or
+never received it goes back to the front of the queue.
+
+Replacement workers are forked from a single supervisor thread, while it
+holds the pool lock, rather than from whichever reader thread noticed the
+exit, so no other pool thread is inside the dispatch state at fork time.
+The parent runs no engine threads of its own (serve keeps background job
+refreshes out of it), so a fork never copies a lock held by one of them.
+"""
+import collections
+import gc
+import itertools
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+from utils.engine_server import handle_request
+
+# Workers that die sooner than this after being forked are respawned with a delay
+MIN_WORKER_LIFETIME = 1.0
+
+
+def current_rss_bytes():
+    """Resident set size of the current process, or None if unknown"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak RSS: kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class _Worker:
+    """Parent-side handle on one forked worker"""
+
+    def __init__(self, slot, pid, connection):
+        self.slot = slot
+        self.pid = pid
+        self.connection = connection
+        self.writer = connection.makefile("wb")
+        self.reader = connection.makefile("rb")
+        self.current = None     # (internal id, frame, reply) being run, if any
+        self.broken = False     # a write failed; the reader will see the exit
+        self.started_at = time.monotonic()
+
+
+class PreforkEnginePool:
+    """Dispatches request frames across forked copies of a loaded engine"""
+
+    def __init__(self, engine, run_operation, size, max_rss_mb=None, after_fork=None):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("The worker pool requires os.fork (Linux or macOS)")
+        self.engine = engine
+        self.run_operation = run_operation
+        self.size = size
+        self.max_rss_bytes = int(max_rss_mb * 1024 * 1024) if max_rss_mb else None
+        self.after_fork = after_fork
+        self.workers = {}
+        self.queue = collections.deque()    # requests not yet handed to a worker
+        self.vacant = collections.deque()   # (slot, delay) waiting for the supervisor to fork
+        self.request_ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.vacancy = threading.Condition(self.lock)
+        self.closing = False
+        self.supervisor = None
+
+    def start(self):
+        """Fork the initial set of workers"""
+        # Move everything loaded so far out of the collector's reach, so GC
+        # passes in the workers don't write to (and un-share) those pages
+        gc.collect()
+        gc.freeze()
+        with self.lock:
+            self.vacant.extend((slot, 0.0) for slot in range(self.size))
+        self.supervisor = threading.Thread(target=self._supervise, name="engine-pool-supervisor", daemon=True)
+        self.supervisor.start()
+        with self.vacancy:
+            while len(self.workers) < self.size and not self.closing:
+                self.vacancy.wait()
+
+    def submit(self, frame, reply):
+        """Queue a request frame; it runs on the next worker to become free"""
+        with self.lock:
+            if self.closing:
+                reply({"id": frame.get("id"), "error": "No engine workers are available"})
+                return
+            self.queue.append((next(self.request_ids), frame, reply))
+            self._dispatch()
+
+    def drain(self):
+        """Wait until every submitted request has been answered"""
+        with self.idle:
+            while self.queue or any(worker.current for worker in self.workers.values()):
+                self.idle.wait()
+
+    def close(self):
+        """Stop the workers; they exit once their request stream closes"""
+        with self.lock:
+            self.closing = True
+            self.vacancy.notify_all()
+            for worker in self.workers.values():
+                try:
+                    worker.connection.shutdown(socket.SHUT_WR)
+                except OSError:
+                    pass
+
+    def _dispatch(self):
+        """Hand queued requests to free workers; must be called with the lock held"""
+        for worker in self.workers.values():
+            if not self.queue:
+                return
+            if worker.current is not None or worker.broken:
+                continue
+            request = self.queue.popleft()
+            internal_id, frame, _ = request
+            message = {"id": internal_id, "op": frame.get("op"), "args": frame.get("args")}
+            try:
+                worker.writer.write(json.dumps(message).encode("utf-8") + b"\n")
+                worker.writer.flush()
+                worker.current = request
+            except OSError:
+                # Never delivered; the reader notices the dead worker and it is replaced
+                worker.broken = True
+                self.queue.appendleft(request)
+
+    def _supervise(self):
+        """Fork workers for vacant slots; the only thread that ever forks"""
+        while True:
+            with self.vacancy:
+                while not self.vacant and not self.closing:
+                    self.vacancy.wait()
+                if self.closing:
+                    return
+                slot, delay = self.vacant.popleft()
+            if delay:
+                # Avoid a fork loop when workers crash right after starting
+                time.sleep(delay)
+            with self.lock:
+                if self.closing:
+                    return
+                self._spawn(slot)
+                self._dispatch()
+                self.vacancy.notify_all()
+
+    def _spawn(self, slot):
+        """Fork a worker for the given slot; must be called with the lock held"""
+        parent_end, child_end = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            parent_end.close()
+            # Drop the other workers' connections so they see EOF if the parent dies.
+            # Their makefile() objects still reference the sockets (and a reader
+            # thread that does not exist here may hold their buffer locks), so
+            # close the descriptors directly instead of through those objects.
+            for other in self.workers.values():
+                os.close(other.connection.detach())
+            status = 0
+            try:
+                if self.after_fork:
+                    self.after_fork(self.size)
+                self._worker_main(child_end)
+            except BaseException:
+                status = 1
+            finally:
+                os._exit(status)
+
+        child_end.close()
+        worker = _Worker(slot, pid, parent_end)
+        self.workers[slot] = worker
+        reader = threading.Thread(target=self._read_responses, args=(worker,),
+                                  name=f"engine-pool-reader-{slot}", daemon=True)
+        reader.start()
+
+    def _worker_main(self, connection):
+        """Request loop run inside a forked worker"""
+        reader = connection.makefile("rb")
+        writer = connection.makefile("wb")
+        for raw_line in reader:
+            frame = json.loads(raw_line)
+            response = handle_request(self.engine, self.run_operation, frame)
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            writer.flush()
+            if self.max_rss_bytes:
+                rss = current_rss_bytes()
+                if rss is not None and rss > self.max_rss_bytes:
+                    print(f"Engine worker {os.getpid()} exceeded memory ceiling "
+                          f"({rss // (1024 * 1024)} MB), recycling", file=sys.stderr)
+                    break
+
+    def _read_responses(self, worker):
+        """Route a worker's responses back to their clients until it exits"""
+        try:
+            for raw_line in worker.reader:
+                try:
+                    response = json.loads(raw_line)
+                except ValueError:
+                    continue
+                with self.lock:
+                    request = worker.current
+                    if request is None or request[0] != response.get("id"):
+                        continue
+                    worker.current = None
+                    self._dispatch()
+                    self.idle.notify_all()
+                _, frame, reply = request
+                response["id"] = frame.get("id")
+                reply(response)
+        except OSError:
+            # A worker that exits with an unread request resets the connection
+            pass
+
+        try:
+            _, status = os.waitpid(worker.pid, 0)
+        except ChildProcessError:
+            status = None
+        failed = None
+        with self.lock:
+            request, worker.current = worker.current, None
+            # The socket stays open while its makefile() objects do; close them all
+            for stream in (worker.writer, worker.reader):
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+            worker.connection.close()
+            if self.workers.get(worker.slot) is worker:
+                del self.workers[worker.slot]
+            if request is not None:
+                if status == 0 and not self.closing:
+                    # Recycled worker: the request was handed over after its last answer
+                    self.queue.appendleft(request)
+                else:
+                    # Only the request the worker was running fails with it
+                    failed = request
+            if not self.closing:
+                crashed_early = status != 0 and time.monotonic() - worker.started_at < MIN_WORKER_LIFETIME
+                self.vacant.append((worker.slot, MIN_WORKER_LIFETIME if crashed_early else 0.0))
+                self.vacancy.notify_all()
+            self._dispatch()
+            self.idle.notify_all()
+        if failed:
+            _, frame, reply = failed
+            reply({"id": frame.get("id"), "error": f"Engine worker exited with status {status}"})
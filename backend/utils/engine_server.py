@@ -0,0 +1,213 @@
+"""
+Long-lived engine worker.
+
+Builds the AI career engine once and answers a stream of framed JSON
+requests, either over stdin/stdout or over a Unix domain socket.
+
+Framing is one JSON object per line:
+
+    request:  {"id": 7, "op": "match", "args": [["Python", "SQL"], "Data Scientist"]}
+    response: {"id": 7, "result": {...}}
+              {"id": 7, "error": "Invalid operation or arguments"}
+
+Every response echoes the request id, so a client can keep several
+requests in flight on one connection and match the answers as they arrive.
+"""
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+
+
+class EngineDispatcher:
+    """Runs requests against a single engine instance on one worker thread"""
+
+    def __init__(self, engine, run_operation):
+        self.engine = engine
+        self.run_operation = run_operation
+        self.requests = queue.Queue()
+        self.worker = threading.Thread(target=self._run, name="engine-worker", daemon=True)
+        self.worker.start()
+
+    def submit(self, frame, reply):
+        """Queue a decoded request frame; reply(response) is called when it is done"""
+        self.requests.put((frame, reply))
+
+    def drain(self):
+        """Wait until every queued request has been answered"""
+        done = threading.Event()
+        self.submit({"op": "ping"}, lambda response: done.set())
+        done.wait()
+
+    def close(self):
+        """Nothing to release: the worker thread exits with the process"""
+
+    def _run(self):
+        while True:
+            frame, reply = self.requests.get()
+            reply(handle_request(self.engine, self.run_operation, frame))
+
+
+def handle_request(engine, run_operation, frame):
+    """Execute one request frame and build its response frame"""
+    request_id = frame.get("id")
+    operation = frame.get("op")
+    try:
+        if operation == "ping":
+            return {"id": request_id, "result": "pong"}
+        result = run_operation(engine, operation, frame.get("args") or [])
+        return {"id": request_id, "result": result}
+    except Exception as e:
+        return {"id": request_id, "error": str(e)}
+
+
+def decode_frame(line):
+    """Decode one request line, returning (frame, error_response)"""
+    try:
+        frame = json.loads(line)
+    except ValueError as e:
+        return None, {"id": None, "error": f"Invalid request frame: {e}"}
+    if not isinstance(frame, dict):
+        return None, {"id": None, "error": "Invalid request frame: expected a JSON object"}
+    return frame, None
+
+
+class FrameWriter:
+    """Serializes response frames onto a stream shared by several requests"""
+
+    def __init__(self, stream, binary=False):
+        self.stream = stream
+        self.binary = binary
+        self.lock = threading.Lock()
+
+    def __call__(self, response):
+        data = json.dumps(response) + "\n"
+        if self.binary:
+            data = data.encode("utf-8")
+        with self.lock:
+            try:
+                self.stream.write(data)
+                self.stream.flush()
+            except (OSError, ValueError):
+                # Client went away; nothing left to deliver to
+                pass
+
+
+def claim_stdout():
+    """Take stdout for the protocol and point fd 1 and sys.stdout at stderr
+
+    Anything the engine prints then goes to stderr, and so does anything
+    written by processes started afterwards (pool workers, the PDF page
+    pool), so nothing but frames reaches the protocol stream.
+    """
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+    return protocol_out
+
+
+def serve_stdio(dispatcher, protocol_out=None):
+    """Answer requests read from stdin on stdout until stdin is closed
+
+    protocol_out is the stream claim_stdout() returned, if stdout was
+    claimed before the dispatcher started.
+    """
+    if protocol_out is None:
+        protocol_out = claim_stdout()
+    writer = FrameWriter(protocol_out)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        frame, error = decode_frame(line)
+        if error:
+            writer(error)
+        else:
+            dispatcher.submit(frame, writer)
+
+    # Answer requests that are still in flight before exiting
+    dispatcher.drain()
+    dispatcher.close()
+
+
+def serve_unix_socket(dispatcher, socket_path):
+    """Answer requests from any number of clients connected to a Unix socket"""
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Unix domain sockets are not supported on this platform")
+
+    class ConnectionHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            writer = FrameWriter(self.wfile, binary=True)
+            for raw_line in self.rfile:
+                line = raw_line.decode("utf-8")
+                if not line.strip():
+                    continue
+                frame, error = decode_frame(line)
+                if error:
+                    writer(error)
+                else:
+                    dispatcher.submit(frame, writer)
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    server = socketserver.ThreadingUnixStreamServer(socket_path, ConnectionHandler)
+    server.daemon_threads = True
+    print(f"Engine listening on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def serve_main(argv, engine_factory, run_operation, on_ready=None, before_fork=None, after_fork=None):
+    """Entry point for `ai_career_engine.py serve`
+
+    With a worker pool, before_fork() runs in the parent before the engine
+    is loaded and after_fork(workers) in each worker once it is forked.
+    """
+    parser = argparse.ArgumentParser(prog="ai_career_engine.py serve")
+    parser.add_argument("--socket", dest="socket_path",
+                        help="Listen on this Unix socket instead of stdin/stdout")
+    parser.add_argument("--lazy", action="store_true",
+                        help="Load engine components on first use instead of at startup")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Fork this many workers that share the loaded engine")
+    parser.add_argument("--max-rss-mb", type=float, default=None,
+                        help="Recycle a pool worker once its RSS exceeds this many MB")
+    options = parser.parse_args(argv)
+    if options.workers > 1 and not hasattr(os, "fork"):
+        print(f"Worker pool needs os.fork; serving with 1 worker instead of {options.workers}", file=sys.stderr)
+        options.workers = 1
+
+    # Claimed before any worker is forked, so workers inherit stderr as fd 1
+    protocol_out = None if options.socket_path else claim_stdout()
+    if options.workers > 1 and before_fork:
+        before_fork()
+
+    engine = engine_factory()
+    if not options.lazy or options.workers > 1:
+        # A long-lived worker pays the load cost once, before the first request;
+        # pool workers must inherit a fully loaded engine to share it
+        engine.preload()
+    if on_ready:
+        on_ready()
+
+    if options.workers > 1:
+        from utils.engine_pool import PreforkEnginePool
+        dispatcher = PreforkEnginePool(engine, run_operation, options.workers, options.max_rss_mb,
+                                       after_fork=after_fork)
+        dispatcher.start()
+    else:
+        dispatcher = EngineDispatcher(engine, run_operation)
+    if options.socket_path:
+        serve_unix_socket(dispatcher, options.socket_path)
+    else:
+        serve_stdio(dispatcher, protocol_out)
@@ -0,0 +1,76 @@
+"""
+Cross-process advisory file lock.
+
+Held on an open lock file with fcntl.flock on POSIX and msvcrt.locking on
+Windows. The operating system drops the lock when the holding process
+exits, so a crashed holder never leaves a stale lock behind. Locks taken
+through separate FileLock objects exclude each other within one process
+as well as across processes.
+"""
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Poll interval for blocking acquires on Windows, which has no blocking lock without a retry limit
+_POLL_SECONDS = 0.05
+
+
+class FileLock:
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def acquire(self, blocking=True):
+        """Take the lock; with blocking=False return False at once if another holder has it"""
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        if not blocking:
+                            raise
+                        time.sleep(_POLL_SECONDS)
+        except OSError:
+            os.close(fd)
+            if blocking:
+                raise
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    @property
+    def locked(self):
+        return self._fd is not None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
@@ -0,0 +1,229 @@
+"""
+Pooled HTTP client for the job feeds.
+
+Every request to a host goes through a small pool of keep-alive
+http.client connections, so paging through a feed pays TCP and TLS setup
+once per connection rather than once per page. A per-host semaphore caps
+the connections open to one host and a pool-wide semaphore caps requests
+in flight overall.
+
+Connection errors and retryable statuses (429 and 5xx gateway errors) are
+retried with exponential backoff and full jitter. A Retry-After header,
+in seconds or as an HTTP date, takes the place of the backoff, up to
+MAX_RETRY_AFTER; a server asking for a longer wait fails the request
+rather than stalling the refresh. A request waiting to retry gives up its
+slots, so one throttled host does not hold back the other feeds. A
+request that fails on a reused connection, which the server may have
+closed while it sat idle, is retried at once on a fresh one.
+
+Counters for requests, retries, bytes and connections are kept per pool;
+shared_pool() is the pool all feeds use.
+"""
+import email.utils
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+
+# Connections kept open per host (AI_ENGINE_HTTP_MAX_PER_HOST)
+MAX_PER_HOST = int(os.getenv('AI_ENGINE_HTTP_MAX_PER_HOST', 4))
+
+# Requests in flight across all hosts (AI_ENGINE_HTTP_MAX_CONCURRENCY)
+MAX_CONCURRENCY = int(os.getenv('AI_ENGINE_HTTP_MAX_CONCURRENCY', 16))
+
+# Retries after the first attempt (AI_ENGINE_HTTP_RETRIES)
+RETRIES = int(os.getenv('AI_ENGINE_HTTP_RETRIES', 3))
+
+# Backoff before retry n is uniform in [0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** n)]
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+# Longest Retry-After honoured, in seconds
+MAX_RETRY_AFTER = 60.0
+
+DEFAULT_TIMEOUT = 10.0
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Connection resets, refusals and timeouts are all OSErrors
+_RETRY_ERRORS = (OSError, http.client.HTTPException)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, reason, url):
+        super().__init__(f"HTTP {status} {reason} for {url}")
+        self.status = status
+
+
+class Response:
+    def __init__(self, status, reason, headers, body):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body.decode('utf-8'))
+
+
+def retry_after_seconds(value, now=None):
+    """Seconds to wait from a Retry-After header value, or None if it cannot be parsed"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (now if now is not None else time.time()))
+
+
+class HTTPPool:
+    def __init__(self, max_per_host=MAX_PER_HOST, max_concurrency=MAX_CONCURRENCY, retries=RETRIES,
+                 timeout=DEFAULT_TIMEOUT, sleep=time.sleep):
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.timeout = timeout
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._idle = {}         # (scheme, host, port) -> idle connections, most recent last
+        self._host_slots = {}   # (scheme, host, port) -> semaphore
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.counters = {"requests": 0, "retries": 0, "bytes": 0, "connections": 0, "reused": 0, "failures": 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def _host_slot(self, key):
+        with self._lock:
+            if key not in self._host_slots:
+                self._host_slots[key] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[key]
+
+    def _connection(self, key, timeout):
+        """(connection, reused) for a host, reusing an idle one when there is one"""
+        with self._lock:
+            idle = self._idle.get(key)
+            connection = idle.pop() if idle else None
+        if connection is not None:
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            self._count("reused")
+            return connection, True
+        scheme, host, port = key
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        self._count("connections")
+        return connection_class(host, port, timeout=timeout), False
+
+    def _release(self, key, connection):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def request(self, method, url, params=None, headers=None, body=None, timeout=None):
+        """Send a request, retrying transient failures; returns a Response or raises HTTPError"""
+        parts = urllib.parse.urlsplit(url)
+        if params:
+            query = urllib.parse.urlencode(params)
+            parts = parts._replace(query=f"{parts.query}&{query}" if parts.query else query)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        target = urllib.parse.urlunsplit(('', '', parts.path or '/', parts.query, ''))
+        headers = {"Accept": "application/json", "Connection": "keep-alive", **(headers or {})}
+        timeout = timeout or self.timeout
+
+        attempt = 0
+        while True:
+            # Slots are held while a request is on the wire, never across a backoff sleep
+            with self._slots, self._host_slot(key):
+                while True:
+                    connection, reused = self._connection(key, timeout)
+                    self._count("requests")
+                    try:
+                        connection.request(method, target, body=body, headers=headers)
+                        response = connection.getresponse()
+                        data = response.read()
+                    except _RETRY_ERRORS:
+                        connection.close()
+                        if reused:
+                            # The server may have dropped the idle connection; try a fresh one at once
+                            self._count("retries")
+                            continue
+                        if attempt >= self.retries:
+                            self._count("failures")
+                            raise
+                        wait = self._backoff(attempt)
+                        break
+
+                    self._count("bytes", len(data))
+                    if response.will_close:
+                        connection.close()
+                    else:
+                        self._release(key, connection)
+                    if response.status < 400:
+                        return Response(response.status, response.reason, dict(response.getheaders()), data)
+                    if response.status not in RETRY_STATUSES or attempt >= self.retries:
+                        self._count("failures")
+                        raise HTTPError(response.status, response.reason, url)
+
+                    wait = retry_after_seconds(response.getheader('Retry-After'))
+                    if wait is not None and wait > MAX_RETRY_AFTER:
+                        self._count("failures")
+                        raise HTTPError(response.status, f"{response.reason} (retry after {wait:.0f}s)", url)
+                    if wait is None:
+                        wait = self._backoff(attempt)
+                    break
+            self._count("retries")
+            self.sleep(wait)
+            attempt += 1
+
+    def get_json(self, url, params=None, headers=None, timeout=None):
+        return self.request('GET', url, params=params, headers=headers, timeout=timeout).json()
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def shared_pool():
+    """The process-wide pool used by the job feeds"""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = HTTPPool()
+        return _shared_pool
+
+
+def _reset_after_fork():
+    # A forked child gets fresh locks, in case a parent thread held one, and no shared connections
+    global _shared_pool, _shared_lock
+    _shared_pool = None
+    _shared_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
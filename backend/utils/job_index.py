@@ -0,0 +1,348 @@
+"""
+Incremental job index.
+
+The index keeps one TF-IDF row per posting, addressed by job ID, along
+with a hash of the fields that feed it. Per-row state lives in NumPy
+arrays (the 64-bit key of the job ID, the content hash and the job's
+position in the feed it came from), and jobs are read from that feed (a
+JobStore) on demand, so the index holds no Python object per job beyond
+its preprocessed text. When the job feed is refreshed
+only added or changed postings are preprocessed and vectorized, using the
+vocabulary and IDF weights frozen at the last fit; changed and removed
+postings leave a tombstoned row behind. Once enough rows have churned, or
+the fit is old, the index is refitted from the preprocessed texts it
+already holds, so a rebuild never re-lemmatizes unchanged postings.
+
+Full fits are snapshotted to disk (see job_index_snapshot) so a new
+process serving the same jobs starts without fitting at all.
+
+top_jobs picks its retrieval path by corpus size. Below ANN_MIN_JOBS live
+jobs, the default BM25 ranker runs exact MaxScore top-k over the whole
+corpus (or exhaustive cosine with AI_ENGINE_RANKER=tfidf). From
+ANN_MIN_JOBS on, which is what serves a production-sized feed, the IVF
+index (see ann_index) narrows the corpus to ANN_RERANK_FACTOR candidates
+per job asked for, plus the best skill matches when skills are blended,
+and BM25 reranks only those.
+"""
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from utils.job_index_snapshot import job_data_fingerprint, load_job_index, save_job_index
+
+# Refit once rows added or tombstoned since the last fit exceed this share of live rows
+REBUILD_FRACTION = 0.2
+
+# Refit at least this often, so IDF weights follow the corpus (AI_ENGINE_JOB_INDEX_REBUILD_SECONDS)
+REBUILD_SECONDS = int(os.getenv('AI_ENGINE_JOB_INDEX_REBUILD_SECONDS', 24 * 60 * 60))
+
+# Recommendations switch to approximate retrieval (see ann_index) at this many live jobs
+ANN_MIN_JOBS = int(os.getenv('AI_ENGINE_ANN_MIN_JOBS', 100000))
+
+# How top_jobs ranks: 'bm25' (see bm25_index) or 'tfidf' cosine (AI_ENGINE_RANKER)
+RANKER = os.getenv('AI_ENGINE_RANKER', 'bm25')
+
+# ANN candidates reranked by BM25 per job asked for, on corpora of ANN_MIN_JOBS or more
+ANN_RERANK_FACTOR = 20
+
+
+def job_content_hash(job):
+    """64-bit hash of the job fields that feed its index row"""
+    record = [job.get('title', ''), job.get('description', ''), list(job.get('required_skills', []))]
+    return int.from_bytes(hashlib.sha256(json.dumps(record, ensure_ascii=False).encode('utf-8')).digest()[:8], 'little')
+
+
+def id_key(job_id):
+    """64-bit key of a job ID, for looking jobs up in arrays of rows"""
+    return int.from_bytes(hashlib.blake2b(str(job_id).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def id_keys(jobs):
+    """Keys of the IDs of a sequence of jobs, as an array"""
+    return np.fromiter((id_key(job['id']) for job in jobs), dtype=np.uint64, count=len(jobs))
+
+
+def unique_positions(keys):
+    """Positions to keep from a key array with repeats, as a dict keyed by them would keep them
+
+    Each key keeps the place of its first occurrence and the value of its last.
+    """
+    _, first = np.unique(keys, return_index=True)
+    _, last = np.unique(keys[::-1], return_index=True)
+    last = len(keys) - 1 - last
+    return last[np.argsort(first, kind='stable')]
+
+
+class RowLookup:
+    """Rows by job ID key: a sorted copy of the keys searched with searchsorted"""
+
+    def __init__(self, keys, rows):
+        order = np.argsort(keys, kind='stable')
+        self.keys = np.asarray(keys)[order]
+        self.rows = np.asarray(rows, dtype=np.int64)[order]
+
+    def rows_for(self, keys):
+        """Row of each key, -1 where there is none"""
+        keys = np.asarray(keys, dtype=np.uint64)
+        if not len(self.keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        found = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return np.where(self.keys[found] == keys, self.rows[found], -1)
+
+
+class RowJobs:
+    """Job of each index row, read from the feed the rows point into; None once tombstoned"""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return len(self.index.positions)
+
+    def __getitem__(self, row):
+        position = self.index.positions[row]
+        return self.index.source[position] if position >= 0 else None
+
+
+def job_text(job):
+    """Text indexed for a job: title, description and skills"""
+    return f"{job['title']} {job['description']} {' '.join(job['required_skills'])}"
+
+
+class JobIndex:
+    def __init__(self, preprocess, vectorizer_factory):
+        self.preprocess = preprocess
+        self.vectorizer_factory = vectorizer_factory
+        self.vectorizer = None
+        self.vectors = None
+        self.source = []                                # jobs the rows point into
+        self.positions = np.zeros(0, dtype=np.int64)    # position in source per row, -1 once tombstoned
+        self.keys = np.zeros(0, dtype=np.uint64)        # job ID key per row
+        self.hashes = np.zeros(0, dtype=np.uint64)      # content hash per row
+        self.texts = []                                 # preprocessed text per row
+        self.live = np.zeros(0, dtype=bool)
+        self.jobs = RowJobs(self)
+        self.churn = 0
+        self.built_at = 0.0
+        self.ann = None
+        self.bm25 = None
+        self._lookup = None
+        self._scatter_rows = None
+
+    def __len__(self):
+        return int(np.count_nonzero(self.live))
+
+    def rows_for(self, keys):
+        """Live row of each job ID key, -1 for jobs not in the index"""
+        if self._lookup is None:
+            rows = np.flatnonzero(self.live)
+            self._lookup = RowLookup(self.keys[rows], rows)
+        return self._lookup.rows_for(keys)
+
+    def row_for(self, job_id):
+        """Live row of a job, or None"""
+        row = int(self.rows_for([id_key(job_id)])[0])
+        return row if row >= 0 else None
+
+    def _unchanged(self, rows, hashes):
+        """Whether each row (-1 for none) holds content with the given hash"""
+        same = rows >= 0
+        same[same] = self.hashes[rows[same]] == hashes[same]
+        return same
+
+    def _texts_for(self, jobs, keys, hashes):
+        """Preprocessed texts for jobs, reusing rows whose content is unchanged"""
+        rows = self.rows_for(keys)
+        reuse = self._unchanged(rows, hashes)
+        return [self.texts[row] if same else self.preprocess(job_text(job))
+                for job, row, same in zip(jobs, rows.tolist(), reuse.tolist())]
+
+    def build(self, jobs):
+        """Fit vocabulary and IDF weights on the jobs and vectorize all of them"""
+        keys = id_keys(jobs)
+        positions = unique_positions(keys)
+        if len(positions) == len(jobs):
+            positions = np.arange(len(jobs), dtype=np.int64)
+            selected = jobs
+        else:
+            selected = [jobs[position] for position in positions.tolist()]
+        keys = keys[positions]
+        hashes = np.fromiter((job_content_hash(job) for job in selected), dtype=np.uint64, count=len(selected))
+        fingerprint = job_data_fingerprint(selected)
+        snapshot = load_job_index(fingerprint, self.vectorizer_factory)
+        if snapshot:
+            vectorizer, vectors, texts = snapshot
+        else:
+            texts = self._texts_for(selected, keys, hashes)
+            vectorizer = self.vectorizer_factory()
+            vectors = vectorizer.fit_transform(texts)
+            save_job_index(fingerprint, vectorizer, vectors, texts)
+
+        self.vectorizer = vectorizer
+        self.vectors = vectors.tocsr()
+        self.source = jobs
+        self.positions = positions.astype(np.int64)
+        self.keys = keys
+        self.hashes = hashes
+        self.texts = list(texts)
+        self.live = np.ones(len(positions), dtype=bool)
+        self.churn = 0
+        self.built_at = time.time()
+        self.ann = None
+        self.bm25 = None
+        self._lookup = None
+        self._scatter_rows = None
+
+    def _tombstone(self, rows):
+        self.positions[rows] = -1
+        self.live[rows] = False
+        for row in rows.tolist():
+            self.texts[row] = None
+        self.churn += len(rows)
+
+    def update(self, jobs, changed=None):
+        """Apply a fresh job feed: index added and changed jobs, tombstone removed ones
+
+        changed, when known (e.g. from the feed's change log), holds the IDs
+        whose content may differ; other jobs already indexed are taken as
+        unchanged without hashing them. Returns counts of the changes and
+        whether the index was refitted.
+        """
+        if self.vectorizer is None:
+            self.build(jobs)
+            return {"added": len(self), "changed": 0, "removed": 0, "rebuilt": True}
+
+        positions = unique_positions(id_keys(jobs)) if len(jobs) else np.zeros(0, dtype=np.int64)
+        keys = id_keys(jobs)[positions] if len(jobs) else np.zeros(0, dtype=np.uint64)
+        rows = self.rows_for(keys)
+        live_rows = np.flatnonzero(self.live)
+        removed = live_rows[~np.isin(self.keys[live_rows], keys)]
+
+        # Jobs the change log vouches for keep their rows without hashing
+        known = rows >= 0
+        trusted = np.zeros(len(keys), dtype=bool)
+        if changed is not None:
+            changed_keys = np.fromiter((id_key(job_id) for job_id in changed), dtype=np.uint64, count=len(changed))
+            trusted = known & ~np.isin(keys, changed_keys)
+        checked = np.flatnonzero(~trusted)
+        hashes = np.fromiter((job_content_hash(jobs[position]) for position in positions[checked].tolist()),
+                             dtype=np.uint64, count=len(checked))
+        checked_rows = rows[checked]
+        # Unchanged content keeps its row, but display fields come from the new feed
+        same = self._unchanged(checked_rows, hashes)
+        kept = np.concatenate([np.flatnonzero(trusted), checked[same]])
+        self.positions[rows[kept]] = positions[kept]
+        self.source = jobs
+
+        changed_rows = checked_rows[(checked_rows >= 0) & ~same]
+        self._tombstone(changed_rows)
+        self._tombstone(removed)
+        added = checked[~same]
+        if len(added):
+            texts = [self.preprocess(job_text(jobs[position])) for position in positions[added].tolist()]
+            from scipy.sparse import vstack
+            self.vectors = vstack([self.vectors, self.vectorizer.transform(texts)], format='csr')
+            self.positions = np.concatenate([self.positions, positions[added]])
+            self.keys = np.concatenate([self.keys, keys[added]])
+            self.hashes = np.concatenate([self.hashes, hashes[~same]])
+            self.texts.extend(texts)
+            self.live = np.concatenate([self.live, np.ones(len(added), dtype=bool)])
+            self.churn += len(added)
+
+        if len(added) or len(removed):
+            # BM25 statistics cover the whole corpus; rebuilt on the next query
+            self.bm25 = None
+            self._lookup = None
+            self._scatter_rows = None
+        rebuilt = False
+        if self.churn > REBUILD_FRACTION * max(len(self), 1) or time.time() - self.built_at > REBUILD_SECONDS:
+            # Refit on the live jobs in feed order; unchanged texts are reused
+            self.build(jobs)
+            rebuilt = True
+        return {"added": len(added) - len(changed_rows), "changed": len(changed_rows), "removed": len(removed),
+                "rebuilt": rebuilt}
+
+    def similarities(self, text):
+        """Cosine similarity of a preprocessed text to every row; tombstoned rows score -1"""
+        query = self.vectorizer.transform([text])
+        # TF-IDF rows are L2-normalised, so the dot product is the cosine
+        scores = (self.vectors @ query.T).toarray().ravel()
+        scores[~self.live] = -1.0
+        return scores
+
+    def ensure_ann(self):
+        """Build the approximate retrieval index if it has not been built since the last fit"""
+        if self.ann is None:
+            from utils.ann_index import IVFIndex
+            self.ann = IVFIndex().build(self.vectors, self.live)
+        return self.ann
+
+    def ensure_bm25(self):
+        """Build the BM25 index if it has not been built since the jobs last changed"""
+        if self.bm25 is None:
+            from utils.bm25_index import BM25Index
+            self.bm25 = BM25Index().build(self.texts, self.live, self.vectorizer)
+        return self.bm25
+
+    def scatter(self, keys, values):
+        """Values given in the order of an array of job ID keys, laid out by row; rows not listed get 0"""
+        if self._scatter_rows is None or self._scatter_rows[0] is not keys:
+            # Mapping cached for the same key array, e.g. the skill index's rows
+            self._scatter_rows = (keys, self.rows_for(keys))
+        rows = self._scatter_rows[1]
+        result = np.zeros(len(self.jobs), dtype=np.float32)
+        result[rows[rows >= 0]] = np.asarray(values)[rows >= 0]
+        return result
+
+    def top_jobs(self, text, top_n=5, skill_scores=None, skill_weight=None):
+        """Best matching live jobs for a preprocessed text as (job, similarity) pairs
+
+        With the BM25 ranker, jobs are ordered by BM25 (blended with
+        skill_scores, the skill-overlap share per row, when skill_weight is
+        set) and the cosine similarity is reported for the jobs returned.
+        From ANN_MIN_JOBS live jobs on, only ANN candidates are ranked.
+        """
+        top_n = min(top_n, len(self))
+        if top_n <= 0:
+            return []
+        if RANKER == 'bm25':
+            from utils.bm25_index import SKILL_WEIGHT
+            if skill_weight is None:
+                skill_weight = SKILL_WEIGHT
+        if len(self) >= ANN_MIN_JOBS:
+            query = self.vectorizer.transform([text])
+            if RANKER != 'bm25':
+                # Candidates from the nprobe nearest clusters, reranked exactly
+                rows, scores = self.ensure_ann().search(query, self.vectors, self.live, top_n)
+                return [(self.jobs[row], float(score)) for row, score in zip(rows, scores)]
+            rows, _ = self.ensure_ann().search(query, self.vectors, self.live, top_n * ANN_RERANK_FACTOR)
+            if skill_weight and skill_scores is not None:
+                # Strong skill matches compete even when their text sits in other clusters
+                shares = np.where(self.live, np.asarray(skill_scores, dtype=np.float32), 0.0)
+                count = min(top_n * ANN_RERANK_FACTOR, len(shares))
+                best = np.argpartition(-shares, count - 1)[:count]
+                rows = np.union1d(rows, best[shares[best] > 0])
+            scores = self.ensure_bm25().score_rows(text, rows, skill_scores, skill_weight)
+            rows = rows[np.argsort(-scores, kind='stable')[:top_n]]
+            similarities = (self.vectors[rows] @ query.T).toarray().ravel()
+            return [(self.jobs[row], float(score)) for row, score in zip(rows, similarities)]
+        if RANKER == 'bm25':
+            rows, _ = self.ensure_bm25().search(text, top_n, skill_scores, skill_weight)
+            if len(rows) < top_n:
+                # Fewer jobs share a term than asked for; fill up with live jobs, as cosine ranking does
+                rest = np.setdiff1d(np.flatnonzero(self.live), rows)[:top_n - len(rows)]
+                rows = np.concatenate([rows, rest])
+            query = self.vectorizer.transform([text])
+            similarities = (self.vectors[rows] @ query.T).toarray().ravel()
+            return [(self.jobs[row], float(score)) for row, score in zip(rows, similarities)]
+        scores = self.similarities(text)
+        candidates = np.argpartition(-scores, top_n - 1)[:top_n]
+        rows = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(self.jobs[row], float(scores[row])) for row in rows]
+
+    def live_jobs(self):
+        """Jobs currently in the index, in row order"""
+        return [self.source[position] for position in self.positions[self.live].tolist()]
@@ -0,0 +1,111 @@
+"""
+Snapshots of the fitted job index.
+
+Fitting the job index means tokenizing and lemmatizing every posting and
+refitting TF-IDF, which is minutes of CPU for a large corpus. A snapshot
+stores the result (vocabulary, IDF weights, the sparse job vectors and the
+preprocessed job texts) in a NumPy archive named after a fingerprint of
+the job data, so a process that sees the same jobs loads it instead.
+"""
+import glob
+import hashlib
+import json
+import os
+import sys
+import zipfile
+
+import numpy as np
+
+from utils.engine_cache import atomic_write, cache_dir
+
+# Bump when the snapshot layout or the text preprocessing changes
+SNAPSHOT_VERSION = 1
+
+# Number of snapshots kept on disk; older ones are removed after each save
+SNAPSHOTS_TO_KEEP = 3
+
+
+def job_data_fingerprint(jobs):
+    """Hash of the job fields that feed the index"""
+    if getattr(jobs, 'index_fingerprint', None):
+        # A JobStore hashed its jobs when it was built
+        return jobs.index_fingerprint
+    digest = hashlib.sha256(f"job-index-v{SNAPSHOT_VERSION}".encode('utf-8'))
+    for job in jobs:
+        record = [str(job.get('id', '')), job.get('title', ''), job.get('description', ''),
+                  list(job.get('required_skills', []))]
+        digest.update(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def _snapshot_path(fingerprint):
+    return os.path.join(cache_dir('job_index'), f"{fingerprint}.npz")
+
+
+def save_job_index(fingerprint, vectorizer, job_vectors, job_texts):
+    """Persist a fitted vectorizer, its job vectors and the preprocessed texts"""
+    vocabulary = sorted(vectorizer.vocabulary_.items(), key=lambda item: item[1])
+    job_vectors = job_vectors.tocsr()
+
+    def write(f):
+        np.savez(
+            f,
+            version=np.array(SNAPSHOT_VERSION),
+            terms=np.array([term for term, _ in vocabulary], dtype=str),
+            idf=np.asarray(vectorizer.idf_),
+            data=job_vectors.data,
+            indices=job_vectors.indices,
+            indptr=job_vectors.indptr,
+            shape=np.array(job_vectors.shape),
+            # Preprocessed texts contain no newlines, so one joined UTF-8 blob
+            # loads much faster than a fixed-width string array
+            job_texts=np.frombuffer('\n'.join(job_texts).encode('utf-8'), dtype=np.uint8),
+            job_count=np.array(len(job_texts))
+        )
+
+    try:
+        atomic_write(_snapshot_path(fingerprint), write)
+        _prune_snapshots()
+    except OSError as e:
+        print(f"Error saving job index snapshot: {e}", file=sys.stderr)
+
+
+def load_job_index(fingerprint, vectorizer_factory):
+    """Load the snapshot for a fingerprint as (vectorizer, job_vectors, job_texts), or None"""
+    path = _snapshot_path(fingerprint)
+    if not os.path.exists(path):
+        return None
+    try:
+        from scipy.sparse import csr_matrix
+
+        with np.load(path, allow_pickle=False) as snapshot:
+            if int(snapshot['version']) != SNAPSHOT_VERSION:
+                return None
+            vectorizer = vectorizer_factory()
+            vectorizer.vocabulary_ = {term: index for index, term in enumerate(snapshot['terms'].tolist())}
+            vectorizer.idf_ = snapshot['idf']
+            job_vectors = csr_matrix(
+                (snapshot['data'], snapshot['indices'], snapshot['indptr']),
+                shape=tuple(snapshot['shape'])
+            )
+            job_count = int(snapshot['job_count'])
+            job_texts = snapshot['job_texts'].tobytes().decode('utf-8').split('\n') if job_count else []
+        # Mark as recently used so pruning keeps it
+        os.utime(path)
+        return vectorizer, job_vectors, job_texts
+    except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile) as e:
+        # Empty, truncated or foreign files are refitted and overwritten
+        print(f"Error loading job index snapshot: {e}", file=sys.stderr)
+        return None
+
+
+def _prune_snapshots():
+    """Keep only the most recently used snapshots"""
+    paths = sorted(glob.glob(os.path.join(cache_dir('job_index'), '*.npz')),
+                   key=os.path.getmtime, reverse=True)
+    for path in paths[SNAPSHOTS_TO_KEEP:]:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
@@ -0,0 +1,214 @@
+"""
+Incremental ingestion of job feeds.
+
+Each source reports a FeedDelta against the cursor it returned last time
+(a timestamp, ETag or whatever the feed understands): the postings that
+are new or updated, the IDs it withdrew, and whether the postings are
+everything it lists (a snapshot) rather than only what changed. Deltas are
+merged into the stored corpus by job ID, so a refresh costs what changed
+in the feeds rather than the whole feed.
+
+Every record carries the source it came from and the day it was last
+reported. Postings a snapshot source no longer lists are removed; postings
+not reported for RETENTION_DAYS are expired, which is how deletions reach
+the corpus from feeds that only ever send updates.
+
+Cursors are saved next to the corpus together with its fingerprint, and
+are only trusted while that corpus is the newest one on disk; otherwise
+ingestion starts over with full fetches. Each merge appends an entry to a
+change log (added, changed and removed IDs between two corpus
+fingerprints) so downstream indexes can apply the difference without
+diffing the whole corpus.
+"""
+import datetime
+import hashlib
+import json
+import os
+import sys
+import time
+
+from utils.engine_cache import atomic_write
+
+# Postings not reported by their source for this many days are dropped (AI_ENGINE_JOB_RETENTION_DAYS)
+RETENTION_DAYS = float(os.getenv('AI_ENGINE_JOB_RETENTION_DAYS', 30))
+
+# Change log entries kept; consumers further behind than this diff the whole corpus
+CHANGE_LOG_ENTRIES = 100
+
+# Bookkeeping fields added to every stored record
+SOURCE_FIELD = "feed"
+SEEN_FIELD = "seen_on"
+
+
+class FeedDelta:
+    """What one source reported since its cursor
+
+    jobs are new or updated postings and removed the IDs the source
+    withdrew. complete means jobs is everything the source lists, so its
+    postings missing from them are removed. cursor is saved and handed
+    back to the source on its next fetch.
+    """
+
+    def __init__(self, jobs=(), removed=(), cursor=None, complete=False):
+        self.jobs = list(jobs)
+        self.removed = [str(job_id) for job_id in removed]
+        self.cursor = cursor
+        self.complete = complete
+
+    @classmethod
+    def snapshot(cls, jobs, cursor=None):
+        return cls(jobs, cursor=cursor, complete=True)
+
+    def __repr__(self):
+        kind = "snapshot" if self.complete else "delta"
+        return f"FeedDelta({kind}, {len(self.jobs)} jobs, {len(self.removed)} removed)"
+
+
+def job_key(job):
+    """Corpus key of a posting: its ID, or a content hash for postings without one
+
+    The hash leaves out the bookkeeping fields, so a stored record keeps the
+    key of the posting it was made from.
+    """
+    if job.get('id') is not None:
+        return str(job['id'])
+    posting = {field: value for field, value in job.items() if field not in (SOURCE_FIELD, SEEN_FIELD)}
+    return hashlib.sha256(json.dumps(posting, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _content(record):
+    return {field: value for field, value in record.items() if field != SEEN_FIELD}
+
+
+def merge_deltas(records, deltas, today=None, retention_days=RETENTION_DAYS):
+    """Apply source deltas to corpus records; returns (records, changes)
+
+    deltas maps source names to FeedDeltas and is applied in order, so a
+    later source wins an ID both report. Records keep their corpus order
+    and new ones are appended. changes lists added, changed and removed
+    keys between the old and new records, plus how many were expired.
+    """
+    today = today or datetime.date.today()
+    seen_on = today.isoformat()
+    corpus = {job_key(record): dict(record) for record in records}
+    before = dict(corpus)
+    reported = set()
+
+    for name, delta in deltas.items():
+        incoming = {job_key(job): job for job in delta.jobs}
+        withdrawn = set(delta.removed)
+        if delta.complete:
+            withdrawn.update(key for key, record in corpus.items()
+                             if record.get(SOURCE_FIELD) == name and key not in incoming)
+        for key in withdrawn:
+            if key not in incoming and corpus.get(key, {}).get(SOURCE_FIELD) == name:
+                del corpus[key]
+        for key, job in incoming.items():
+            reported.add(key)
+            corpus[key] = {**job, SOURCE_FIELD: name, SEEN_FIELD: seen_on}
+
+    cutoff = (today - datetime.timedelta(days=retention_days)).isoformat()
+    expired = [key for key, record in corpus.items() if record.get(SEEN_FIELD, '') < cutoff]
+    for key in expired:
+        del corpus[key]
+
+    changes = {
+        "added": [key for key in corpus if key not in before],
+        "changed": [key for key in corpus if key in reported and key in before
+                    and _content(corpus[key]) != _content(before[key])],
+        "removed": [key for key in before if key not in corpus],
+        "expired": len(expired)
+    }
+    return list(corpus.values()), changes
+
+
+def load_cursors(directory, fingerprint):
+    """Saved source cursors, or None if they were not saved with this corpus fingerprint"""
+    try:
+        with open(os.path.join(directory, 'cursors.json'), 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not fingerprint or saved.get("fingerprint") != fingerprint:
+        return None
+    return saved.get("cursors", {})
+
+
+def save_cursors(directory, fingerprint, cursors):
+    data = json.dumps({"fingerprint": fingerprint, "cursors": cursors}, ensure_ascii=False).encode('utf-8')
+    try:
+        atomic_write(os.path.join(directory, 'cursors.json'), lambda f: f.write(data))
+    except (OSError, TypeError) as e:
+        print(f"Error saving feed cursors: {e}", file=sys.stderr)
+
+
+class ChangeLog:
+    """JSON-lines log of corpus changes, one entry per merge that changed the corpus"""
+
+    def __init__(self, path, max_entries=CHANGE_LOG_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+
+    def entries(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError):
+            return []
+
+    def append(self, previous, fingerprint, changes):
+        """Record the changes that took the corpus from the previous fingerprint to this one
+
+        A merge without a previous corpus is logged as a reset, without IDs;
+        consumers have to diff the whole corpus across it.
+        """
+        entries = self.entries()
+        entry = {"seq": entries[-1]["seq"] + 1 if entries else 1, "at": time.time(),
+                 "from": previous, "to": fingerprint}
+        if previous is None:
+            entry["reset"] = True
+        else:
+            entry.update({name: changes[name] for name in ("added", "changed", "removed")})
+        entries = entries[-(self.max_entries - 1):] + [entry]
+        data = ''.join(json.dumps(item, ensure_ascii=False) + '\n' for item in entries).encode('utf-8')
+        try:
+            atomic_write(self.path, lambda f: f.write(data))
+        except OSError as e:
+            print(f"Error saving change log: {e}", file=sys.stderr)
+        return entry
+
+    def since(self, previous, fingerprint):
+        """Net added, changed and removed IDs from one corpus fingerprint to another
+
+        None when the log does not link the two, e.g. across a reset or
+        when the older entries were trimmed.
+        """
+        if previous is None:
+            return None
+        if previous == fingerprint:
+            return {"added": set(), "changed": set(), "removed": set()}
+        added, changed, removed = set(), set(), set()
+        current = previous
+        for entry in self.entries():
+            # Resets have no "from", so they break the chain
+            if entry["from"] != current:
+                continue
+            for key in entry["removed"]:
+                if key in added:
+                    added.discard(key)
+                else:
+                    changed.discard(key)
+                    removed.add(key)
+            for key in entry["changed"]:
+                if key not in added:
+                    changed.add(key)
+            for key in entry["added"]:
+                if key in removed:
+                    removed.discard(key)
+                    changed.add(key)
+                else:
+                    added.add(key)
+            current = entry["to"]
+            if current == fingerprint:
+                return {"added": added, "changed": changed, "removed": removed}
+        return None
@@ -0,0 +1,328 @@
+"""
+Columnar, memory-mappable job store.
+
+A list of job dicts costs a Python object per field per posting. The store
+keeps the corpus as a handful of flat NumPy arrays instead, laid out by a
+schema of three kinds of column:
+
+    text       UTF-8 blob + int64 offsets                 (id, title, description, ...)
+    interned   int32 codes into a string table            (company, location)
+    lists      int32 codes into a string table + offsets  (required_skills)
+
+A per-row bitmask records which schema fields the record had, and any
+field outside the schema, or a schema field whose value is not a string
+(or list of strings), is kept as JSON in a side column, so a record reads
+back exactly as it was written. JOB_SCHEMA is the engine's job format;
+FEED_SCHEMA is the raw job feed format cached by RealTimeDataFetcher.
+
+Saved stores are one .npy file per array plus meta.json (layout version,
+schema, fingerprints, creation time) in a directory under the cache root.
+The store fingerprint hashes every array, so any change to any field of
+any record gives a new store; index_fingerprint hashes only the fields
+the job index reads and keys its snapshots.
+The directory is written under a temporary name and renamed into place,
+so readers only ever see complete stores. Opening one memory-maps the
+arrays (mmap_mode='r'): it costs almost nothing and every worker shares
+the same page cache. JobRow is a read-only mapping over one record, so
+code written against job dicts (job['title'], job.get('company', ''))
+works unchanged.
+"""
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from utils.engine_cache import cache_dir
+from utils.job_index_snapshot import SNAPSHOT_VERSION, job_data_fingerprint
+
+# Bump when the on-disk layout changes
+STORE_VERSION = 3
+
+# Stores kept on disk per directory; older ones are removed after each save
+STORES_TO_KEEP = 2
+
+JOB_SCHEMA = {
+    "text": ("id", "title", "description", "url", "created_at"),
+    "interned": ("company", "location"),
+    "lists": ("required_skills",)
+}
+FEED_SCHEMA = {
+    "text": ("id", "title", "description", "url", "created_at"),
+    # feed and seen_on are the ingest bookkeeping fields (see job_ingest)
+    "interned": ("company", "location", "feed", "seen_on"),
+    "lists": ("skills",)
+}
+
+
+class StringTable:
+    """Strings stored as one UTF-8 blob with start offsets"""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+        # Slicing a memoryview is far cheaper than slicing a memmap
+        self.buffer = memoryview(np.ascontiguousarray(blob)).cast('B')
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [str(value).encode('utf-8') for value in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8) if encoded else np.zeros(0, dtype=np.uint8)
+        return cls(blob, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return str(self.buffer[self.offsets[index]:self.offsets[index + 1]], 'utf-8')
+
+    def strings(self):
+        """Every string in the table, decoded"""
+        return [self[index] for index in range(len(self))]
+
+
+def _intern(values):
+    """(codes, table) for a column of repeated strings"""
+    lookup = {}
+    codes = np.array([lookup.setdefault(value, len(lookup)) for value in values], dtype=np.int32)
+    return codes, StringTable.from_strings(lookup)
+
+
+def _schema_fields(schema):
+    return tuple(schema["text"]) + tuple(schema["interned"]) + tuple(schema["lists"])
+
+
+def _fits_column(kind, value):
+    """Whether a value can be stored in a column of this kind without changing its type"""
+    if kind == "lists":
+        return isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value)
+    return isinstance(value, str)
+
+
+class JobRow(Mapping):
+    """Read-only dict-like view of one record in a JobStore"""
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __getitem__(self, field):
+        return self.store.value(self.index, field)
+
+    def __iter__(self):
+        return iter(self.store.keys(self.index))
+
+    def __len__(self):
+        return len(self.store.keys(self.index))
+
+    def __repr__(self):
+        return f"JobRow({dict(self)!r})"
+
+
+class JobStore(Sequence):
+    def __init__(self, arrays, schema=JOB_SCHEMA, fingerprint=None, created_at=None, source=None,
+                 index_fingerprint=None):
+        self.arrays = arrays
+        self.schema = {kind: tuple(fields) for kind, fields in schema.items()}
+        self.fields = _schema_fields(self.schema)
+        self.positions = {field: position for position, field in enumerate(self.fields)}
+        # Hash of every field of every record; names the saved store
+        self.fingerprint = fingerprint or store_fingerprint(arrays, self.schema)
+        # Hash of the fields the job index reads (see job_index_snapshot)
+        self.index_fingerprint = index_fingerprint
+        self.created_at = created_at or time.time()
+        # Fingerprint of the data this store was derived from, if any
+        self.source = source
+        self.present = arrays["present"]
+        self.extra = StringTable(arrays["extra_blob"], arrays["extra_offsets"])
+        self.text = {field: StringTable(arrays[f"{field}_blob"], arrays[f"{field}_offsets"])
+                     for field in self.schema["text"]}
+        self.tables = {field: StringTable(arrays[f"{field}_table_blob"], arrays[f"{field}_table_offsets"])
+                       for field in self.schema["interned"] + self.schema["lists"]}
+        self._decoded = {}  # string table name -> decoded strings, filled on first use
+
+    @classmethod
+    def from_jobs(cls, jobs, schema=JOB_SCHEMA, source=None):
+        """Build a store from job dicts; source names the data they were derived from"""
+        fields = _schema_fields(schema)
+        kinds = {field: kind for kind in schema for field in schema[kind]}
+        present = np.zeros(len(jobs), dtype=np.uint32)
+        columns = {field: [] for field in fields}
+        extras = []
+        for row, job in enumerate(jobs):
+            extra = {}
+            for field, value in job.items():
+                if field in kinds and _fits_column(kinds[field], value):
+                    present[row] |= 1 << fields.index(field)
+                else:
+                    extra[field] = value
+            for position, field in enumerate(fields):
+                if present[row] >> position & 1:
+                    columns[field].append(job[field])
+                else:
+                    columns[field].append([] if kinds[field] == "lists" else "")
+            extras.append(json.dumps(extra, ensure_ascii=False) if extra else "")
+
+        arrays = {"present": present}
+        table = StringTable.from_strings(extras)
+        arrays["extra_blob"], arrays["extra_offsets"] = table.blob, table.offsets
+        for field in schema["text"]:
+            table = StringTable.from_strings(columns[field])
+            arrays[f"{field}_blob"], arrays[f"{field}_offsets"] = table.blob, table.offsets
+        for field in schema["interned"]:
+            arrays[f"{field}_codes"], table = _intern(columns[field])
+            arrays[f"{field}_table_blob"], arrays[f"{field}_table_offsets"] = table.blob, table.offsets
+        for field in schema["lists"]:
+            arrays[f"{field}_codes"], table = _intern([item for items in columns[field] for item in items])
+            arrays[f"{field}_table_blob"], arrays[f"{field}_table_offsets"] = table.blob, table.offsets
+            arrays[f"{field}_offsets"] = np.zeros(len(jobs) + 1, dtype=np.int64)
+            np.cumsum([len(items) for items in columns[field]], out=arrays[f"{field}_offsets"][1:])
+        return cls(arrays, schema, source=source, index_fingerprint=job_data_fingerprint(jobs))
+
+    def __len__(self):
+        return len(self.present)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [JobRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("job index out of range")
+        return JobRow(self, index)
+
+    def _extra(self, index):
+        text = self.extra[index]
+        return json.loads(text) if text else {}
+
+    def keys(self, index):
+        """Fields of one record, schema fields first"""
+        present = int(self.present[index])
+        keys = [field for position, field in enumerate(self.fields) if present >> position & 1]
+        return keys + list(self._extra(index))
+
+    def value(self, index, field):
+        """One field of one record"""
+        position = self.positions.get(field)
+        if position is None or not int(self.present[index]) >> position & 1:
+            extra = self._extra(index)
+            if field not in extra:
+                raise KeyError(field)
+            return extra[field]
+        if field in self.text:
+            return self.text[field][index]
+        strings = self._table(field)
+        codes = self.arrays[f"{field}_codes"]
+        if field in self.schema["interned"]:
+            return strings[codes[index]]
+        offsets = self.arrays[f"{field}_offsets"]
+        return [strings[code] for code in codes[offsets[index]:offsets[index + 1]].tolist()]
+
+    def _table(self, field):
+        """Decoded string table; these are small next to the rows that use them"""
+        if field not in self._decoded:
+            self._decoded[field] = self.tables[field].strings()
+        return self._decoded[field]
+
+    def save(self, root=None):
+        """Write the store into a directory named by its fingerprint under root (job_store by default)"""
+        root = root or cache_dir('job_store')
+        os.makedirs(root, exist_ok=True)
+        path = os.path.join(root, self.fingerprint)
+        if os.path.isdir(path):
+            # Same content as a saved store; restamp it as the newest
+            _touch_store(path, self.created_at, self.source)
+            return path
+        temp_path = f"{path}.tmp-{os.getpid()}"
+        try:
+            os.makedirs(temp_path, exist_ok=True)
+            for name, array in self.arrays.items():
+                np.save(os.path.join(temp_path, f"{name}.npy"), np.ascontiguousarray(array))
+            meta = {"version": STORE_VERSION, "snapshot_version": SNAPSHOT_VERSION, "schema": self.schema,
+                    "fingerprint": self.fingerprint, "index_fingerprint": self.index_fingerprint,
+                    "created_at": self.created_at, "count": len(self), "source": self.source}
+            with open(os.path.join(temp_path, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            # Readers only ever see complete directories
+            os.replace(temp_path, path)
+        except OSError as e:
+            shutil.rmtree(temp_path, ignore_errors=True)
+            if not os.path.isdir(path):
+                print(f"Error saving job store: {e}", file=sys.stderr)
+                return None
+        _prune_stores(root)
+        return path
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a saved store, or None if it was written in another layout"""
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        # The index fingerprint is the job index snapshot key, so it must use the same scheme
+        if meta.get("version") != STORE_VERSION or meta.get("snapshot_version") != SNAPSHOT_VERSION:
+            return None
+        arrays = {os.path.basename(name)[:-4]: np.load(name, mmap_mode='r', allow_pickle=False)
+                  for name in glob.glob(os.path.join(path, "*.npy"))}
+        return cls(arrays, meta["schema"], fingerprint=meta["fingerprint"], created_at=meta["created_at"],
+                   source=meta.get("source"), index_fingerprint=meta.get("index_fingerprint"))
+
+
+def store_fingerprint(arrays, schema):
+    """Hash of a store's schema and the contents of all its arrays"""
+    digest = hashlib.sha256(f"job-store-v{STORE_VERSION}".encode('utf-8'))
+    digest.update(json.dumps(schema, sort_keys=True).encode('utf-8'))
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(f"\n{name}:{array.dtype.str}:{array.shape}\n".encode('utf-8'))
+        digest.update(memoryview(array).cast('B'))
+    return digest.hexdigest()
+
+
+def _touch_store(path, created_at, source=None):
+    """Rewrite a store's creation time and source and make it the newest in its directory"""
+    meta_path = os.path.join(path, "meta.json")
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        meta["created_at"] = created_at
+        meta["source"] = source
+        temp_path = f"{meta_path}.tmp-{os.getpid()}"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(temp_path, meta_path)
+        os.utime(path)
+    except (OSError, ValueError) as e:
+        print(f"Error refreshing job store: {e}", file=sys.stderr)
+
+
+def _store_paths(root):
+    """Saved stores, newest first"""
+    paths = [path for path in glob.glob(os.path.join(root, "*"))
+             if os.path.isdir(path) and '.tmp-' not in os.path.basename(path)]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def _prune_stores(root):
+    for path in _store_paths(root)[STORES_TO_KEEP:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def open_latest_store(max_age=None, root=None):
+    """Memory-map the newest store under root (job_store by default), or None if there is none younger than max_age"""
+    for path in _store_paths(root or cache_dir('job_store'))[:1]:
+        try:
+            store = JobStore.open(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error opening job store: {e}", file=sys.stderr)
+            return None
+        if store and (max_age is None or time.time() - store.created_at < max_age):
+            return store
+    return None
@@ -0,0 +1,93 @@
+"""
+Purpose-specific spaCy pipeline configurations.
+
+The engine loads en_core_web_sm once, but no call site needs all of it:
+skill extraction only reads noun chunks, interview questions only read
+entities. Each purpose below names the components it needs; everything
+else is disabled for that call, which skips most of the per-document CPU.
+
+    python utils/nlp_pipelines.py [resume files...]
+
+benchmarks docs/sec for the full pipeline and each purpose.
+"""
+import sys
+import time
+
+# Components each purpose reads from; tok2vec is added when one of them listens to it
+PIPELINE_COMPONENTS = {
+    # doc.noun_chunks needs dependency labels and coarse POS tags
+    "noun_chunks": ("tagger", "attribute_ruler", "parser"),
+    # doc.ents
+    "entities": ("ner",),
+    # Tokens only, no statistical components
+    "tokenizer": ()
+}
+
+_disabled = {}
+
+
+def disabled_components(nlp, purpose):
+    """Names of the pipeline components a purpose does not need"""
+    key = (id(nlp), purpose)
+    if key not in _disabled:
+        required = set(PIPELINE_COMPONENTS[purpose])
+        if "tok2vec" in nlp.pipe_names:
+            listeners = getattr(nlp.get_pipe("tok2vec"), "listening_components", [])
+            if required & set(listeners):
+                required.add("tok2vec")
+        _disabled[key] = [name for name in nlp.pipe_names if name not in required]
+    return _disabled[key]
+
+
+def run_pipeline(nlp, text, purpose):
+    """Process one text with only the components a purpose needs"""
+    if purpose == "tokenizer":
+        return nlp.make_doc(text)
+    return nlp(text, disable=disabled_components(nlp, purpose))
+
+
+def pipe_pipeline(nlp, texts, purpose, batch_size=16):
+    """Process a stream of texts with only the components a purpose needs"""
+    if purpose == "tokenizer":
+        return (nlp.make_doc(text) for text in texts)
+    return nlp.pipe(texts, batch_size=batch_size, disable=disabled_components(nlp, purpose))
+
+
+def benchmark_pipelines(nlp, texts, repeat=3):
+    """Docs/sec for the full pipeline and for each purpose"""
+    results = {}
+    for purpose in [None] + list(PIPELINE_COMPONENTS):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            if purpose is None:
+                for _ in nlp.pipe(texts):
+                    pass
+            else:
+                for _ in pipe_pipeline(nlp, texts, purpose):
+                    pass
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[purpose or "full"] = {
+            "components": [name for name in nlp.pipe_names
+                           if purpose is None or name not in disabled_components(nlp, purpose)],
+            "docs_per_second": round(len(texts) / best, 2) if best > 0 else 0.0
+        }
+    return results
+
+
+if __name__ == "__main__":
+    import spacy
+
+    nlp = spacy.load("en_core_web_sm")
+    if len(sys.argv) > 1:
+        texts = []
+        for path in sys.argv[1:]:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                texts.append(f.read().lower())
+    else:
+        texts = ["senior software engineer with 5 years of experience building python and react "
+                 "applications at acme corp in new york, leading a team of four developers."] * 200
+
+    for name, result in benchmark_pipelines(nlp, texts).items():
+        print(f"{name:<12} {result['docs_per_second']:>10.2f} docs/s  ({', '.join(result['components']) or 'tokenizer'})")
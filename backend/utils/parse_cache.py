@@ -0,0 +1,131 @@
+"""
+Content-addressed cache of resume parse results.
+
+Users upload the same file many times under different names, so results
+are keyed by the SHA-256 of the file bytes (plus the file type and the
+parser version), not by path. Entries are small JSON files under
+<cache root>/parse/v<version>/. A hit refreshes the entry's mtime, and
+when the cache grows past its size cap the least recently used entries
+are evicted. Bumping the parser version starts a fresh directory and
+removes the old ones.
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+from utils.engine_cache import atomic_write, cache_dir
+
+# Default size cap; AI_ENGINE_PARSE_CACHE_MB overrides it, 0 disables the cache
+DEFAULT_MAX_MB = 64
+
+# After an eviction the cache is trimmed to this fraction of the cap
+EVICT_TO = 0.9
+
+_READ_CHUNK = 1024 * 1024
+
+
+def file_digest(file_path, file_type, version):
+    """SHA-256 of a file's bytes, salted with its type and the parser version"""
+    digest = hashlib.sha256(f"parse-v{version}:{file_type}:".encode('utf-8'))
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, version, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('AI_ENGINE_PARSE_CACHE_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.version = version
+        self.max_bytes = max_bytes
+        self.enabled = max_bytes > 0
+        self._size = None
+        self.directory = None
+        if self.enabled:
+            self.directory = cache_dir('parse', f"v{version}")
+            self._remove_other_versions()
+
+    def _remove_other_versions(self):
+        """Drop entries written by other parser versions"""
+        parent = os.path.dirname(self.directory)
+        for name in os.listdir(parent):
+            if name != os.path.basename(self.directory):
+                shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def key_for(self, file_path, file_type):
+        """Cache key for a file"""
+        return file_digest(file_path, file_type, self.version)
+
+    def get(self, key):
+        """Stored result for a key, or None"""
+        if not self.enabled:
+            return None
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            # Mark as recently used
+            os.utime(path)
+            return result
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Error reading parse cache entry: {e}", file=sys.stderr)
+            return None
+
+    def put(self, key, result):
+        """Store a parse result"""
+        if not self.enabled:
+            return
+        data = json.dumps(result).encode('utf-8')
+        try:
+            atomic_write(self._entry_path(key), lambda f: f.write(data))
+        except OSError as e:
+            print(f"Error writing parse cache entry: {e}", file=sys.stderr)
+            return
+        if self._size is None:
+            self._size = self._scan_size()
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _entries(self):
+        """(mtime, size, path) for every entry"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Remove least recently used entries until under the cap"""
+        # Other processes share the directory, so work from what is on disk
+        entries = sorted(self._entries())
+        size = sum(entry_size for _, entry_size, _ in entries)
+        target = self.max_bytes * EVICT_TO
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                os.unlink(path)
+                size -= entry_size
+            except OSError:
+                pass
+        self._size = size
@@ -0,0 +1,143 @@
+"""
+Bounded PDF text extraction.
+
+Pages are read one at a time from a generator and collected in a list that
+is joined once, so cost stays linear in the amount of text. Extraction
+stops at a page budget, a character budget, or as soon as the caller's
+`stop_when` callback reports it has seen enough (e.g. every resume section
+heading), which keeps a pathological 500-page upload from tying up a worker.
+
+Long documents (portfolios) can have their page ranges extracted across a
+process pool, since PyPDF2 is pure Python and bound to one core. The page
+budget depends on the path taken: MAX_PAGES (20) when pages are read
+in-process, POOL_MAX_PAGES (100) once a document of PARALLEL_MIN_PAGES (8)
+pages or more goes to the pool. The character budget applies to both.
+"""
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Budgets for one document; AI_ENGINE_PDF_MAX_PAGES / AI_ENGINE_PDF_MAX_CHARS override them
+MAX_PAGES = int(os.getenv('AI_ENGINE_PDF_MAX_PAGES', 20))
+MAX_CHARS = int(os.getenv('AI_ENGINE_PDF_MAX_CHARS', 100000))
+
+# Page budget when the page pool extracts the document (AI_ENGINE_PDF_POOL_MAX_PAGES)
+POOL_MAX_PAGES = int(os.getenv('AI_ENGINE_PDF_POOL_MAX_PAGES', 100))
+
+# Page pool size (AI_ENGINE_PDF_WORKERS, 1 disables it) and the page count
+# below which a document is read sequentially in-process
+WORKERS = int(os.getenv('AI_ENGINE_PDF_WORKERS', min(4, os.cpu_count() or 1)))
+PARALLEL_MIN_PAGES = int(os.getenv('AI_ENGINE_PDF_PARALLEL_MIN_PAGES', 8))
+
+# Smallest page range handed to one worker task
+MIN_RANGE_PAGES = 2
+
+_page_pool = None
+
+
+def _pdf_module():
+    import PyPDF2
+    return PyPDF2
+
+
+def iter_pdf_pages(pdf_reader, max_pages=None):
+    """Yield the text of each page of a PdfReader, up to max_pages"""
+    for page_number, page in enumerate(pdf_reader.pages):
+        if max_pages is not None and page_number >= max_pages:
+            break
+        yield page.extract_text() or ""
+
+
+def _extract_page_range(file_path, start, stop):
+    """Text of pages [start, stop) of a PDF; runs in a page pool worker"""
+    with open(file_path, 'rb') as file:
+        pdf_reader = _pdf_module().PdfReader(file)
+        return [pdf_reader.pages[index].extract_text() or "" for index in range(start, stop)]
+
+
+def _get_page_pool(workers):
+    """Process pool for page extraction, created once per process"""
+    global _page_pool
+    key = (os.getpid(), workers)
+    if _page_pool is None or _page_pool[0] != key:
+        # Spawned workers only import this module, not the engine or spaCy
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        _page_pool = (key, executor)
+    return _page_pool[1]
+
+
+def iter_pdf_pages_parallel(file_path, page_count, workers):
+    """Yield page texts in order while page ranges are extracted across a process pool
+
+    Each worker opens the file itself. Closing the generator early cancels
+    the ranges that have not started yet.
+    """
+    range_size = max(MIN_RANGE_PAGES, math.ceil(page_count / (workers * 4)))
+    executor = _get_page_pool(workers)
+    futures = [executor.submit(_extract_page_range, file_path, start, min(start + range_size, page_count))
+               for start in range(0, page_count, range_size)]
+    try:
+        for future in futures:
+            for page_text in future.result():
+                yield page_text
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _use_parallel(page_count, workers):
+    """Whether a document is large enough, and this process able, to use the page pool"""
+    if workers <= 1 or page_count < PARALLEL_MIN_PAGES:
+        return False
+    # Pool workers of parse-batch are daemonic and cannot start processes
+    return not multiprocessing.current_process().daemon
+
+
+def set_cpu_share(processes):
+    """Shrink the page pool for one of `processes` engine processes sharing the CPUs"""
+    global WORKERS
+    WORKERS = min(WORKERS, max(1, (os.cpu_count() or 1) // processes))
+
+
+def extract_pdf_text(file_path, max_pages=None, max_chars=MAX_CHARS, stop_when=None, pdf_module=None,
+                     workers=None):
+    """Extract the text of a PDF within page and character budgets
+
+    `stop_when(page_text)` is called after each page and ends extraction
+    early when it returns True. Documents of PARALLEL_MIN_PAGES pages or
+    more are split into page ranges across `workers` processes; text is
+    still assembled in page order. Without max_pages, the page budget is
+    POOL_MAX_PAGES on the pool and MAX_PAGES otherwise.
+    """
+    if workers is None:
+        workers = WORKERS
+    parts = []
+    total_chars = 0
+    with open(file_path, 'rb') as file:
+        pdf_reader = (pdf_module or _pdf_module()).PdfReader(file)
+        page_count = len(pdf_reader.pages)
+        if max_pages is None:
+            parallel = _use_parallel(min(page_count, POOL_MAX_PAGES), workers)
+            page_count = min(page_count, POOL_MAX_PAGES if parallel else MAX_PAGES)
+        else:
+            page_count = min(page_count, max_pages)
+            parallel = _use_parallel(page_count, workers)
+        
+        if parallel:
+            pages = iter_pdf_pages_parallel(file_path, page_count, workers)
+        else:
+            pages = iter_pdf_pages(pdf_reader, page_count)
+        
+        try:
+            for page_text in pages:
+                if max_chars is not None and total_chars + len(page_text) > max_chars:
+                    parts.append(page_text[:max_chars - total_chars])
+                    break
+                parts.append(page_text)
+                total_chars += len(page_text) + 1
+                if stop_when is not None and stop_when(page_text):
+                    break
+        finally:
+            pages.close()
+    return "\n".join(parts)
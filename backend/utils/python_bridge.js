@@ -1,270 +1,173 @@
 const { spawn } = require('child_process');
 const path = require('path');
 
-// Function to call Python script for resume parsing
-const parseResume = (filePath, fileType) => {
-  return new Promise((resolve, reject) => {
-    // Path to Python executable in virtual environment
-    const pythonPath = path.join(__dirname, '..', 'ai_career_env', 'Scripts', 'python.exe');
-    
-    // Path to Python script
-    const scriptPath = path.join(__dirname, 'ai_career_engine.py');
-    
-    // Spawn Python process
-    const pythonProcess = spawn(pythonPath, [scriptPath, 'parse', filePath, fileType]);
-    
-    let stdoutData = '';
-    let stderrData = '';
-    
+// Path to Python executable in virtual environment
+const pythonPath = path.join(__dirname, '..', 'ai_career_env', 'Scripts', 'python.exe');
+
+// Path to Python script
+const scriptPath = path.join(__dirname, 'ai_career_engine.py');
+
+// Optional pre-fork pool: AI_ENGINE_WORKERS=N forks N workers sharing one loaded engine,
+// AI_ENGINE_MAX_RSS_MB recycles a worker once it grows past that size
+const engineArgs = [scriptPath, 'serve'];
+if (parseInt(process.env.AI_ENGINE_WORKERS, 10) > 1) {
+  if (process.platform === 'win32') {
+    // The pool forks its workers, which Windows cannot do
+    console.warn(`AI_ENGINE_WORKERS=${process.env.AI_ENGINE_WORKERS} ignored on Windows; using a single engine worker`);
+  } else {
+    engineArgs.push('--workers', process.env.AI_ENGINE_WORKERS);
+  }
+}
+if (process.env.AI_ENGINE_MAX_RSS_MB) {
+  engineArgs.push('--max-rss-mb', process.env.AI_ENGINE_MAX_RSS_MB);
+}
+
+// Long-lived Python worker that keeps the AI engine loaded between calls.
+// Requests and responses are newline-delimited JSON frames tagged with an id,
+// so any number of calls can be in flight at once.
+class EngineWorker {
+  constructor() {
+    this.process = null;
+    this.nextId = 1;
+    this.pending = new Map();
+    this.stdoutBuffer = '';
+    this.stderrTail = '';
+  }
+
+  start() {
+    const pythonProcess = spawn(pythonPath, engineArgs);
+    this.process = pythonProcess;
+    this.stdoutBuffer = '';
+    this.stderrTail = '';
+
     pythonProcess.stdout.on('data', (data) => {
-      stdoutData += data.toString();
+      this.stdoutBuffer += data.toString();
+      let newlineIndex;
+      while ((newlineIndex = this.stdoutBuffer.indexOf('\n')) !== -1) {
+        const line = this.stdoutBuffer.slice(0, newlineIndex);
+        this.stdoutBuffer = this.stdoutBuffer.slice(newlineIndex + 1);
+        if (line.trim()) {
+          this.handleResponse(line);
+        }
+      }
     });
-    
+
     pythonProcess.stderr.on('data', (data) => {
-      stderrData += data.toString();
+      // Keep only the end of stderr for error reports
+      this.stderrTail = (this.stderrTail + data.toString()).slice(-4000);
     });
-    
+
+    pythonProcess.stdin.on('error', (error) => {
+      // A write after the engine died (EPIPE); restart it on the next call
+      this.failPending(pythonProcess, new Error(`Lost connection to Python engine: ${error.message}`));
+      pythonProcess.kill();
+    });
+
+    pythonProcess.on('error', (error) => {
+      this.failPending(pythonProcess, new Error(`Failed to start Python engine: ${error.message}`));
+    });
+
     pythonProcess.on('close', (code) => {
-      if (code !== 0) {
-        reject(new Error(`Python script exited with code ${code}: ${stderrData}`));
-      } else {
-        try {
-          const result = JSON.parse(stdoutData);
-          resolve(result);
-        } catch (parseError) {
-          reject(new Error(`Failed to parse Python output: ${parseError.message}`));
-        }
+      this.failPending(pythonProcess, new Error(`Python engine exited with code ${code}: ${this.stderrTail}`));
+    });
+  }
+
+  handleResponse(line) {
+    let response;
+    try {
+      response = JSON.parse(line);
+    } catch (parseError) {
+      console.error(`Failed to parse Python output: ${parseError.message}`);
+      return;
+    }
+
+    const request = this.pending.get(response.id);
+    if (!request) {
+      if (response.error) {
+        console.error(`Python engine error: ${response.error}`);
       }
+      return;
+    }
+    this.pending.delete(response.id);
+
+    if (response.error) {
+      // Operation errors are reported the same way the one-shot CLI reported them
+      request.resolve({ error: response.error });
+    } else {
+      request.resolve(response.result);
+    }
+  }
+
+  failPending(pythonProcess, error) {
+    if (this.process !== pythonProcess) {
+      return;
+    }
+    this.process = null;
+    for (const request of this.pending.values()) {
+      request.reject(error);
+    }
+    this.pending.clear();
+  }
+
+  call(operation, args) {
+    if (!this.process) {
+      this.start();
+    }
+
+    return new Promise((resolve, reject) => {
+      const id = this.nextId++;
+      this.pending.set(id, { resolve, reject });
+      const frame = JSON.stringify({ id, op: operation, args }) + '\n';
+      this.process.stdin.write(frame, (error) => {
+        if (error && this.pending.has(id)) {
+          this.pending.delete(id);
+          reject(new Error(`Failed to send request to Python engine: ${error.message}`));
+        }
+      });
     });
-  });
+  }
+}
+
+const engineWorker = new EngineWorker();
+
+// Function to call Python script for resume parsing
+const parseResume = (filePath, fileType) => {
+  return engineWorker.call('parse', [filePath, fileType]);
 };
 
 // Function to call Python script for job matching
 const matchJob = (resumeSkills, jobTitle) => {
-  return new Promise((resolve, reject) => {
-    // Path to Python executable in virtual environment
-    const pythonPath = path.join(__dirname, '..', 'ai_career_env', 'Scripts', 'python.exe');
-    
-    // Path to Python script
-    const scriptPath = path.join(__dirname, 'ai_career_engine.py');
-    
-    // Spawn Python process
-    const pythonProcess = spawn(pythonPath, [scriptPath, 'match', JSON.stringify(resumeSkills), jobTitle]);
-    
-    let stdoutData = '';
-    let stderrData = '';
-    
-    pythonProcess.stdout.on('data', (data) => {
-      stdoutData += data.toString();
-    });
-    
-    pythonProcess.stderr.on('data', (data) => {
-      stderrData += data.toString();
-    });
-    
-    pythonProcess.on('close', (code) => {
-      if (code !== 0) {
-        reject(new Error(`Python script exited with code ${code}: ${stderrData}`));
-      } else {
-        try {
-          const result = JSON.parse(stdoutData);
-          resolve(result);
-        } catch (parseError) {
-          reject(new Error(`Failed to parse Python output: ${parseError.message}`));
-        }
-      }
-    });
-  });
+  return engineWorker.call('match', [resumeSkills, jobTitle]);
 };
 
 // Function to call Python script for job recommendations
 const getJobRecommendations = (resumeSkills) => {
-  return new Promise((resolve, reject) => {
-    // Path to Python executable in virtual environment
-    const pythonPath = path.join(__dirname, '..', 'ai_career_env', 'Scripts', 'python.exe');
-    
-    // Path to Python script
-    const scriptPath = path.join(__dirname, 'ai_career_engine.py');
-    
-    // Spawn Python process
-    const pythonProcess = spawn(pythonPath, [scriptPath, 'recommend', JSON.stringify(resumeSkills)]);
-    
-    let stdoutData = '';
-    let stderrData = '';
-    
-    pythonProcess.stdout.on('data', (data) => {
-      stdoutData += data.toString();
-    });
-    
-    pythonProcess.stderr.on('data', (data) => {
-      stderrData += data.toString();
-    });
-    
-    pythonProcess.on('close', (code) => {
-      if (code !== 0) {
-        reject(new Error(`Python script exited with code ${code}: ${stderrData}`));
-      } else {
-        try {
-          const result = JSON.parse(stdoutData);
-          resolve(result);
-        } catch (parseError) {
-          reject(new Error(`Failed to parse Python output: ${parseError.message}`));
-        }
-      }
-    });
-  });
+  return engineWorker.call('recommend', [resumeSkills]);
 };
 
 // Function to call Python script for trending skills
 const getTrendingSkills = () => {
-  return new Promise((resolve, reject) => {
-    // Path to Python executable in virtual environment
-    const pythonPath = path.join(__dirname, '..', 'ai_career_env', 'Scripts', 'python.exe');
-    
-    // Path to Python script
-    const scriptPath = path.join(__dirname, 'ai_career_engine.py');
-    
-    // Spawn Python process
-    const pythonProcess = spawn(pythonPath, [scriptPath, 'trending']);
-    
-    let stdoutData = '';
-    let stderrData = '';
-    
-    pythonProcess.stdout.on('data', (data) => {
-      stdoutData += data.toString();
-    });
-    
-    pythonProcess.stderr.on('data', (data) => {
-      stderrData += data.toString();
-    });
-    
-    pythonProcess.on('close', (code) => {
-      if (code !== 0) {
-        reject(new Error(`Python script exited with code ${code}: ${stderrData}`));
-      } else {
-        try {
-          const result = JSON.parse(stdoutData);
-          resolve(result);
-        } catch (parseError) {
-          reject(new Error(`Failed to parse Python output: ${parseError.message}`));
-        }
-      }
-    });
-  });
+  return engineWorker.call('trending', []);
 };
 
 // Function to call Python script for ML-based future skills prediction
 const predictFutureSkillsML = (skillsArray) => {
-  return new Promise((resolve, reject) => {
-    // Path to Python executable in virtual environment
-    const pythonPath = path.join(__dirname, '..', 'ai_career_env', 'Scripts', 'python.exe');
-    
-    // Path to Python script
-    const scriptPath = path.join(__dirname, 'ai_career_engine.py');
-    
-    // Spawn Python process
-    const pythonProcess = spawn(pythonPath, [scriptPath, 'predict_future', JSON.stringify(skillsArray)]);
-    
-    let stdoutData = '';
-    let stderrData = '';
-    
-    pythonProcess.stdout.on('data', (data) => {
-      stdoutData += data.toString();
-    });
-    
-    pythonProcess.stderr.on('data', (data) => {
-      stderrData += data.toString();
-    });
-    
-    pythonProcess.on('close', (code) => {
-      if (code !== 0) {
-        reject(new Error(`Python script exited with code ${code}: ${stderrData}`));
-      } else {
-        try {
-          const result = JSON.parse(stdoutData);
-          resolve(result);
-        } catch (parseError) {
-          reject(new Error(`Failed to parse Python output: ${parseError.message}`));
-        }
-      }
-    });
-  });
+  return engineWorker.call('predict_future', [skillsArray]);
 };
 
 // Function to call Python script for interview question prediction
 const predictInterviewQuestions = (resumeData) => {
-  return new Promise((resolve, reject) => {
-    // Path to Python executable in virtual environment
-    const pythonPath = path.join(__dirname, '..', 'ai_career_env', 'Scripts', 'python.exe');
-    
-    // Path to Python script
-    const scriptPath = path.join(__dirname, 'ai_career_engine.py');
-    
-    // Spawn Python process
-    const pythonProcess = spawn(pythonPath, [scriptPath, 'predict_questions', JSON.stringify(resumeData)]);
-    
-    let stdoutData = '';
-    let stderrData = '';
-    
-    pythonProcess.stdout.on('data', (data) => {
-      stdoutData += data.toString();
-    });
-    
-    pythonProcess.stderr.on('data', (data) => {
-      stderrData += data.toString();
-    });
-    
-    pythonProcess.on('close', (code) => {
-      if (code !== 0) {
-        reject(new Error(`Python script exited with code ${code}: ${stderrData}`));
-      } else {
-        try {
-          const result = JSON.parse(stdoutData);
-          resolve(result);
-        } catch (parseError) {
-          reject(new Error(`Failed to parse Python output: ${parseError.message}`));
-        }
-      }
-    });
-  });
+  return engineWorker.call('predict_questions', [resumeData]);
 };
 
 // Function to call Python script for AI mentor responses
 const getAIMentorResponse = (userQuery, resumeData) => {
-  return new Promise((resolve, reject) => {
-    // Path to Python executable in virtual environment
-    const pythonPath = path.join(__dirname, '..', 'ai_career_env', 'Scripts', 'python.exe');
-    
-    // Path to Python script
-    const scriptPath = path.join(__dirname, 'ai_career_engine.py');
-    
-    // Spawn Python process
-    const pythonProcess = spawn(pythonPath, [scriptPath, 'ai_mentor', userQuery, JSON.stringify(resumeData)]);
-    
-    let stdoutData = '';
-    let stderrData = '';
-    
-    pythonProcess.stdout.on('data', (data) => {
-      stdoutData += data.toString();
-    });
-    
-    pythonProcess.stderr.on('data', (data) => {
-      stderrData += data.toString();
-    });
-    
-    pythonProcess.on('close', (code) => {
-      if (code !== 0) {
-        reject(new Error(`Python script exited with code ${code}: ${stderrData}`));
-      } else {
-        try {
-          const result = JSON.parse(stdoutData);
-          resolve(result);
-        } catch (parseError) {
-          reject(new Error(`Failed to parse Python output: ${parseError.message}`));
-        }
-      }
-    });
-  });
+  return engineWorker.call('ai_mentor', [userQuery, resumeData]);
+};
+
+// Function to call Python script for batch scoring of many resumes against all jobs
+const scoreMatrix = (resumeSkillLists, options = {}) => {
+  return engineWorker.call('score_matrix', [resumeSkillLists, options]);
 };
 
 module.exports = {
@@ -274,5 +177,6 @@ module.exports = {
   getTrendingSkills,
   predictFutureSkillsML,
   predictInterviewQuestions,
-  getAIMentorResponse
-};
\ No newline at end of file
+  getAIMentorResponse,
+  scoreMatrix
+};
@@ -1,5 +1,4 @@
 import PyPDF2
-import docx
 import re
 import nltk
 from nltk.tokenize import word_tokenize
@@ -8,6 +7,13 @@ from nltk.stem import WordNetLemmatizer
 import spacy
 import json
 import sys
+import os
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pdf_text import extract_pdf_text
+from utils.docx_text import extract_docx_text
+from utils.resume_sections import SectionTracker
 
 # Load spaCy model
 nlp = spacy.load("en_core_web_sm")
@@ -15,12 +21,8 @@ nlp = spacy.load("en_core_web_sm")
 def extract_text_from_pdf(file_path):
     """Extract text from PDF file"""
     try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text
+        return extract_pdf_text(file_path, stop_when=SectionTracker(('experience', 'education', 'skills')).feed,
+                                pdf_module=PyPDF2)
     except Exception as e:
         print(f"Error extracting text from PDF: {e}")
         return ""
@@ -28,11 +30,7 @@ def extract_text_from_pdf(file_path):
 def extract_text_from_docx(file_path):
     """Extract text from DOCX file"""
     try:
-        doc = docx.Document(file_path)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+        return extract_docx_text(file_path)
     except Exception as e:
         print(f"Error extracting text from DOCX: {e}")
         return ""
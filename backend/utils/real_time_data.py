@@ -1,8 +1,129 @@
+import argparse
 import json
-import requests
 import os
-from datetime import datetime, timedelta
-import pickle
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from datetime import timedelta
+
+# Allow running this file directly
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.engine_cache import cache_root
+from utils.file_lock import FileLock
+from utils.http_pool import shared_pool
+from utils.job_ingest import ChangeLog, FeedDelta, load_cursors, merge_deltas, save_cursors
+
+# Seconds a job source may take before the refresh goes on without it (AI_ENGINE_SOURCE_TIMEOUT)
+SOURCE_TIMEOUT = float(os.getenv('AI_ENGINE_SOURCE_TIMEOUT', 10))
+
+# Age in seconds after which the cached feed is refreshed in the background (AI_ENGINE_JOB_CACHE_SOFT_TTL)
+# and after which it is no longer served at all (AI_ENGINE_JOB_CACHE_HARD_TTL)
+CACHE_SOFT_TTL = float(os.getenv('AI_ENGINE_JOB_CACHE_SOFT_TTL', 60 * 60))
+CACHE_HARD_TTL = float(os.getenv('AI_ENGINE_JOB_CACHE_HARD_TTL', 24 * 60 * 60))
+
+# Seconds between background refresh attempts, so a failing source is not hammered
+REFRESH_RETRY_SECONDS = 60
+
+# How background refreshes run: 'process' starts a detached refresher that
+# outlives one-shot CLI runs, 'thread' refreshes in-process for long-lived
+# workers (AI_ENGINE_REFRESH_MODE)
+REFRESH_MODE = os.getenv('AI_ENGINE_REFRESH_MODE', 'process')
+
+# Job sources by name, in merge order; see register_source
+JOB_SOURCES = {}
+
+
+class JobSource:
+    """A named job feed: fetch(fetcher) returns a list of raw job dicts or a FeedDelta
+    
+    Incremental sources are called as fetch(fetcher, cursor) with the
+    cursor of their last FeedDelta, or None for a full fetch.
+    """
+
+    def __init__(self, name, fetch, timeout=None, incremental=False):
+        self.name = name
+        self.fetch = fetch
+        self.timeout = timeout
+        self.incremental = incremental
+
+    def __repr__(self):
+        return f"JobSource({self.name!r})"
+
+
+def register_source(name, fetch, timeout=None, incremental=False):
+    """Add or replace a job source; fetch_all_jobs queries every registered source"""
+    JOB_SOURCES[name] = JobSource(name, fetch, timeout, incremental)
+    return JOB_SOURCES[name]
+
+
+def unregister_source(name):
+    JOB_SOURCES.pop(name, None)
+
+
+def http_json_source(url, timeout=None, max_pages=1000, since_param=None):
+    """Incremental fetch function for a feed serving a JSON list of jobs (or {"jobs": [...]}) at url
+    
+    Paginated feeds answer {"jobs": [...], "next": url}; pages are followed
+    until there is no "next", over the shared keep-alive connection pool.
+    With a cursor the first page is requested with the ETag it returned
+    last time, and a 304 means nothing changed. Feeds that take a since_param
+    query parameter are sent the last cursor (the feed's own "cursor" field,
+    or the newest updated_at/created_at seen) and answer with only new and
+    updated postings, listing withdrawn IDs under "removed".
+    """
+    def fetch(fetcher, cursor=None):
+        cursor = cursor or {}
+        headers = {'If-None-Match': cursor['etag']} if cursor.get('etag') else None
+        params = {since_param: cursor['since']} if since_param and cursor.get('since') else None
+        response = shared_pool().request('GET', url, params=params, headers=headers,
+                                         timeout=timeout or SOURCE_TIMEOUT)
+        if response.status == 304:
+            return FeedDelta(cursor=cursor)
+        etag = next((value for name, value in response.headers.items() if name.lower() == 'etag'), None)
+        
+        jobs, removed = [], []
+        data = response.json()
+        page_url = url
+        for _ in range(max_pages):
+            if not isinstance(data, dict):
+                jobs.extend(data)
+                break
+            jobs.extend(data.get('jobs', []))
+            removed.extend(data.get('removed', []))
+            if not data.get('next'):
+                break
+            page_url = urllib.parse.urljoin(page_url, data['next'])
+            data = shared_pool().get_json(page_url, timeout=timeout or SOURCE_TIMEOUT)
+        
+        since = data.get('cursor') if isinstance(data, dict) else None
+        if since is None:
+            stamps = [job.get('updated_at') or job.get('created_at') for job in jobs]
+            since = max([stamp for stamp in stamps if stamp] + ([cursor['since']] if cursor.get('since') else []),
+                        default=None)
+        return FeedDelta(jobs, removed, cursor={'etag': etag, 'since': since}, complete=params is None)
+    return fetch
+
+
+def set_refresh_mode(mode, force=False):
+    """Choose how background refreshes run, unless AI_ENGINE_REFRESH_MODE pins it (or force is set)"""
+    global REFRESH_MODE
+    if mode not in ('process', 'thread'):
+        raise ValueError(f"Unknown refresh mode: {mode}")
+    if force or 'AI_ENGINE_REFRESH_MODE' not in os.environ:
+        REFRESH_MODE = mode
+
+
+def _register_feed_urls():
+    """Register JSON feeds listed in AI_ENGINE_JOB_FEED_URLS as name=url pairs, comma-separated"""
+    for entry in os.getenv('AI_ENGINE_JOB_FEED_URLS', '').split(','):
+        name, _, url = entry.strip().partition('=')
+        if name and url:
+            register_source(name, http_json_source(url), incremental=True)
+
 
 class RealTimeDataFetcher:
     def __init__(self):
@@ -11,16 +132,23 @@ class RealTimeDataFetcher:
         self.github_jobs_url = "https://jobs.github.com/positions.json"
         self.adzuna_app_id = os.getenv('ADZUNA_APP_ID', 'demo')
         self.adzuna_app_key = os.getenv('ADZUNA_APP_KEY', 'demo')
-        self.cache_file = 'job_data_cache.pkl'
-        self.cache_duration = timedelta(hours=1)  # Cache for 1 hour
+        # Fetched feeds are kept as memory-mapped job stores under the engine cache root
+        self.cache_path = os.path.join(cache_root(), 'job_feed')
+        self.cache_duration = timedelta(seconds=CACHE_SOFT_TTL)  # Served as is
+        self.cache_max_stale = timedelta(seconds=CACHE_HARD_TTL)  # Served while a refresh runs
+        # Per-source outcome of the last fetch: jobs, seconds and any error
+        self.last_fetch = {}
+        # Bumped each time a background refresh in this process saves new data
+        self.generation = 0
+        # Added, changed and removed job IDs of the last ingest
+        self.last_changes = None
         
     def fetch_github_jobs(self, description="", location=""):
         """
         Fetch jobs from GitHub Jobs API (simulated)
-        In a real implementation, you would use:
+        In a real implementation, you would use the shared connection pool:
         params = {'description': description, 'location': location}
-        response = requests.get(self.github_jobs_url, params=params)
-        return response.json()
+        return shared_pool().get_json(self.github_jobs_url, params=params)
         """
         # Simulated data for demonstration
         simulated_jobs = [
@@ -80,7 +208,7 @@ class RealTimeDataFetcher:
     def fetch_adzuna_jobs(self, what="", where=""):
         """
         Fetch jobs from Adzuna API (simulated)
-        In a real implementation, you would use:
+        In a real implementation, you would use the shared connection pool:
         url = f"https://api.adzuna.com/v1/api/jobs/us/search/1"
         params = {
             'app_id': self.adzuna_app_id,
@@ -88,8 +216,7 @@ class RealTimeDataFetcher:
             'what': what,
             'where': where
         }
-        response = requests.get(url, params=params)
-        return response.json()
+        return shared_pool().get_json(url, params=params)
         """
         # Simulated data for demonstration
         simulated_jobs = [
@@ -136,59 +263,222 @@ class RealTimeDataFetcher:
         return simulated_jobs
     
     def get_cached_data(self):
-        """Load cached job data if available and not expired"""
-        try:
-            if os.path.exists(self.cache_file):
-                cache_time = os.path.getmtime(self.cache_file)
-                cache_datetime = datetime.fromtimestamp(cache_time)
-                
-                if datetime.now() - cache_datetime < self.cache_duration:
-                    with open(self.cache_file, 'rb') as f:
-                        return pickle.load(f)
-        except Exception as e:
-            print(f"Error loading cache: {e}")
-        return None
+        """Load cached job data if available and not expired
+        
+        The cache is a JobStore: opening it memory-maps the columns instead
+        of deserializing the whole feed, and rows decode on access.
+        """
+        from utils.job_store import open_latest_store
+        return open_latest_store(self.cache_duration.total_seconds(), self.cache_path)
     
     def cache_data(self, data):
-        """Cache job data to file"""
+        """Cache job data as a versioned job store, written atomically"""
+        from utils.job_store import FEED_SCHEMA, JobStore
         try:
-            with open(self.cache_file, 'wb') as f:
-                pickle.dump(data, f)
-        except Exception as e:
-            print(f"Error saving cache: {e}")
+            JobStore.from_jobs(data, FEED_SCHEMA).save(self.cache_path)
+        except (TypeError, ValueError) as e:
+            # Fields that cannot be stored as JSON
+            print(f"Error saving cache: {e}", file=sys.stderr)
+    
+    def fetch_sources(self, sources=None):
+        """Query job sources concurrently and merge the jobs that arrive in time"""
+        return [job for delta in self.fetch_deltas(sources).values() for job in delta.jobs]
+    
+    def fetch_deltas(self, sources=None, cursors=None):
+        """Query job sources concurrently; returns {source name: FeedDelta} in source order
+        
+        Each source runs on its own daemon thread and gets its own timeout,
+        so a refresh takes as long as the slowest source rather than the sum,
+        and a source that hangs is abandoned without holding up the process.
+        Incremental sources are handed their cursor from cursors. Failed or
+        late sources are left out and recorded in self.last_fetch.
+        """
+        sources = list(JOB_SOURCES.values()) if sources is None else sources
+        cursors = cursors or {}
+        results = {}
+        
+        def run(source):
+            start = time.perf_counter()
+            try:
+                if source.incremental:
+                    result = source.fetch(self, cursors.get(source.name))
+                else:
+                    result = source.fetch(self)
+                delta = result if isinstance(result, FeedDelta) else FeedDelta.snapshot(result)
+                results[source.name] = {"delta": delta, "seconds": time.perf_counter() - start}
+            except Exception as e:
+                results[source.name] = {"error": str(e), "seconds": time.perf_counter() - start}
+        
+        start = time.monotonic()
+        threads = []
+        for source in sources:
+            thread = threading.Thread(target=run, args=(source,), name=f"job-source-{source.name}", daemon=True)
+            thread.start()
+            threads.append((source, thread))
+        
+        deltas = {}
+        self.last_fetch = {}
+        for source, thread in threads:
+            deadline = start + (source.timeout or SOURCE_TIMEOUT)
+            thread.join(max(0.0, deadline - time.monotonic()))
+            outcome = results.get(source.name) if not thread.is_alive() else None
+            if outcome is None:
+                outcome = {"error": "timed out", "seconds": time.monotonic() - start}
+            if "error" in outcome:
+                print(f"Error fetching jobs from {source.name}: {outcome['error']}", file=sys.stderr)
+            else:
+                deltas[source.name] = outcome["delta"]
+            self.last_fetch[source.name] = {
+                "jobs": len(outcome["delta"].jobs) if "delta" in outcome else 0,
+                "seconds": round(outcome["seconds"], 3),
+                "error": outcome.get("error")
+            }
+        return deltas
     
     def fetch_all_jobs(self, skills=None):
-        """Fetch jobs from all sources and combine them"""
-        # Check cache first
-        cached_data = self.get_cached_data()
+        """Fetch jobs from all sources and combine them
+        
+        Stale-while-revalidate: a cached feed younger than the soft TTL is
+        returned as is; one between the soft and hard TTLs is returned at
+        once while a single background refresh replaces it. Only with no
+        cache, or one past the hard TTL, does the caller wait for the sources.
+        """
+        from utils.job_store import open_latest_store
+        cached_data = open_latest_store(self.cache_max_stale.total_seconds(), self.cache_path)
         if cached_data:
+            if time.time() - cached_data.created_at >= self.cache_duration.total_seconds():
+                self.refresh_in_background()
             return cached_data
+        return self.refresh()
+    
+    def _refresh_lock(self):
+        # One refresh at a time across every process sharing the cache
+        return FileLock(os.path.join(self.cache_path, 'refresh.lock'))
+    
+    def _refresh_marker(self):
+        return os.path.join(self.cache_path, 'refresh.attempt')
+    
+    def refresh(self, force=False):
+        """Fetch every source and cache the result, waiting for a refresh already under way
         
-        # If no cache or expired, fetch fresh data
-        all_jobs = []
-        
-        try:
-            # Fetch from different sources
-            github_jobs = self.fetch_github_jobs()
-            adzuna_jobs = self.fetch_adzuna_jobs()
-            stackoverflow_jobs = self.fetch_stackoverflow_jobs()
-            
-            # Combine all jobs
-            all_jobs.extend(github_jobs)
-            all_jobs.extend(adzuna_jobs)
-            all_jobs.extend(stackoverflow_jobs)
-            
-            # Cache the data
-            self.cache_data(all_jobs)
-            
-            return all_jobs
-        except Exception as e:
-            print(f"Error fetching jobs: {e}")
-            # Return cached data if available, even if expired
+        Callers that queued behind another refresh get its result rather
+        than fetching again, unless force is set.
+        """
+        with self._refresh_lock():
+            cached_data = None if force else self.get_cached_data()
             if cached_data:
                 return cached_data
-            # Return empty list if no data available
-            return []
+            return self._refresh_locked()
+    
+    def _refresh_locked(self):
+        """Fetch what changed since each source's cursor and merge it into the cached corpus"""
+        from utils.job_store import FEED_SCHEMA, JobStore, open_latest_store
+        previous = open_latest_store(None, self.cache_path)
+        cursors = load_cursors(self.cache_path, previous.fingerprint if previous is not None else None)
+        if cursors is None:
+            # Cursors only describe the corpus they were saved with; start over with full fetches
+            previous, cursors = None, {}
+        deltas = self.fetch_deltas(cursors=cursors)
+        failed = [name for name, outcome in self.last_fetch.items() if outcome["error"]]
+        
+        records, changes = merge_deltas([dict(job) for job in previous] if previous is not None else [], deltas)
+        self.last_changes = changes
+        if previous is None and failed:
+            # A first fetch is only cached once every source has answered
+            return records
+        try:
+            store = JobStore.from_jobs(records, FEED_SCHEMA)
+        except (TypeError, ValueError) as e:
+            # Fields that cannot be stored as JSON
+            print(f"Error saving cache: {e}", file=sys.stderr)
+            return records
+        path = store.save(self.cache_path)
+        saved = JobStore.open(path) if path else None
+        if saved is None or saved.fingerprint != store.fingerprint:
+            # Cursors must not move past deltas that never reached disk
+            print("Error saving cache: merged job feed was not written; cursors kept", file=sys.stderr)
+            return records
+        
+        # Failed sources keep their postings and cursors until their next fetch
+        for name, delta in deltas.items():
+            if delta.cursor is not None:
+                cursors[name] = delta.cursor
+            else:
+                cursors.pop(name, None)
+        if previous is None or store.fingerprint != previous.fingerprint:
+            self.change_log().append(previous.fingerprint if previous is not None else None,
+                                     store.fingerprint, changes)
+        save_cursors(self.cache_path, store.fingerprint, cursors)
+        if not failed:
+            # Retries are only held back after a failed refresh
+            try:
+                os.remove(self._refresh_marker())
+            except OSError:
+                pass
+        return store
+    
+    def change_log(self):
+        """Log of corpus changes, for indexes that apply them incrementally"""
+        return ChangeLog(os.path.join(self.cache_path, 'changes.jsonl'))
+    
+    def changes_since(self, previous, fingerprint):
+        """Net added, changed and removed job IDs between two cached feeds, or None if unknown"""
+        return self.change_log().since(previous, fingerprint)
+    
+    def refresh_in_background(self):
+        """Start a refresh unless one is running or one was tried recently; True if started"""
+        marker = self._refresh_marker()
+        try:
+            if time.time() - os.path.getmtime(marker) < REFRESH_RETRY_SECONDS:
+                return False
+        except OSError:
+            pass
+        lock = self._refresh_lock()
+        if not lock.acquire(blocking=False):
+            return False
+        try:
+            with open(marker, 'w'):
+                pass
+        except OSError as e:
+            print(f"Error marking job refresh: {e}", file=sys.stderr)
+        
+        if REFRESH_MODE == 'thread':
+            def run():
+                try:
+                    if self._revalidate():
+                        self.generation += 1
+                except Exception as e:
+                    print(f"Error refreshing jobs: {e}", file=sys.stderr)
+                finally:
+                    lock.release()
+            threading.Thread(target=run, name="job-feed-refresh", daemon=True).start()
+            return True
+        
+        # The refresher takes the lock itself; a second one started in the gap finds the cache fresh
+        lock.release()
+        return self._spawn_refresher()
+    
+    def _revalidate(self):
+        """Refresh under a lock already held, unless another process got there first; True if saved"""
+        if self.get_cached_data():
+            return False
+        return hasattr(self._refresh_locked(), 'fingerprint')
+    
+    def _spawn_refresher(self):
+        """Run a refresh in a detached process that outlives this one"""
+        command = [sys.executable, os.path.abspath(__file__), '--refresh', '--cache-path', self.cache_path]
+        options = {}
+        if os.name == 'nt':
+            options['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            options['start_new_session'] = True
+        try:
+            subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL, close_fds=True, **options)
+        except OSError as e:
+            print(f"Error starting job refresh: {e}", file=sys.stderr)
+            return False
+        return True
     
     def get_trending_skills(self):
         """Get trending skills based on job market demand"""
@@ -264,13 +554,39 @@ class RealTimeDataFetcher:
             # Default salary range
             return {"min": 60000, "max": 120000, "avg": 90000}
 
+register_source("github", RealTimeDataFetcher.fetch_github_jobs)
+register_source("adzuna", RealTimeDataFetcher.fetch_adzuna_jobs)
+register_source("stackoverflow", RealTimeDataFetcher.fetch_stackoverflow_jobs)
+_register_feed_urls()
+
+def refresh_main(argv=None):
+    """Background refresher started by refresh_in_background; exits at once if another holds the lock"""
+    parser = argparse.ArgumentParser(description="Refresh the cached job feed")
+    parser.add_argument('--refresh', action='store_true')
+    parser.add_argument('--cache-path')
+    args = parser.parse_args(argv)
+    fetcher = RealTimeDataFetcher()
+    if args.cache_path:
+        fetcher.cache_path = args.cache_path
+    lock = fetcher._refresh_lock()
+    if not lock.acquire(blocking=False):
+        return 0
+    try:
+        fetcher._revalidate()
+    finally:
+        lock.release()
+    return 0
+
 # Example usage
 if __name__ == "__main__":
+    if '--refresh' in sys.argv[1:]:
+        sys.exit(refresh_main(sys.argv[1:]))
+    
     fetcher = RealTimeDataFetcher()
     
     # Fetch all jobs
     jobs = fetcher.fetch_all_jobs()
-    print("Fetched jobs:", json.dumps(jobs, indent=2))
+    print("Fetched jobs:", json.dumps([dict(job) for job in jobs], indent=2))
     
     # Get trending skills
     trending = fetcher.get_trending_skills()
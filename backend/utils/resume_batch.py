@@ -0,0 +1,151 @@
+"""
+Batch resume parsing.
+
+    python ai_career_engine.py parse-batch <dir|glob> [--workers N] [--chunk-size K] [--output FILE]
+
+Files are split into chunks and parsed across a process pool. Each worker
+holds one engine (and so one spaCy model) and runs the NLP stage of a whole
+chunk through nlp.pipe; files already in the parse cache skip extraction
+and NLP entirely. Results are written as one JSON line per document as soon
+as its chunk completes; a file that fails only produces an error line for
+itself. A throughput summary goes to stderr at the end.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+# File extensions the parser understands, mapped to parse_resume file types
+FILE_TYPES = {
+    '.pdf': 'pdf',
+    '.docx': 'docx',
+    '.txt': 'text'
+}
+
+_engine = None
+
+
+def file_type_for(path):
+    """Resume file type for a path, or None if it is not a supported file"""
+    return FILE_TYPES.get(os.path.splitext(path)[1].lower())
+
+
+def find_resume_files(target):
+    """List resume files in a directory (recursively) or matching a glob pattern"""
+    if os.path.isdir(target):
+        paths = []
+        for root, _, files in os.walk(target):
+            paths.extend(os.path.join(root, name) for name in files)
+    else:
+        paths = glob.glob(target, recursive=True)
+    return sorted(path for path in paths if os.path.isfile(path) and file_type_for(path))
+
+
+def _init_worker():
+    """Build one engine per worker process; spaCy loads on the first chunk"""
+    global _engine
+    from utils.ai_career_engine import AICareerEngine
+    # Engine diagnostics must not end up in the parent's JSON lines output
+    sys.stdout = sys.stderr
+    _engine = AICareerEngine()
+
+
+def _parse_chunk(paths):
+    """Parse a chunk of files, returning one record per file"""
+    records = {}
+    texts = {}
+    cache_keys = {}
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            # Files parsed before (by content) come straight from the parse cache
+            cache_keys[path] = _engine.parse_cache.key_for(path, file_type_for(path))
+            cached = _engine.parse_cache.get(cache_keys[path])
+            if cached is not None:
+                elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+                records[path] = {"file": path, "result": cached, "ms": elapsed_ms, "cached": True}
+                continue
+            text = _engine.extract_text(path, file_type_for(path))
+            if text:
+                texts[path] = (text, start)
+            else:
+                records[path] = {"file": path, "error": "Failed to extract text from file"}
+        except Exception as e:
+            records[path] = {"file": path, "error": str(e)}
+
+    batch_paths = list(texts)
+    try:
+        results = _engine.parse_texts([texts[path][0] for path in batch_paths])
+    except Exception:
+        # Fall back to one document at a time so a bad file only fails itself
+        results = []
+        for path in batch_paths:
+            try:
+                results.append(_engine.parse_text(texts[path][0]))
+            except Exception as e:
+                results.append({"error": str(e)})
+
+    for path, result in zip(batch_paths, results):
+        elapsed_ms = round((time.perf_counter() - texts[path][1]) * 1000, 2)
+        if "error" in result:
+            records[path] = {"file": path, "error": result["error"], "ms": elapsed_ms}
+        else:
+            _engine.parse_cache.put(cache_keys[path], result)
+            records[path] = {"file": path, "result": result, "ms": elapsed_ms}
+
+    return [records[path] for path in paths]
+
+
+def run_batch(paths, output, workers=None, chunk_size=8):
+    """Parse files across a process pool, streaming JSON lines to `output`"""
+    workers = workers or os.cpu_count() or 1
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    summary = {"files": len(paths), "parsed": 0, "failed": 0}
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes=min(workers, max(len(chunks), 1)), initializer=_init_worker) as pool:
+        for records in pool.imap_unordered(_parse_chunk, chunks):
+            for record in records:
+                output.write(json.dumps(record) + "\n")
+                if "error" in record:
+                    summary["failed"] += 1
+                else:
+                    summary["parsed"] += 1
+            output.flush()
+
+    elapsed = time.perf_counter() - start
+    summary["seconds"] = round(elapsed, 2)
+    summary["docs_per_second"] = round(len(paths) / elapsed, 2) if elapsed > 0 else 0.0
+    return summary
+
+
+def batch_main(argv):
+    """Entry point for `ai_career_engine.py parse-batch`"""
+    parser = argparse.ArgumentParser(prog="ai_career_engine.py parse-batch")
+    parser.add_argument("target", help="Directory of resumes or a glob pattern")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=8,
+                        help="Documents per worker task and nlp.pipe batch")
+    parser.add_argument("--output", help="Write JSON lines to this file instead of stdout")
+    options = parser.parse_args(argv)
+
+    paths = find_resume_files(options.target)
+    if not paths:
+        print(json.dumps({"error": f"No resume files found for '{options.target}'"}))
+        return 1
+
+    output = open(options.output, "w", encoding="utf-8") if options.output else sys.stdout
+    try:
+        summary = run_batch(paths, output, options.workers, max(options.chunk_size, 1))
+    finally:
+        if options.output:
+            output.close()
+
+    print(f"Parsed {summary['parsed']}/{summary['files']} files "
+          f"({summary['failed']} failed) in {summary['seconds']}s, "
+          f"{summary['docs_per_second']} docs/s", file=sys.stderr)
+    return 0 if summary["failed"] == 0 else 2
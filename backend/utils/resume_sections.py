@@ -0,0 +1,153 @@
+"""
+Resume section segmentation.
+
+segment_sections() walks the text once, line by line, recognises section
+headings ("Work Experience", "EDUCATION:", "Key Projects", ...) and returns
+an index of section name -> (start, end) character span of the section body.
+The experience, education and project extractors all read from that index
+instead of re-scanning the whole text with their own regexes, so parsing
+cost stays linear in the length of the resume.
+"""
+import re
+
+# Canonical section name -> heading texts that introduce it (lowercase)
+SECTION_HEADINGS = {
+    'experience': [
+        'experience', 'work experience', 'professional experience', 'employment',
+        'employment history', 'work history', 'career history', 'internships',
+        'internship experience', 'relevant experience'
+    ],
+    'education': [
+        'education', 'academic background', 'qualifications', 'degrees',
+        'academic qualifications', 'educational qualifications', 'education and training'
+    ],
+    'projects': [
+        'projects', 'project experience', 'key projects', 'personal projects',
+        'academic projects', 'selected projects'
+    ],
+    'skills': [
+        'skills', 'technical skills', 'key skills', 'core competencies', 'technologies',
+        'tools and technologies', 'skills and tools'
+    ],
+    'summary': [
+        'summary', 'professional summary', 'objective', 'career objective', 'profile',
+        'about me'
+    ],
+    'certifications': ['certifications', 'certificates', 'licenses and certifications'],
+    'achievements': ['achievements', 'awards', 'honors', 'honors and awards'],
+    'publications': ['publications'],
+    'languages': ['languages'],
+    'interests': ['interests', 'hobbies', 'hobbies and interests'],
+    'references': ['references']
+}
+
+# Keywords that mark a short, capitalised line as a heading even when it is
+# not one of the exact headings above (e.g. "Education Details")
+SECTION_KEYWORDS = [
+    ('projects', 'project'),
+    ('experience', 'experience'),
+    ('experience', 'employment'),
+    ('education', 'education'),
+    ('education', 'academic'),
+    ('skills', 'skill'),
+    ('skills', 'competenc'),
+    ('summary', 'summary'),
+    ('summary', 'objective'),
+    ('certifications', 'certif'),
+    ('achievements', 'award'),
+    ('achievements', 'achievement'),
+    ('references', 'reference')
+]
+
+_HEADING_LOOKUP = {
+    heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings
+}
+
+# Optional bullet/number, a short run of words, optional colon and inline content
+_HEADING_LINE = re.compile(
+    r'^\s*(?:[-*•#>]+\s*|\d+[.)]\s*)?(?P<title>[A-Za-z][A-Za-z &/]{0,48}?)\s*(?P<colon>:\s*(?P<rest>.*?))?\s*$'
+)
+_SPACES = re.compile(r'\s+')
+
+MAX_HEADING_WORDS = 4
+
+
+def match_heading(line):
+    """Return (section name, offset of inline content) if the line is a heading"""
+    match = _HEADING_LINE.match(line)
+    if not match:
+        return None
+    raw_title = match.group('title').strip()
+    title = _SPACES.sub(' ', raw_title.lower().replace('&', 'and'))
+    rest = match.group('rest')
+
+    name = _HEADING_LOOKUP.get(title)
+    if name is None:
+        # Loose headings must stand alone on their line and look like a title
+        if rest or len(title.split()) > MAX_HEADING_WORDS or not raw_title[0].isupper():
+            return None
+        for candidate, keyword in SECTION_KEYWORDS:
+            if keyword in title:
+                name = candidate
+                break
+        if name is None:
+            return None
+
+    body_offset = match.start('rest') if rest else len(line)
+    return name, body_offset
+
+
+def segment_sections(text):
+    """Index the sections of a resume as {name: (start, end)} body spans
+
+    Only the first occurrence of each section is indexed. A section's body
+    runs from just after its heading to the next heading (or end of text).
+    """
+    sections = {}
+    current = None
+    current_start = 0
+    offset = 0
+
+    for line in text.splitlines(keepends=True):
+        heading = match_heading(line.rstrip('\r\n'))
+        if heading:
+            if current and current not in sections:
+                sections[current] = (current_start, offset)
+            current, body_offset = heading
+            current_start = offset + body_offset
+        offset += len(line)
+
+    if current and current not in sections:
+        sections[current] = (current_start, len(text))
+    return sections
+
+
+def section_text(text, sections, name):
+    """Body text of a section, or '' if the resume has no such section"""
+    span = sections.get(name)
+    if not span:
+        return ''
+    return text[span[0]:span[1]].strip()
+
+
+class SectionTracker:
+    """Watch text arrive piece by piece and report when sections are complete
+
+    A section counts as complete once a later heading closes it, because
+    until then its body may continue on the next page.
+    """
+
+    def __init__(self, required=('experience', 'education', 'projects', 'skills')):
+        self.required = set(required)
+        self.closed = set()
+        self.current = None
+
+    def feed(self, text):
+        """Scan the next piece of text; True once every required section is complete"""
+        for line in text.splitlines():
+            heading = match_heading(line)
+            if heading:
+                if self.current:
+                    self.closed.add(self.current)
+                self.current = heading[0]
+        return self.required <= self.closed
@@ -0,0 +1,131 @@
+"""
+Batch scoring of many resumes against every indexed job.
+
+All resumes are vectorized at once against the job index vocabulary, and
+two N x M matrices are computed as sparse products over chunks of resume
+rows, so memory stays bounded by CHUNK_BYTES whatever N and M are:
+
+    similarity = resume TF-IDF rows . job TF-IDF rows   (cosine, rows are L2-normalised)
+    match      = resume skills . job skills / required skills per job (percent)
+
+The result is either the top-k jobs per resume (argpartition per chunk)
+or, with an output path, both full matrices written as float32 .npy
+files next to a JSON list of the job IDs for the columns.
+"""
+import json
+import os
+
+import numpy as np
+
+from utils.engine_cache import atomic_write
+
+# Dense working set per chunk of resume rows
+CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def _skill_matrix(id_lists, width):
+    """Binary CSR matrix with one row per sorted list of skill IDs"""
+    from scipy.sparse import csr_matrix
+
+    indptr = np.zeros(len(id_lists) + 1, dtype=np.int64)
+    np.cumsum([len(ids) for ids in id_lists], out=indptr[1:])
+    indices = np.fromiter((skill_id for ids in id_lists for skill_id in ids), dtype=np.int32, count=indptr[-1])
+    data = np.ones(len(indices), dtype=np.float32)
+    return csr_matrix((data, indices, indptr), shape=(len(id_lists), width))
+
+
+def _resume_entries(resumes):
+    """(resume id, skills) for resumes given as skill lists or {"id", "skills"} objects"""
+    entries = []
+    for position, resume in enumerate(resumes):
+        if isinstance(resume, dict):
+            entries.append((resume.get('id', position), resume.get('skills', [])))
+        else:
+            entries.append((position, resume))
+    return entries
+
+
+def _chunks(row_count, job_count):
+    """Row ranges sized so one chunk of both dense matrices fits in CHUNK_BYTES"""
+    rows = max(1, CHUNK_BYTES // max(job_count * 4 * 2, 1))
+    for start in range(0, row_count, rows):
+        yield start, min(start + rows, row_count)
+
+
+def score_matrix(job_index, skill_index, preprocess, resumes, top_k=5, output=None, rank_by='similarity'):
+    """Score resumes against every live job in the index
+
+    Returns {"results": [...top-k per resume...]} or, when `output` is a
+    path prefix, {"files": {...}, "shape": [N, M]} after writing the matrices.
+    """
+    entries = _resume_entries(resumes)
+    live_rows = np.flatnonzero(job_index.live)
+    jobs = [job_index.jobs[row] for row in live_rows.tolist()]
+
+    # Resume text vectors against the frozen job vocabulary
+    resume_vectors = job_index.vectorizer.transform(
+        [preprocess(' '.join(skills)) for _, skills in entries])
+    job_vectors_t = job_index.vectors[live_rows].T.tocsc()
+
+    # Skill overlap as a product of binary resume x skill and skill x job matrices
+    vocabulary = skill_index.vocabulary
+    resume_skills = _skill_matrix([vocabulary.encode(skills) for _, skills in entries], len(vocabulary))
+    job_rows = skill_index.rows_for(job_index.keys[live_rows])
+    job_skills_t = skill_index.skill_matrix()[job_rows].T.tocsc()
+    required = skill_index.required[job_rows].astype(np.float32)
+    # Jobs listing no skills score 0, as in calculate_match_score
+    inverse_required = np.divide(100.0, required, out=np.zeros_like(required), where=required > 0)
+
+    shape = (len(entries), len(jobs))
+    if output:
+        paths = {
+            "similarity": f"{output}-similarity.npy",
+            "match": f"{output}-match.npy",
+            "jobs": f"{output}-jobs.json"
+        }
+        matrices = {
+            name: np.lib.format.open_memmap(paths[name] + '.tmp', mode='w+', dtype=np.float32, shape=shape)
+            for name in ("similarity", "match")
+        }
+    else:
+        top_k = max(1, min(int(top_k), len(jobs)))
+        results = []
+
+    for start, stop in _chunks(len(entries), len(jobs)):
+        similarity = (resume_vectors[start:stop] @ job_vectors_t).toarray().astype(np.float32)
+        match = (resume_skills[start:stop] @ job_skills_t).toarray() * inverse_required
+
+        if output:
+            matrices["similarity"][start:stop] = similarity
+            matrices["match"][start:stop] = match
+            continue
+
+        if not jobs:
+            results.extend({"resume": entries[row][0], "jobs": []} for row in range(start, stop))
+            continue
+        ranking = similarity if rank_by == 'similarity' else match
+        candidates = np.argpartition(-ranking, top_k - 1, axis=1)[:, :top_k]
+        for offset, row_candidates in enumerate(candidates):
+            order = row_candidates[np.argsort(-ranking[offset, row_candidates], kind='stable')]
+            results.append({
+                "resume": entries[start + offset][0],
+                "jobs": [{
+                    "id": jobs[column]["id"],
+                    "title": jobs[column]["title"],
+                    "company": jobs[column].get("company", ""),
+                    "similarity_score": round(float(similarity[offset, column]) * 100, 2),
+                    "match_score": round(float(match[offset, column]), 2)
+                } for column in order]
+            })
+
+    if not output:
+        return {"results": results}
+
+    for matrix in matrices.values():
+        matrix.flush()
+    # Release the memory maps before renaming them into place
+    matrices.clear()
+    for name in ("similarity", "match"):
+        os.replace(paths[name] + '.tmp', paths[name])
+    atomic_write(paths["jobs"], lambda f: f.write(json.dumps([str(job['id']) for job in jobs]).encode('utf-8')))
+    return {"files": paths, "shape": list(shape)}
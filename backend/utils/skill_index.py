@@ -0,0 +1,167 @@
+"""
+Skill index over the job postings.
+
+Built once per job feed. Every normalized skill gets an integer ID in a
+SkillVocabulary, and each job's required skills are packed into a row of
+uint64 words with bit `id` set. Overlap between a resume and every job is
+then a vectorized AND + popcount over all jobs for each word the resume
+has bits in, instead of a Python set intersection per job. The bitsets are
+stored word-major (one contiguous array of jobs per word) so each of those
+passes is a sequential scan.
+Per-job state is kept in arrays by row (the job's position in the feed,
+the key of its ID, its skill IDs as CSR offsets, its required count) and
+jobs are read back from the feed on demand. Normalized titles map to rows
+for title lookups.
+"""
+import numpy as np
+
+from utils.job_index import RowLookup, id_key, id_keys
+
+
+def normalize(value):
+    """Lowercase and collapse whitespace, for titles and skill names"""
+    return ' '.join(str(value).lower().split())
+
+
+class SkillVocabulary:
+    """Normalized skill name <-> integer ID
+
+    With a SkillNormalizer, spellings of the same taxonomy skill ("NodeJS",
+    "node.js") share one ID.
+    """
+
+    def __init__(self, normalizer=None):
+        self.normalizer = normalizer
+        self.ids = {}
+        self.names = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def key(self, skill):
+        """Vocabulary key of a raw skill"""
+        return normalize(self.normalizer.canonical(skill) if self.normalizer else skill)
+
+    def add(self, skill):
+        """ID of a skill, assigning the next one if it is new"""
+        name = self.key(skill)
+        skill_id = self.ids.get(name)
+        if skill_id is None:
+            skill_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return skill_id
+
+    def encode(self, skills):
+        """Sorted IDs of the known skills in a list; unknown skills are dropped"""
+        return sorted({self.ids[name] for name in map(self.key, skills) if name in self.ids})
+
+    def decode(self, skill_ids):
+        return [self.names[skill_id] for skill_id in skill_ids]
+
+
+def pack_bits(skill_ids, offsets, words):
+    """Word-major uint64 bitset matrix (words x rows) for skill IDs laid out as CSR rows"""
+    rows = len(offsets) - 1
+    bits = np.zeros((words, rows), dtype=np.uint64)
+    columns = np.repeat(np.arange(rows), np.diff(offsets))
+    ids = np.asarray(skill_ids, dtype=np.int64)
+    np.bitwise_or.at(bits, (ids >> 6, columns), np.left_shift(np.uint64(1), (ids & 63).astype(np.uint64)))
+    return bits
+
+
+def unpack_bits(words):
+    """Skill IDs set in one job's bitset, ascending"""
+    flags = np.unpackbits(np.ascontiguousarray(words, dtype='<u8').view(np.uint8), bitorder='little')
+    return np.flatnonzero(flags).tolist()
+
+
+class SkillIndex:
+    def __init__(self, jobs=(), normalizer=None):
+        self.vocabulary = SkillVocabulary(normalizer)
+        self.source = jobs
+        keys = id_keys(jobs)
+        # The first posting of a repeated ID wins
+        _, first = np.unique(keys, return_index=True)
+        self.positions = np.sort(first).astype(np.int64)   # position in source per row
+        self.keys = keys[self.positions]                    # job ID key per row
+        self.title_rows = {}                                # normalized title -> first row
+        self.skill_offsets = np.zeros(len(self.positions) + 1, dtype=np.int64)
+        self.required = np.zeros(len(self.positions), dtype=np.int32)    # required skills listed per row
+        skill_ids = []
+        for row, position in enumerate(self.positions.tolist()):
+            job = jobs[position]
+            skills = list(job.get('required_skills', []))
+            self.title_rows.setdefault(normalize(job['title']), row)
+            ids = sorted({self.vocabulary.add(skill) for skill in skills})
+            skill_ids.extend(ids)
+            self.skill_offsets[row + 1] = self.skill_offsets[row] + len(ids)
+            self.required[row] = len(skills)
+        self.skill_ids = np.asarray(skill_ids, dtype=np.int32)   # sorted skill IDs, row after row
+        self._lookup = RowLookup(self.keys, np.arange(len(self.keys)))
+        self._bits = None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def job(self, row):
+        return self.source[self.positions[row]]
+
+    def rows_for(self, keys):
+        """Row of each job ID key, -1 for jobs not in the index"""
+        return self._lookup.rows_for(keys)
+
+    def row_for(self, job_id):
+        return int(self.rows_for([id_key(job_id)])[0])
+
+    def skill_matrix(self):
+        """Binary CSR matrix, jobs x vocabulary, of each job's required skills"""
+        from scipy.sparse import csr_matrix
+
+        data = np.ones(len(self.skill_ids), dtype=np.float32)
+        return csr_matrix((data, self.skill_ids, self.skill_offsets), shape=(len(self), len(self.vocabulary)))
+
+    @property
+    def bits(self):
+        """Required-skill bitsets, words x jobs, packed on first use"""
+        if self._bits is None:
+            self._bits = pack_bits(self.skill_ids, self.skill_offsets, max(1, (len(self.vocabulary) + 63) // 64))
+        return self._bits
+
+    def resume_bits(self, resume_skills):
+        """Bitset of a resume's skills over the vocabulary"""
+        skill_ids = self.vocabulary.encode(resume_skills)
+        return pack_bits(skill_ids, np.array([0, len(skill_ids)]), self.bits.shape[0])[:, 0]
+
+    def match_counts(self, resume_skills):
+        """Number of each job's required skills the resume has, as an array in row order"""
+        resume = self.resume_bits(resume_skills)
+        counts = np.zeros(len(self), dtype=np.int64)
+        # Words the resume has no bits in cannot add to any count
+        for word in np.flatnonzero(resume):
+            counts += np.bitwise_count(self.bits[word] & resume[word])
+        return counts
+
+    def match_shares(self, match_counts):
+        """Share (0 to 1) of each job's required skills covered, from match_counts"""
+        required = self.required.astype(np.float32)
+        return np.divide(match_counts, required, out=np.zeros_like(required), where=required > 0)
+
+    def find_by_title(self, title):
+        """First job with this title (case and spacing insensitive), or None"""
+        row = self.title_rows.get(normalize(title))
+        return self.job(row) if row is not None else None
+
+    def compare(self, job_id, resume_skills):
+        """(matching skills, missing skills) of one job against a resume, in vocabulary order"""
+        job = self.bits[:, self.row_for(job_id)]
+        resume = self.resume_bits(resume_skills)
+        return (self.vocabulary.decode(unpack_bits(job & resume)),
+                self.vocabulary.decode(unpack_bits(job & ~resume)))
+
+    def required_count(self, job_id):
+        return int(self.required[self.row_for(job_id)])
+
+    def match_percentage(self, job_id, matching_count):
+        """Share of a job's required skills covered, as a percentage"""
+        required = self.required_count(job_id)
+        return (matching_count / required) * 100 if required > 0 else 0
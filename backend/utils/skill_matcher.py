@@ -0,0 +1,161 @@
+"""
+Compiled skill matcher.
+
+The skill taxonomy (data/skills_taxonomy.json, or the file named by
+AI_ENGINE_SKILL_TAXONOMY) lists canonical skill names with their aliases.
+SkillMatcher compiles every name and alias into a token trie once, then
+finds all skills in a text with a single left-to-right pass over its
+tokens, taking the longest match at each position. Matching is on whole
+tokens, so "go" does not fire inside "google" and "r" does not fire inside
+every word containing an r. A name of several tokens only matches where
+the text joins them the way the name does: spaces or hyphens for "machine
+learning", a slash for "CI/CD". A comma, bracket or line break between two
+tokens ends the phrase, so "AWS, EC2" is two skills rather than one.
+"""
+import hashlib
+import json
+import os
+import re
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'skills_taxonomy.json')
+
+# Tokens keep the characters skill names are spelled with (node.js, c++, c#, .net);
+# anything else - spaces, commas, slashes, hyphens, brackets - separates tokens
+_TOKEN = re.compile(r"\.?[A-Za-z0-9][A-Za-z0-9+#.]*")
+
+# Trie key holding the match at the end of a path
+_END = ''
+
+
+def tokenize(text):
+    """Split text into (token, original token, start, end) tuples used for matching"""
+    tokens = []
+    for match in _TOKEN.finditer(text):
+        token = match.group(0).rstrip('.')
+        if token:
+            tokens.append((token.lower(), token, match.start(), match.start() + len(token)))
+    return tokens
+
+
+def _joint(gap):
+    """How a gap joins two tokens: '' for spaces and hyphens, else its punctuation; None across a line break"""
+    if '\n' in gap or '\r' in gap:
+        return None
+    return gap.replace('-', ' ').strip()
+
+
+def _joints(text, tokens):
+    """Joint between each token and the next"""
+    return [_joint(text[tokens[k][3]:tokens[k + 1][2]]) for k in range(len(tokens) - 1)]
+
+
+def _in_capitals_run(text, tokens, i):
+    """Whether token i directly follows an all-capitals word on the same line ("REDDY R"), where case says nothing
+
+    A line break ends the run, so a skill on the line after a heading
+    ("SKILLS\\nR, SQL") still counts.
+    """
+    if i == 0:
+        return False
+    previous = tokens[i - 1]
+    letters = [c for c in previous[1] if c.isalpha()]
+    gap = text[previous[3]:tokens[i][2]]
+    return (len(letters) > 1 and all(c.isupper() for c in letters) and
+            gap.isspace() and '\n' not in gap and '\r' not in gap)
+
+
+class SkillMatcher:
+    def __init__(self, skills):
+        """Compile a matcher from taxonomy entries ({"name", "aliases", "case_sensitive"})"""
+        self.trie = {}
+        self.skills = {}
+        self.max_tokens = 0
+        for entry in skills:
+            name = entry['name']
+            self.skills[name.lower()] = entry
+            # A case-sensitive name ("Go", "R") only matches as written;
+            # aliases ("golang") always match in any case
+            self._add(name, name, exact=entry.get('case_sensitive', False))
+            for alias in entry.get('aliases', []):
+                self._add(alias, name, exact=False)
+
+    def _add(self, phrase, name, exact):
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        node = self.trie
+        for token in tokens:
+            node = node.setdefault(token[0], {})
+        # Several spellings may share a path (e.g. a case-sensitive name and an alias)
+        node.setdefault(_END, []).append((name, [token[1] for token in tokens] if exact else None,
+                                          _joints(phrase, tokens)))
+        self.max_tokens = max(self.max_tokens, len(tokens))
+
+    def find_spans(self, text):
+        """Find skills in text as (skill name, first token, token count), in text order"""
+        tokens = tokenize(text)
+        joints = _joints(text, tokens)
+        found = []
+        i = 0
+        while i < len(tokens):
+            node = self.trie
+            best = None
+            j = i
+            while j < len(tokens) and j - i < self.max_tokens:
+                if j > i and joints[j - 1] is None:
+                    break
+                node = node.get(tokens[j][0])
+                if node is None:
+                    break
+                j += 1
+                for name, exact, joined in node.get(_END, ()):
+                    if joined != joints[i:j - 1]:
+                        continue
+                    if exact is None or (exact == [token[1] for token in tokens[i:j]] and
+                                         not _in_capitals_run(text, tokens, i)):
+                        best = (name, j - i)
+                        break
+            if best:
+                found.append((best[0], i, best[1]))
+                i += best[1]
+            else:
+                i += 1
+        return found
+
+    def find_skills(self, text):
+        """Canonical names of the skills mentioned in text, first mention first"""
+        seen = set()
+        skills = []
+        for name, _, _ in self.find_spans(text):
+            if name not in seen:
+                seen.add(name)
+                skills.append(name)
+        return skills
+
+    def canonical_name(self, skill):
+        """Canonical spelling of a taxonomy skill name, or None if unknown"""
+        entry = self.skills.get(skill.lower())
+        return entry['name'] if entry else None
+
+
+def taxonomy_path(path=None):
+    return path or os.getenv('AI_ENGINE_SKILL_TAXONOMY', DEFAULT_TAXONOMY_PATH)
+
+
+def taxonomy_digest(path=None):
+    """Short hash of the taxonomy file, for cache keys that depend on its contents"""
+    with open(taxonomy_path(path), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def load_taxonomy(path=None):
+    """Load the skill entries of a taxonomy file"""
+    path = taxonomy_path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        taxonomy = json.load(f)
+    return taxonomy['skills'] if isinstance(taxonomy, dict) else taxonomy
+
+
+def build_skill_matcher(path=None):
+    """Compile the matcher for a taxonomy file"""
+    return SkillMatcher(load_taxonomy(path))
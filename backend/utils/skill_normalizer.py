@@ -0,0 +1,210 @@
+"""
+Fuzzy skill normalization.
+
+Maps raw skill strings from job feeds, resumes and API callers to the
+canonical names of the skill taxonomy, so "NodeJS", "node.js" and "Node"
+all become "Node.js" and "Pytorh" becomes "PyTorch". Lookups go through:
+
+1. an alias table keyed by the compact spelling (lowercase, without spaces,
+   hyphens, underscores or dots), covering every name and alias;
+2. a symmetric-delete index (SymSpell): every compact key is stored under
+   each string reachable from it by deleting up to MAX_DISTANCE characters,
+   so the candidates for a misspelling are found by generating the query's
+   own deletes and looking them up, with no scan over the taxonomy. As in
+   SymSpell, deletes are taken from the first PREFIX_LENGTH characters
+   only, which bounds their number for long strings; the candidates are
+   then checked against the whole string with a real edit distance.
+
+Keys shorter than six characters get no typo tolerance ("go" and "r" are
+one edit away from half the alphabet, "scalar" one from "scala"), and a
+typo that is equally close to two skills is left unresolved. Results are memoized in an LRU cache, since the same few
+thousand spellings make up nearly all lookups.
+
+    python skill_normalizer.py [--inputs N]
+
+benchmarks lookups per second with and without the cache.
+"""
+import argparse
+import functools
+import os
+import random
+import re
+import sys
+import time
+
+# Allow running this file directly for the benchmark
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.skill_matcher import load_taxonomy, taxonomy_digest
+
+# Memoized lookups (AI_ENGINE_SKILL_CACHE_SIZE)
+CACHE_SIZE = int(os.getenv('AI_ENGINE_SKILL_CACHE_SIZE', 65536))
+
+MAX_DISTANCE = 2
+
+# Bump when the same taxonomy resolves spellings differently; saved
+# results of normalization are keyed by it (see normalizer_key)
+NORMALIZER_VERSION = 2
+
+# Characters of each key the delete index is built from
+PREFIX_LENGTH = 7
+
+# Separators that do not change which skill is meant; "+" and "#" do (C, C++, C#)
+_SEPARATORS = re.compile(r"[\s\-_.]+")
+
+
+def compact(skill):
+    """Spelling-insensitive key for a skill: lowercase without separators"""
+    return _SEPARATORS.sub('', str(skill).lower())
+
+
+def max_distance(key):
+    """Edits tolerated for a compact key of this length"""
+    if len(key) < 6:
+        return 0
+    return 1 if len(key) < 9 else MAX_DISTANCE
+
+
+def deletes(key, distance):
+    """Every string reachable from key by deleting up to `distance` characters, key included"""
+    found = {key}
+    frontier = {key}
+    for _ in range(distance):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (adjacent transpositions count as one edit), capped at limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SkillNormalizer:
+    def __init__(self, skills, cache_size=CACHE_SIZE):
+        """Index taxonomy entries ({"name", "aliases"}) for lookup"""
+        self.names = {}     # compact key -> canonical name
+        self.index = {}     # delete -> compact keys it is reachable from
+        for entry in skills:
+            for spelling in [entry['name']] + list(entry.get('aliases', [])):
+                key = compact(spelling)
+                if key and key not in self.names:
+                    self.names[key] = entry['name']
+        for key in self.names:
+            for variant in deletes(key[:PREFIX_LENGTH], max_distance(key)):
+                self.index.setdefault(variant, []).append(key)
+        self._lookup_cached = functools.lru_cache(maxsize=cache_size)(self._lookup)
+
+    def _lookup(self, raw, fuzzy):
+        key = compact(raw)
+        name = self.names.get(key)
+        if name or not fuzzy:
+            return name
+        limit = max_distance(key)
+        if not limit:
+            return None
+        best = {}
+        for variant in deletes(key[:PREFIX_LENGTH], limit):
+            for candidate in self.index.get(variant, ()):
+                if candidate not in best and abs(len(candidate) - len(key)) <= limit:
+                    best[candidate] = edit_distance(key, candidate, min(limit, max_distance(candidate)))
+        matches = [(distance, self.names[candidate]) for candidate, distance in best.items()
+                   if distance <= min(limit, max_distance(candidate))]
+        if not matches:
+            return None
+        closest = min(distance for distance, _ in matches)
+        names = {name for distance, name in matches if distance == closest}
+        # A typo equally close to two different skills is ambiguous
+        return names.pop() if len(names) == 1 else None
+
+    def normalize(self, raw, fuzzy=True):
+        """Canonical taxonomy name for a raw skill string, or None if it matches none
+
+        With fuzzy=False only exact spellings and aliases resolve, for free
+        text such as noun phrases where ordinary words sit close to skill names.
+        """
+        return self._lookup_cached(str(raw).strip(), fuzzy)
+
+    def canonical(self, raw, fuzzy=True):
+        """Canonical name for a raw skill, or the raw skill trimmed if the taxonomy lacks it"""
+        return self.normalize(raw, fuzzy) or ' '.join(str(raw).split())
+
+    def canonical_skills(self, skills, fuzzy=True):
+        """Canonical names for a list of skills, first occurrence first, without duplicates"""
+        seen = set()
+        result = []
+        for skill in skills:
+            name = self.canonical(skill, fuzzy)
+            if name and name.lower() not in seen:
+                seen.add(name.lower())
+                result.append(name)
+        return result
+
+    def cache_info(self):
+        return self._lookup_cached.cache_info()
+
+
+def build_skill_normalizer(path=None):
+    """Index the taxonomy file for normalization"""
+    return SkillNormalizer(load_taxonomy(path))
+
+
+def normalizer_key(path=None):
+    """Names the normalizer version and taxonomy, for caches of canonical skill names"""
+    return f"{NORMALIZER_VERSION}-{taxonomy_digest(path)}"
+
+
+def _variants(name, rng):
+    """Spellings of a skill name as they show up in feeds and resumes"""
+    key = name.lower()
+    variants = [name, key, key.upper(), key.replace('.', ''), key.replace(' ', '-'), key.replace('-', ' ')]
+    if len(key) >= 5:
+        i = rng.randrange(len(key) - 1)
+        variants.append(key[:i] + key[i + 1] + key[i] + key[i + 2:])    # transposition
+        variants.append(key[:i] + key[i + 1:])                           # deletion
+    return variants
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark skill normalization throughput")
+    parser.add_argument("--inputs", type=int, default=200000, help="Lookups per run")
+    parser.add_argument("--taxonomy", help="Taxonomy file (default: bundled taxonomy)")
+    options = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    normalizer = build_skill_normalizer(options.taxonomy)
+    print(f"Indexed {len(normalizer.names)} spellings under {len(normalizer.index)} deletes "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = random.Random(0)
+    spellings = [variant for entry in load_taxonomy(options.taxonomy) for variant in _variants(entry['name'], rng)]
+    spellings += [f"unlisted skill {i}" for i in range(len(spellings) // 10)]
+    inputs = [rng.choice(spellings) for _ in range(options.inputs)]
+
+    uncached = SkillNormalizer(load_taxonomy(options.taxonomy), cache_size=0)
+    for label, instance in (("uncached", uncached), ("cached", normalizer)):
+        start = time.perf_counter()
+        resolved = sum(1 for raw in inputs if instance.normalize(raw))
+        elapsed = time.perf_counter() - start
+        print(f"{label:<9} {len(inputs) / elapsed:>12,.0f} lookups/s  resolved {resolved / len(inputs):.1%}")
+    print(f"cache: {normalizer.cache_info()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())